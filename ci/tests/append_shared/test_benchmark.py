@@ -0,0 +1,234 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+"""
+Benchmarks for append_shared: append-batch against one append-once per
+line, the early match of append-once, append --in-place on a large file and
+the latency of each --sync level.
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+from functools import partial
+from io import BytesIO, TextIOWrapper
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+from unittest.mock import patch
+from append_shared.append_shared import append_shared
+
+_FILE_COUNT = 4
+_LINE_COUNT = 200
+_EXISTING_LINE_COUNT = 5000
+_LARGE_LINE_COUNT = 500000
+_LOG_LINE_COUNT = 2000000
+_LOG_APPEND_COUNT = 5
+_SYNC_APPEND_COUNT = 50
+
+
+def _operations(files: list[str]) -> list[tuple[str, str, str]]:
+    """Return the append-once operations of a provisioning run."""
+    return [
+        ("append-once", file, f"option_{i} = {i % 7}")
+        for i in range(_LINE_COUNT)
+        for file in files
+    ]
+
+
+def _write_files(files: list[str]) -> None:
+    """Fill files with existing lines."""
+    for file in files:
+        Path(file).write_text(
+            "".join(
+                f"existing_{i} = 1\n" for i in range(_EXISTING_LINE_COUNT)
+            ),
+            encoding="utf-8",
+        )
+
+
+def _run_single(operations: list[tuple[str, str, str]]) -> float:
+    """Apply operations with one append_shared() call each."""
+    start = perf_counter()
+    for mode, file, line in operations:
+        append_shared(mode, [file, line])
+    return perf_counter() - start
+
+
+def _run_batch(operations: list[tuple[str, str, str]]) -> float:
+    """Apply operations with one 'append-batch' call."""
+    manifest: bytes = b"".join(
+        f"{mode}\0{file}\0{line}\0".encode() for mode, file, line in operations
+    )
+    start = perf_counter()
+    with patch.object(sys, "stdin", TextIOWrapper(BytesIO(manifest))):
+        append_shared("append-batch", [])
+    return perf_counter() - start
+
+
+def _substring_contains(file: str, line: str) -> bool:
+    """append-once as it was before it looked for the line while reading."""
+    with open(file, "r", encoding="utf-8") as f:
+        file_contents = f.read()
+    return "\n" + line + "\n" in "\n" + file_contents
+
+
+def _peak_memory(func: Callable[[], object]) -> tuple[float, int]:
+    """Return the wall time and peak memory allocated while running func."""
+    tracemalloc.start()
+    try:
+        start = perf_counter()
+        func()
+        return perf_counter() - start, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestAppendSharedBenchmark(unittest.TestCase):
+    """Benchmarks for append_shared()."""
+
+    def test_append_batch(self) -> None:
+        """
+        One 'append-batch' must be faster than one 'append-once' per line,
+        which reads and replaces the whole file every time.
+        """
+        with (
+            tempfile.TemporaryDirectory() as tmpdir,
+            open(os.devnull, "w", encoding="utf-8") as devnull,
+            redirect_stdout(devnull),
+        ):
+            files: list[str] = [
+                os.path.join(tmpdir, str(i)) for i in range(_FILE_COUNT)
+            ]
+            operations = _operations(files)
+            _write_files(files)
+            single = _run_single(operations)
+            single_contents = [Path(file).read_text("utf-8") for file in files]
+            _write_files(files)
+            batch = _run_batch(operations)
+            batch_contents = [Path(file).read_text("utf-8") for file in files]
+        print(
+            f"append_shared {len(operations)} lines to {_FILE_COUNT} files: "
+            + f"single {single * 1e3:.0f} ms, batch {batch * 1e3:.0f} ms, "
+            + f"speedup {single / batch:.1f}x",
+            file=sys.stderr,
+        )
+        self.assertEqual(single_contents, batch_contents)
+        self.assertLess(batch, single)
+
+    def test_append_once_early_match(self) -> None:
+        """
+        'append-once' must stop reading a large file at the first match
+        instead of reading and copying all of it.
+        """
+        with (
+            tempfile.TemporaryDirectory() as tmpdir,
+            open(os.devnull, "w", encoding="utf-8") as devnull,
+            redirect_stdout(devnull),
+        ):
+            file: str = os.path.join(tmpdir, "hosts")
+            Path(file).write_text(
+                "".join(
+                    f"0.0.0.0 host{i}.example\n"
+                    for i in range(_LARGE_LINE_COUNT)
+                ),
+                encoding="utf-8",
+            )
+            line: str = "0.0.0.0 host10.example"
+            substring_time, substring_memory = _peak_memory(
+                partial(_substring_contains, file, line)
+            )
+            streaming_time, streaming_memory = _peak_memory(
+                partial(append_shared, "append-once", [file, line])
+            )
+        print(
+            f"append-once early match in {_LARGE_LINE_COUNT} lines: "
+            + f"substring {substring_time * 1e3:.1f} ms "
+            + f"{substring_memory / 2**20:.1f} MiB, "
+            + f"streaming {streaming_time * 1e3:.1f} ms "
+            + f"{streaming_memory / 2**20:.1f} MiB",
+            file=sys.stderr,
+        )
+        self.assertLess(streaming_memory, substring_memory)
+
+    def test_append_in_place(self) -> None:
+        """
+        'append --in-place' must be faster on a large file than replacing
+        it with a copy for every line.
+        """
+        with (
+            tempfile.TemporaryDirectory() as tmpdir,
+            open(os.devnull, "w", encoding="utf-8") as devnull,
+            redirect_stdout(devnull),
+        ):
+            file: str = os.path.join(tmpdir, "log")
+            Path(file).write_text(
+                f"{'x' * 40}\n" * _LOG_LINE_COUNT, encoding="utf-8"
+            )
+            start = perf_counter()
+            for i in range(_LOG_APPEND_COUNT):
+                append_shared("append", [file, f"line {i}"])
+            copy = perf_counter() - start
+            start = perf_counter()
+            for i in range(_LOG_APPEND_COUNT):
+                append_shared("append", ["--in-place", file, f"line {i}"])
+            in_place = perf_counter() - start
+        print(
+            f"append to {_LOG_LINE_COUNT * 41 / 2**20:.0f} MiB: copy "
+            + f"{copy / _LOG_APPEND_COUNT * 1e3:.1f} ms/line, in place "
+            + f"{in_place / _LOG_APPEND_COUNT * 1e3:.1f} ms/line",
+            file=sys.stderr,
+        )
+        self.assertLess(in_place, copy)
+
+    def test_sync_levels(self) -> None:
+        """
+        Print the latency of each durability level. fsync is free on tmpfs,
+        so the benchmark works next to this file, on the disk of the
+        checkout.
+        """
+        with (
+            tempfile.TemporaryDirectory(
+                dir=os.path.dirname(os.path.abspath(__file__))
+            ) as tmpdir,
+            open(os.devnull, "w", encoding="utf-8") as devnull,
+            redirect_stdout(devnull),
+        ):
+            file: str = os.path.join(tmpdir, "config")
+            latencies: list[str] = []
+            for options in (
+                ["--sync=none"],
+                ["--sync=file"],
+                ["--sync=dir"],
+                ["--in-place", "--sync=none"],
+                ["--in-place", "--sync=file"],
+                ["--in-place", "--sync=dir"],
+            ):
+                Path(file).write_text("", encoding="utf-8")
+                start = perf_counter()
+                for i in range(_SYNC_APPEND_COUNT):
+                    self.assertEqual(
+                        append_shared("append", [*options, file, f"line {i}"]),
+                        0,
+                    )
+                latency = (perf_counter() - start) / _SYNC_APPEND_COUNT
+                latencies.append(f"{' '.join(options)} {latency * 1e3:.2f} ms")
+                self.assertEqual(
+                    len(Path(file).read_text("utf-8").splitlines()),
+                    _SYNC_APPEND_COUNT,
+                )
+        print(
+            "append latency per line: " + ", ".join(latencies),
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+"""
+Benchmark for check_ref_commits_for_unicode: scanning a long series of
+commits with one git log instead of git commands per commit.
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from check_ref_commits_for_unicode.check_ref_commits_for_unicode import (
+    COMMIT_META_FORMAT,
+    check_ref_commits_for_unicode,
+    scan_commit,
+)
+
+_COMMITS = 200
+_GIT_ENV = {
+    **os.environ,
+    "GIT_AUTHOR_NAME": "Author",
+    "GIT_AUTHOR_EMAIL": "author@example.invalid",
+    "GIT_COMMITTER_NAME": "Committer",
+    "GIT_COMMITTER_EMAIL": "committer@example.invalid",
+    "GIT_CONFIG_GLOBAL": os.devnull,
+    "GIT_CONFIG_NOSYSTEM": "1",
+}
+
+
+def _git(*args: str) -> bytes:
+    """Run git in the current directory and return its stdout."""
+    return subprocess.run(
+        ["git", *args], stdout=subprocess.PIPE, check=True, env=_GIT_ENV
+    ).stdout
+
+
+def _check_per_commit(target_ref: str) -> None:
+    """Scan every commit with two 'git show' processes, as the script did."""
+    log_output = _git("log", "--format=%H", f"HEAD..{target_ref}")
+    for commit in log_output.decode("ascii").split():
+        commit_meta = _git(
+            "show", "--no-patch", f"--format={COMMIT_META_FORMAT}", commit
+        ).rstrip(b"\n")
+        commit_diff = _git(
+            "show",
+            "--no-ext-diff",
+            "--unified=0",
+            "--no-textconv",
+            "--format=",
+            commit,
+        ).rstrip(b"\n")
+        scan_commit(commit_meta, commit_diff)
+
+
+@unittest.skipUnless(shutil.which("git"), "needs git")
+class TestCheckRefCommitsForUnicodeBenchmark(unittest.TestCase):
+    """Benchmarks for check_ref_commits_for_unicode()."""
+
+    def test_many_commits(self) -> None:
+        """
+        Scanning a long series of commits must not start git per commit.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            old_cwd = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                _git("init", "--quiet", "--initial-branch=main")
+                _git("commit", "--quiet", "--allow-empty", "-m", "Initial")
+                _git("checkout", "--quiet", "-b", "feature")
+                for commit_number in range(_COMMITS):
+                    with open(
+                        f"{commit_number % 20}.py", "a", encoding="utf-8"
+                    ) as f:
+                        f.write(f"x{commit_number} = {commit_number}\n")
+                    _git("add", "--all")
+                    _git("commit", "--quiet", "-m", f"Commit {commit_number}")
+                _git("checkout", "--quiet", "main")
+                with contextlib.redirect_stderr(io.StringIO()):
+                    start = time.perf_counter()
+                    _check_per_commit("feature")
+                    per_commit = time.perf_counter() - start
+                    start = time.perf_counter()
+                    exit_code = check_ref_commits_for_unicode("feature")
+                    batched = time.perf_counter() - start
+            finally:
+                os.chdir(old_cwd)
+        self.assertEqual(exit_code, 0)
+        print(
+            f"check_ref_commits_for_unicode {_COMMITS} commits: "
+            + f"git show per commit {_COMMITS / per_commit:.0f} commits/s, "
+            + f"one git log {_COMMITS / batched:.0f} commits/s",
+            file=sys.stderr,
+        )
+        self.assertLess(batched, per_commit)
+
+
+if __name__ == "__main__":
+    unittest.main()
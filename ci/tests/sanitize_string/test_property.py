@@ -17,9 +17,47 @@ markup-free property AND the no-control-bytes property.
 import unittest
 from hypothesis import given, settings, strategies as st
 from sanitize_string.sanitize_string_lib import sanitize_string
+from stdisplay.stdisplay import stdisplay
+from strip_markup.strip_markup_lib import strip_markup
 
 _ALLOWED_CONTROL = {"\n", "\t"}
 
+## Fragments that exercise the HTML parser far more often than st.text().
+_MARKUP_FRAGMENTS = st.sampled_from(
+    [
+        "<",
+        ">",
+        "&",
+        ";",
+        "/",
+        "!",
+        "-",
+        "a",
+        " ",
+        "\n",
+        "\r",
+        "\x1b",
+        "[",
+        "\u202e",
+        "\u00e9",
+        "&amp;",
+        "&#27;",
+        "&lt;",
+        "<b>",
+        "</script>",
+        "<script>",
+        "<!--",
+        "-->",
+        "<![CDATA[",
+        "]]>",
+    ]
+)
+
+
+def _sanitize_string_staged(s: str) -> str:
+    """The three-stage pipeline sanitize_string() is fused from."""
+    return stdisplay(strip_markup(stdisplay(s, sgr=-1)), sgr=-1)
+
 
 class TestSanitizeStringProperties(unittest.TestCase):
     """Property-based tests for sanitize_string()."""
@@ -57,6 +95,15 @@ class TestSanitizeStringProperties(unittest.TestCase):
                     f"input={s!r} output={out!r}"
                 )
 
+    @given(st.one_of(st.text(), st.lists(_MARKUP_FRAGMENTS).map("".join)))
+    @settings(max_examples=1000)
+    def test_matches_staged_pipeline(self, s: str) -> None:
+        """
+        The fused sanitizer must reach the same result as running stdisplay,
+        strip_markup and stdisplay one after another.
+        """
+        self.assertEqual(sanitize_string(s), _sanitize_string_staged(s))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,251 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+"""
+Benchmarks for stdisplay: reuse of the compiled SGR pattern, the cost of
+importing it, and how much stsponge keeps in memory and sttee encodes.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from functools import partial
+from io import BytesIO, TextIOWrapper
+from re import compile as re_compile, sub as re_sub
+from timeit import repeat
+from typing import Callable
+from unittest.mock import patch
+import stdisplay as stdisplay_package
+from stdisplay import stsponge, sttee
+from stdisplay.stdisplay import get_sgr_pattern, stdisplay
+
+_LINE = "2026-01-01 12:00:00 host daemon[1234]: \x1b[31merror\x1b[0m: x\n"
+_LINE_COUNT = 20000
+_SPONGE_LINE_COUNT = 200000
+_SPONGE_FILE_COUNT = 3
+_TEE_LINE_COUNT = 100000
+_TEE_FILE_COUNT = 4
+
+## Run in a fresh interpreter so nothing is imported or detected yet.
+_COLD_START_CODE = """\
+import json, time
+start = time.perf_counter()
+import stdisplay.stdisplay
+imported = time.perf_counter()
+stdisplay.stdisplay.get_default_sgr()
+detected = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "detect": detected - imported,
+}))
+"""
+
+
+def _best_of(func: Callable[[], object], number: int = 1) -> float:
+    """Return the best wall time of several runs, in seconds."""
+    return min(repeat(func, number=number, repeat=5))
+
+
+def _uncached_stdisplay(untrusted_text: str, sgr: int) -> str:
+    """stdisplay() as it was before the compiled pattern was cached."""
+    sgr_pattern = get_sgr_pattern(sgr=sgr, exclude_sgr=None)
+    sgr_pattern = r"(\x1b(?!\[" + sgr_pattern + r")|[^\x1b\n\t\x20-\x7E])"
+    return str(re_sub(re_compile(sgr_pattern), "_", untrusted_text))
+
+
+def _sanitize_lines_uncached(sgr: int) -> None:
+    """Sanitize the sample log line by line without the pattern cache."""
+    for _ in range(_LINE_COUNT):
+        _uncached_stdisplay(_LINE, sgr)
+
+
+def _sanitize_lines(sgr: int) -> None:
+    """Sanitize the sample log line by line with stdisplay()."""
+    for _ in range(_LINE_COUNT):
+        stdisplay(_LINE, sgr=sgr)
+
+
+def _joined_sponge(untrusted_data: bytes, files: list[str]) -> None:
+    """stsponge as it was before it sanitized once into a spooled file."""
+    untrusted_text_list: list[str] = []
+    for untrusted_text in TextIOWrapper(
+        BytesIO(untrusted_data), encoding="utf-8", errors="replace"
+    ):
+        untrusted_text_list.append(untrusted_text)
+    for file in files:
+        with open(
+            file, "w", encoding="ascii", errors="replace", newline="\n"
+        ) as out_file:
+            out_file.write(stdisplay("".join(untrusted_text_list), sgr=-1))
+
+
+def _spooled_sponge(untrusted_data: bytes, files: list[str]) -> None:
+    """Run stsponge.main() with untrusted_data as stdin."""
+    with (
+        patch.object(
+            stsponge,
+            "stdin",
+            TextIOWrapper(BytesIO(untrusted_data)),
+        ),
+        patch.object(stsponge, "argv", ["stsponge", *files]),
+        patch.object(stsponge, "SPONGE_MEMORY_LIMIT", 2**20),
+    ):
+        stsponge.main()
+
+
+def _text_tee(untrusted_data: bytes, files: list[str]) -> None:
+    """sttee as it was before it wrote the same bytes to binary sinks."""
+    with open(
+        os.devnull, "w", encoding="ascii", errors="replace", newline="\n"
+    ) as out_stdout:
+        output_files = [
+            open(  # pylint: disable=consider-using-with
+                file, "w", encoding="ascii", errors="replace", newline="\n"
+            )
+            for file in files
+        ]
+        for untrusted_text in TextIOWrapper(
+            BytesIO(untrusted_data), encoding="utf-8", errors="replace"
+        ):
+            rendered_text = stdisplay(untrusted_text, sgr=-1)
+            out_stdout.write(rendered_text)
+            for output_file in output_files:
+                output_file.write(rendered_text)
+        for output_file in output_files:
+            output_file.close()
+
+
+def _binary_tee(untrusted_data: bytes, files: list[str]) -> None:
+    """Run sttee.main() with untrusted_data as stdin."""
+    with (
+        open(os.devnull, "w", encoding="ascii") as out_stdout,
+        patch.object(
+            sttee,
+            "stdin",
+            TextIOWrapper(BytesIO(untrusted_data)),
+        ),
+        patch.object(sttee, "stdout", out_stdout),
+        patch.object(sttee, "argv", ["sttee", *files]),
+    ):
+        sttee.main()
+
+
+def _peak_memory(func: Callable[[], object]) -> int:
+    """Return the peak memory allocated while running func, in bytes."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestStdisplayBenchmark(unittest.TestCase):
+    """Benchmarks for stdisplay()."""
+
+    def test_per_line_pattern_cache(self) -> None:
+        """
+        Sanitizing line by line must not rebuild the SGR pattern per line.
+        """
+        for sgr in (-1, 2**24):
+            with self.subTest(sgr=sgr):
+                uncached = _best_of(partial(_sanitize_lines_uncached, sgr))
+                cached = _best_of(partial(_sanitize_lines, sgr))
+                print(
+                    f"stdisplay sgr={sgr}: "
+                    + f"uncached {uncached / _LINE_COUNT * 1e6:.2f} us/line, "
+                    + f"cached {cached / _LINE_COUNT * 1e6:.2f} us/line, "
+                    + f"speedup {uncached / cached:.1f}x",
+                    file=sys.stderr,
+                )
+                self.assertLess(cached, uncached)
+
+    def test_import_cold_start(self) -> None:
+        """
+        Importing stdisplay must not pay for the terminfo lookup, which is
+        deferred until the default sgr argument is first used.
+        """
+        pkg_parent = os.path.dirname(
+            os.path.dirname(os.path.abspath(stdisplay_package.__file__))
+        )
+        env = dict(os.environ)
+        env.update({"PYTHONPATH": pkg_parent, "NO_COLOR": "", "TERM": "xterm"})
+        env.pop("COLORTERM", None)
+        import_times: list[float] = []
+        detect_times: list[float] = []
+        for _ in range(5):
+            result = subprocess.run(
+                [sys.executable, "-c", _COLD_START_CODE],
+                env=env,
+                cwd=pkg_parent,
+                capture_output=True,
+                check=True,
+                text=True,
+                timeout=30,
+            )
+            timings = json.loads(result.stdout)
+            import_times.append(timings["import"])
+            detect_times.append(timings["detect"])
+        print(
+            f"stdisplay cold start: import {min(import_times) * 1e3:.2f} ms, "
+            + "first SGR detection "
+            + f"{min(detect_times) * 1e3:.2f} ms (deferred)",
+            file=sys.stderr,
+        )
+
+    def test_stsponge_memory(self) -> None:
+        """
+        stsponge must sanitize its input once into a sponge that spills to
+        disk instead of joining and sanitizing it once per output file.
+        """
+        untrusted_data: bytes = (_LINE * _SPONGE_LINE_COUNT).encode()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files: list[str] = [
+                os.path.join(tmpdir, str(i)) for i in range(_SPONGE_FILE_COUNT)
+            ]
+            joined = _peak_memory(
+                partial(_joined_sponge, untrusted_data, files)
+            )
+            spooled = _peak_memory(
+                partial(_spooled_sponge, untrusted_data, files)
+            )
+        print(
+            f"stsponge {len(untrusted_data) / 2**20:.0f} MiB to "
+            + f"{_SPONGE_FILE_COUNT} files: peak memory "
+            + f"joined {joined / 2**20:.1f} MiB, "
+            + f"spooled {spooled / 2**20:.1f} MiB",
+            file=sys.stderr,
+        )
+        self.assertLess(spooled, joined)
+
+    def test_sttee_fan_out(self) -> None:
+        """
+        sttee must sanitize and encode every chunk once for all files
+        instead of encoding every line again for every file.
+        """
+        untrusted_data: bytes = (_LINE * _TEE_LINE_COUNT).encode()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files: list[str] = [
+                os.path.join(tmpdir, str(i)) for i in range(_TEE_FILE_COUNT)
+            ]
+            text = _best_of(partial(_text_tee, untrusted_data, files))
+            binary = _best_of(partial(_binary_tee, untrusted_data, files))
+        print(
+            f"sttee {len(untrusted_data) / 2**20:.0f} MiB to "
+            + f"{_TEE_FILE_COUNT} files: text {text * 1e3:.0f} ms, "
+            + f"binary {binary * 1e3:.0f} ms, speedup {text / binary:.1f}x",
+            file=sys.stderr,
+        )
+        self.assertLess(binary, text)
+
+
+if __name__ == "__main__":
+    unittest.main()
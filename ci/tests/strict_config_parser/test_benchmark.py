@@ -0,0 +1,86 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+"""
+Benchmark for strict_config_parser: reloading an unchanged configuration
+through a ConfigCache against parsing it again.
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+import schema  # type: ignore
+from strict_config_parser.strict_config_parser import (
+    ConfigCache,
+    parse_config_files,
+)
+
+_FILE_COUNT = 20
+_KEY_COUNT = 50
+_RELOAD_COUNT = 100
+
+_SCHEMA = schema.Schema(
+    {
+        schema.Optional(schema.And(str, lambda key: key.startswith("key_"))): {
+            "enabled": bool,
+            "level": int,
+            "names": [str],
+        }
+    }
+)
+
+
+def _reload(conf_dir: str, config_cache: ConfigCache | None) -> float:
+    """Return the time of _RELOAD_COUNT reloads of conf_dir."""
+    parsed_config: dict[str, Any] = {}
+    start = perf_counter()
+    for _ in range(_RELOAD_COUNT):
+        parsed_config = parse_config_files(
+            conf_item_list=[conf_dir],
+            conf_schema=_SCHEMA,
+            config_cache=config_cache,
+        )
+    elapsed = perf_counter() - start
+    assert len(parsed_config) == _KEY_COUNT
+    return elapsed
+
+
+class TestStrictConfigParserBenchmark(unittest.TestCase):
+    """Benchmarks for parse_config_files()."""
+
+    def test_config_cache(self) -> None:
+        """
+        Reloading an unchanged configuration with a ConfigCache must be
+        faster than parsing, merging and validating it again.
+        """
+        with tempfile.TemporaryDirectory() as conf_dir:
+            for i in range(_FILE_COUNT):
+                Path(conf_dir, f"{i:02}.conf").write_text(
+                    "".join(
+                        f"[key_{key}]\nenabled = true\nlevel = {i}\n"
+                        + f'names = ["file_{i}"]\n'
+                        for key in range(_KEY_COUNT)
+                    ),
+                    encoding="utf-8",
+                )
+            uncached = _reload(conf_dir, None)
+            cached = _reload(conf_dir, ConfigCache())
+        print(
+            f"strict_config_parser {_FILE_COUNT} files: "
+            + f"uncached {uncached / _RELOAD_COUNT * 1e3:.2f} ms/reload, "
+            + f"cached {cached / _RELOAD_COUNT * 1e3:.2f} ms/reload, "
+            + f"speedup {uncached / cached:.1f}x",
+            file=sys.stderr,
+        )
+        self.assertLess(cached, uncached)
+
+
+if __name__ == "__main__":
+    unittest.main()
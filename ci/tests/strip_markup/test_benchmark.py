@@ -0,0 +1,129 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+"""
+Benchmarks for strip_markup: the fast path for lines without markup, the
+neutralization of metacharacters and the reuse of the parser.
+"""
+
+import sys
+import unittest
+from functools import partial
+from timeit import repeat
+from typing import Callable
+from strip_markup.strip_markup_lib import (
+    StripMarkupEngine,
+    _strip_once,
+    _underscore_sanitize,
+    strip_markup,
+)
+
+_MARKUP_FREE_LINES = [
+    "2026-01-01 12:00:00 host sdwdate[1234]: Time replay protection ok.\n",
+    "Package upgrade finished, 12 packages upgraded, 0 newly installed.\n",
+    "A reboot is required to complete the installation of updates.\n",
+] * 1000
+_MARKUP_HEAVY_LINES = [
+    "<p>Update <b>finished</b> &amp; <i>12</i> packages upgraded.</p>\n",
+    "<a href='https://example.com/?a=1&b=2'>release notes</a> &gt; here\n",
+    "<<b>b>Bold!<</b>/b> &lt;script&gt;alert(1)&lt;/script&gt;\n",
+] * 1000
+
+
+def _underscore_sanitize_generator(text: str) -> str:
+    """_underscore_sanitize() as it was before it used str.translate()."""
+    return "".join("_" if char in ["<", ">", "&"] else char for char in text)
+
+
+def _best_of(func: Callable[[], object]) -> float:
+    """Return the best wall time of several runs, in seconds."""
+    return min(repeat(func, number=1, repeat=5))
+
+
+def _strip_lines_parser_only(lines: list[str]) -> None:
+    """Strip every line, always running the parser as before the fast path."""
+    for line in lines:
+        _underscore_sanitize(_strip_once(line))
+
+
+def _strip_lines_new_engine(lines: list[str]) -> None:
+    """Strip every line with a newly constructed engine per line."""
+    for line in lines:
+        markup_stripper = StripMarkupEngine()
+        markup_stripper.feed(line)
+        markup_stripper.close()
+        _underscore_sanitize(markup_stripper.get_data())
+
+
+def _strip_lines(lines: list[str]) -> None:
+    """Strip every line with strip_markup()."""
+    for line in lines:
+        strip_markup(line)
+
+
+class TestStripMarkupBenchmark(unittest.TestCase):
+    """Benchmarks for strip_markup()."""
+
+    def test_markup_free_fast_path(self) -> None:
+        """
+        Lines without markup metacharacters must not pay for the parser.
+        """
+        for corpus_name, lines in (
+            ("markup-free", _MARKUP_FREE_LINES),
+            ("markup-heavy", _MARKUP_HEAVY_LINES),
+        ):
+            corpus_mib = sum(len(line) for line in lines) / 2**20
+            parser_only = _best_of(partial(_strip_lines_parser_only, lines))
+            current = _best_of(partial(_strip_lines, lines))
+            print(
+                f"strip_markup {corpus_name}: "
+                + f"parser always {corpus_mib / parser_only:.1f} MiB/s, "
+                + f"strip_markup {corpus_mib / current:.1f} MiB/s",
+                file=sys.stderr,
+            )
+            if lines is _MARKUP_FREE_LINES:
+                self.assertLess(current, parser_only)
+
+    def test_underscore_sanitize_translate(self) -> None:
+        """
+        Neutralizing metacharacters must not loop over characters in Python.
+        """
+        text = "".join(_MARKUP_HEAVY_LINES)
+        text_mib = len(text) / 2**20
+        generator = _best_of(partial(_underscore_sanitize_generator, text))
+        translate = _best_of(partial(_underscore_sanitize, text))
+        self.assertEqual(
+            _underscore_sanitize(text), _underscore_sanitize_generator(text)
+        )
+        print(
+            "strip_markup _underscore_sanitize: "
+            + f"generator {text_mib / generator:.1f} MiB/s, "
+            + f"translate {text_mib / translate:.1f} MiB/s",
+            file=sys.stderr,
+        )
+        self.assertLess(translate, generator)
+
+    def test_engine_reuse(self) -> None:
+        """
+        Per-line stripping must not pay for constructing a parser per line.
+        """
+        corpus_mib = sum(len(line) for line in _MARKUP_HEAVY_LINES) / 2**20
+        new_engine = _best_of(
+            partial(_strip_lines_new_engine, _MARKUP_HEAVY_LINES)
+        )
+        pooled = _best_of(partial(_strip_lines, _MARKUP_HEAVY_LINES))
+        print(
+            "strip_markup per-line engine: "
+            + f"new per line {corpus_mib / new_engine:.1f} MiB/s, "
+            + f"pooled {corpus_mib / pooled:.1f} MiB/s",
+            file=sys.stderr,
+        )
+        self.assertLess(pooled, new_engine)
+
+
+if __name__ == "__main__":
+    unittest.main()
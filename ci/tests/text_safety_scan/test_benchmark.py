@@ -0,0 +1,255 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+"""
+Benchmarks for text_safety_scan: in-process plugins against a process per
+file, and walking and scanning a synthetic tree with --jobs and --cache.
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from functools import partial
+from timeit import repeat
+from typing import Callable
+from text_safety_scan.text_safety_scan_lib import (
+    ScanCache,
+    ScanCounters,
+    ScanOptions,
+    read_target,
+    run_plugins_for_target,
+    scan_targets,
+    walk_directory,
+)
+from unicode_show.unicode_show import usable_cpu_count
+
+## Synthetic source tree, _TREE_DIRS directories of _TREE_FILES_PER_DIR files
+## each, with a .git directory and a large file in every directory. 5,000
+## files by default, 100,000 with TEXT_SAFETY_SCAN_BENCHMARK_LARGE_TREE=1,
+## which takes minutes to create and scan.
+_LARGE_TREE = os.environ.get("TEXT_SAFETY_SCAN_BENCHMARK_LARGE_TREE") == "1"
+_TREE_DIRS = 1000 if _LARGE_TREE else 100
+_TREE_FILES_PER_DIR = 100 if _LARGE_TREE else 50
+## A clean source file of about 1 KiB. Clean text is plain ASCII.
+_TREE_FILE_TEXT = (
+    'def main() -> int:\n    """Return the exit code."""\n    return 0\n\n'
+    * 16
+)
+
+## Starts unicode-show the way the former shell script did, once per file.
+_UNICODE_SHOW_COMMAND = [
+    sys.executable,
+    "-Bsu",
+    "-c",
+    "import sys; from unicode_show.unicode_show import main; sys.exit(main())",
+]
+
+
+def _scan_in_process(fnames: list[str]) -> ScanCounters:
+    """Run every plugin on every file inside this process."""
+    counters = ScanCounters()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(
+        io.StringIO()
+    ):
+        for fname in fnames:
+            run_plugins_for_target(fname, read_target(fname), counters)
+    return counters
+
+
+def _scan_per_process(fnames: list[str]) -> None:
+    """Start one unicode-show process per file."""
+    for fname in fnames:
+        subprocess.run(
+            [*_UNICODE_SHOW_COMMAND, fname],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+
+
+def _walk_per_path(top: str, options: ScanOptions) -> list[str]:
+    """Walk a tree with os.walk(), stat()ing every file by path."""
+    file_names = []
+    for dir_path, dir_names, names in os.walk(top):
+        dir_names[:] = sorted(
+            name for name in dir_names if name not in options.exclude
+        )
+        for name in sorted(names):
+            path = os.path.join(dir_path, name)
+            if (
+                os.path.isfile(path)
+                and not os.path.islink(path)
+                and os.path.getsize(path) <= (options.max_size or 0)
+            ):
+                file_names.append(path)
+    return file_names
+
+
+def _walk(top: str, options: ScanOptions) -> list[str]:
+    """Walk a tree with walk_directory()."""
+    return list(walk_directory(top, options, ScanCounters()))
+
+
+def _scan_tree(
+    top: str, options: ScanOptions, jobs: int, cache_file: str | None = None
+) -> ScanCounters:
+    """Walk a tree and scan every file, discarding the report."""
+    counters = ScanCounters()
+    scan_cache = None
+    if cache_file is not None:
+        scan_cache = ScanCache(cache_file, options.cache_max_entries)
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(
+        io.StringIO()
+    ):
+        scan_targets(
+            walk_directory(top, options, counters), jobs, counters, scan_cache
+        )
+    if scan_cache is not None:
+        scan_cache.close()
+    return counters
+
+
+def _best_of(func: Callable[[], object]) -> float:
+    """Return the best wall time of several runs, in seconds."""
+    return min(repeat(func, number=1, repeat=3))
+
+
+class TestTextSafetyScanBenchmark(unittest.TestCase):
+    """Benchmarks for run_plugins_for_target() and walk_directory()."""
+
+    tmp_dir: tempfile.TemporaryDirectory[str]
+    tree: str
+    options: ScanOptions
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # pylint: disable=consider-using-with
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.tree = cls.tmp_dir.name
+        for dir_number in range(_TREE_DIRS):
+            dir_path = os.path.join(cls.tree, f"dir{dir_number}")
+            os.makedirs(os.path.join(dir_path, ".git"))
+            for file_number in range(_TREE_FILES_PER_DIR):
+                with open(
+                    os.path.join(dir_path, f"{file_number}.py"),
+                    "w",
+                    encoding="utf-8",
+                ) as f:
+                    f.write(_TREE_FILE_TEXT)
+            with open(os.path.join(dir_path, ".git", "config"), "wb") as f:
+                f.write(b"[core]\n")
+            with open(os.path.join(dir_path, "large.bin"), "wb") as f:
+                f.write(b"\0" * 8192)
+        cls.options = ScanOptions()
+        cls.options.exclude = [".git"]
+        cls.options.max_size = 4096
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tmp_dir.cleanup()
+
+    def test_walk_tree(self) -> None:
+        """
+        Print the speed of walk_directory() and of an os.walk() which stats
+        every file by path, which must find the same files.
+        """
+        file_count = _TREE_DIRS * _TREE_FILES_PER_DIR
+        self.assertEqual(len(_walk(self.tree, self.options)), file_count)
+        self.assertEqual(
+            sorted(_walk(self.tree, self.options)),
+            sorted(_walk_per_path(self.tree, self.options)),
+        )
+        per_path = _best_of(partial(_walk_per_path, self.tree, self.options))
+        walker = _best_of(partial(_walk, self.tree, self.options))
+        print(
+            f"text_safety_scan walk {file_count} files: "
+            + f"os.walk {file_count / per_path:.0f} files/s, "
+            + f"walk_directory {file_count / walker:.0f} files/s",
+            file=sys.stderr,
+        )
+
+    @unittest.skipIf(usable_cpu_count() < 2, "needs more than one CPU")
+    def test_scan_tree_jobs(self) -> None:
+        """
+        Print the speed of scanning a tree sequentially and with worker
+        processes, which must scan the same files.
+        """
+        file_count = _TREE_DIRS * _TREE_FILES_PER_DIR
+        jobs = min(usable_cpu_count(), 8)
+        start = time.perf_counter()
+        counters = _scan_tree(self.tree, self.options, 1)
+        sequential = time.perf_counter() - start
+        self.assertEqual(counters.files_scanned, file_count)
+        start = time.perf_counter()
+        counters = _scan_tree(self.tree, self.options, jobs)
+        parallel = time.perf_counter() - start
+        self.assertEqual(counters.files_scanned, file_count)
+        print(
+            f"text_safety_scan scan {file_count} files: "
+            + f"sequential {file_count / sequential:.0f} files/s, "
+            + f"--jobs {jobs} {file_count / parallel:.0f} files/s",
+            file=sys.stderr,
+        )
+
+    def test_many_small_files(self) -> None:
+        """
+        Scanning a file in-process with every plugin must be cheaper than
+        starting a single plugin process for it.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fnames = []
+            for file_number in range(2000):
+                fnames.append(os.path.join(tmp_dir, f"{file_number}.py"))
+                with open(fnames[-1], "w", encoding="utf-8") as f:
+                    f.write("def main() -> int:\n    return 0\n" * 20)
+            start = time.perf_counter()
+            counters = _scan_in_process(fnames)
+            in_process = (time.perf_counter() - start) / len(fnames)
+            self.assertEqual(counters.overall_exit, 0)
+            start = time.perf_counter()
+            _scan_per_process(fnames[:50])
+            per_process = (time.perf_counter() - start) / 50
+        print(
+            "text_safety_scan small files: "
+            + f"one process per file {1 / per_process:.0f} files/s, "
+            + f"in-process {1 / in_process:.0f} files/s",
+            file=sys.stderr,
+        )
+        self.assertLess(in_process, per_process)
+
+    def test_scan_tree_cache(self) -> None:
+        """
+        Print the speed of scanning a tree and of re-scanning it unchanged
+        with --cache.
+        """
+        file_count = _TREE_DIRS * _TREE_FILES_PER_DIR
+        ## Outside of the tree, so that the cache does not scan itself.
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_file = os.path.join(cache_dir, "cache.sqlite")
+            start = time.perf_counter()
+            counters = _scan_tree(self.tree, self.options, 1, cache_file)
+            uncached = time.perf_counter() - start
+            self.assertEqual(counters.files_scanned, file_count)
+            start = time.perf_counter()
+            counters = _scan_tree(self.tree, self.options, 1, cache_file)
+            cached = time.perf_counter() - start
+            self.assertEqual(counters.files_scanned, file_count)
+        print(
+            f"text_safety_scan scan {file_count} files: "
+            + f"first run {file_count / uncached:.0f} files/s, "
+            + f"unchanged with --cache {file_count / cached:.0f} files/s",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
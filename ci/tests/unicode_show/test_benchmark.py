@@ -0,0 +1,329 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+"""
+Benchmarks for unicode_show: scanning lines, describing characters, the
+memory of huge lines, the clean ASCII fast path, --jobs and --batch.
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+from functools import partial
+from timeit import repeat
+from typing import Callable
+from unicode_show.unicode_show import (
+    classify_char,
+    colorize,
+    describe_char,
+    is_clean_ascii_file,
+    is_suspicious,
+    scan_file,
+    scan_line,
+    scan_paths,
+    usable_cpu_count,
+)
+
+## A minified source line, clean or with a few suspicious characters.
+_MINIFIED_LINE = "var a=function(b){return b+1};" * 20000 + "\n"
+_MINIFIED_SUSPICIOUS_LINE = _MINIFIED_LINE.replace(
+    "return", "re\u200bturn", 50
+)
+## Repeated homoglyphs and no-break spaces, as in a file full of them.
+_REPEATED_SUSPICIOUS = "\u00a0\u0430\u0435\u043e\u2009\u200b" * 20000
+_SOURCE_LINES = [
+    "def main() -> int:\n",
+    '    """Return the exit code."""\n',
+    "    return 0\n",
+] * 10000
+
+
+def _scan_line_per_char(line: str) -> bool:
+    """scan_line() as it was before it scanned runs with a regex."""
+    annotated = ""
+    descrs = []
+    for c in line:
+        if is_suspicious(c):
+            annotated += f"[U+{ord(c):04X}]"
+            descrs.append(f"   -> {describe_char(c)}")
+        else:
+            annotated += c
+    if annotated and annotated[-1] == "\n":
+        annotated = annotated[:-1]
+    annotated_stripped = annotated.rstrip()
+    for c in annotated[len(annotated_stripped) :]:
+        annotated_stripped += f"[U+{ord(c):04X}]"
+        descrs.append(f"   -> {describe_char(c)}")
+    if not descrs:
+        return False
+    print(annotated_stripped)
+    for descr in descrs:
+        print(descr)
+    return True
+
+
+def _scan_lines(scan: Callable[[str], bool], lines: list[str]) -> None:
+    """Scan every line, discarding the report."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for line in lines:
+            scan(line)
+
+
+def _scan_file_text(fname: str) -> bool:
+    """Decode and scan a file line by line, as main() did for every file."""
+    with open(
+        fname, "r", encoding="utf-8", errors="strict", newline="\n"
+    ) as f:
+        return scan_file(f, filename=fname)
+
+
+## Starts unicode-show the way the git review helpers did, once per file or
+## path.
+_UNICODE_SHOW_COMMAND = [
+    sys.executable,
+    "-Bsu",
+    "-c",
+    "import sys; from unicode_show.unicode_show import main; sys.exit(main())",
+]
+
+
+def _scan_per_process(fnames: list[str]) -> list[int]:
+    """Scan every file and its name with separate unicode-show processes."""
+    exit_codes = []
+    for fname in fnames:
+        for args, stdin_data in (
+            ([fname], b""),
+            ([], os.fsencode(fname) + b"\n"),
+        ):
+            exit_codes.append(
+                subprocess.run(
+                    [*_UNICODE_SHOW_COMMAND, *args],
+                    input=stdin_data,
+                    capture_output=True,
+                    check=False,
+                ).returncode
+            )
+    return exit_codes
+
+
+def _scan_batch(fnames: list[str]) -> list[int]:
+    """Scan every file and its name with one 'unicode-show --batch'."""
+    records = b"".join(
+        b"file\0"
+        + os.fsencode(fname)
+        + b"\0text\0"
+        + os.fsencode(fname)
+        + b"\n\0"
+        for fname in fnames
+    )
+    verdicts = subprocess.run(
+        [*_UNICODE_SHOW_COMMAND, "--batch"],
+        input=records,
+        capture_output=True,
+        check=True,
+    ).stdout.split(b"\0")
+    return [int(exit_code) for exit_code in verdicts[:-1:2]]
+
+
+def _scan_file_whole_lines(fname: str) -> bool:
+    """Scan a file reading every line as a whole, as scan_file() did."""
+    found = False
+    with open(
+        fname, "r", encoding="utf-8", errors="strict", newline="\n"
+    ) as f:
+        for lineno, line in enumerate(f, 1):
+            found = scan_line(line, lineno=lineno, filename=fname) or found
+    return found
+
+
+def _peak_memory(func: Callable[[], object]) -> int:
+    """Return the peak of memory allocated while running func, in bytes."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _describe_chars(describe: Callable[[str], str], chars: str) -> None:
+    """Describe every character."""
+    for c in chars:
+        describe(c)
+
+
+def _describe_char_uncached(c: str) -> str:
+    """describe_char() as it was before it looked characters up."""
+    return colorize(classify_char(c)[2], "")
+
+
+def _best_of(func: Callable[[], object]) -> float:
+    """Return the best wall time of several runs, in seconds."""
+    return min(repeat(func, number=1, repeat=5))
+
+
+class TestUnicodeShowBenchmark(unittest.TestCase):
+    """Benchmarks for scan_line()."""
+
+    def test_scan_line(self) -> None:
+        """
+        Scanning must not walk clean text character by character in Python.
+        """
+        for corpus_name, lines in (
+            ("source lines", _SOURCE_LINES),
+            ("minified clean", [_MINIFIED_LINE]),
+            ("minified suspicious", [_MINIFIED_SUSPICIOUS_LINE]),
+        ):
+            corpus_mib = sum(len(line) for line in lines) / 2**20
+            per_char = _best_of(
+                partial(_scan_lines, _scan_line_per_char, lines)
+            )
+            current = _best_of(partial(_scan_lines, scan_line, lines))
+            print(
+                f"unicode_show scan_line {corpus_name}: "
+                + f"per character {corpus_mib / per_char:.1f} MiB/s, "
+                + f"scan_line {corpus_mib / current:.1f} MiB/s",
+                file=sys.stderr,
+            )
+            self.assertLess(current, per_char)
+
+    def test_describe_char(self) -> None:
+        """
+        Describing repeated characters must not query the Unicode database
+        for every occurrence.
+        """
+        uncached = _best_of(
+            partial(
+                _describe_chars, _describe_char_uncached, _REPEATED_SUSPICIOUS
+            )
+        )
+        current = _best_of(
+            partial(_describe_chars, describe_char, _REPEATED_SUSPICIOUS)
+        )
+        chars = len(_REPEATED_SUSPICIOUS) / 10**6
+        print(
+            "unicode_show describe_char repeated characters: "
+            + f"uncached {chars / uncached:.2f} M chars/s, "
+            + f"table and cache {chars / current:.2f} M chars/s",
+            file=sys.stderr,
+        )
+        self.assertLess(current, uncached)
+
+    def test_long_line_memory(self) -> None:
+        """
+        Scanning a file that is one huge line must not hold the whole line
+        in memory.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = os.path.join(tmp_dir, "minified.js")
+            with open(fname, "w", encoding="utf-8", newline="\n") as f:
+                f.write(_MINIFIED_SUSPICIOUS_LINE.rstrip("\n") * 32)
+            corpus_mib = os.path.getsize(fname) / 2**20
+            ## Discard the report rather than collecting it in memory.
+            with open(os.devnull, "w", encoding="utf-8") as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    windows = _peak_memory(partial(_scan_file_text, fname))
+                    whole_line = _peak_memory(
+                        partial(_scan_file_whole_lines, fname)
+                    )
+        print(
+            f"unicode_show {corpus_mib:.0f} MiB single line peak memory: "
+            + f"whole line {whole_line / 2**20:.1f} MiB, "
+            + f"windows {windows / 2**20:.1f} MiB",
+            file=sys.stderr,
+        )
+        self.assertLess(windows, whole_line)
+
+    def test_clean_ascii_file(self) -> None:
+        """
+        Clean ASCII files must not be decoded and scanned line by line.
+        """
+        for corpus_name, lines in (
+            ("source file", _SOURCE_LINES),
+            ("minified file", [_MINIFIED_LINE] * 4),
+        ):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                fname = os.path.join(tmp_dir, "clean.txt")
+                with open(fname, "w", encoding="ascii", newline="\n") as f:
+                    f.writelines(lines)
+                corpus_mib = os.path.getsize(fname) / 2**20
+                per_line = _best_of(partial(_scan_file_text, fname))
+                fast_path = _best_of(partial(is_clean_ascii_file, fname))
+                self.assertFalse(_scan_file_text(fname))
+                self.assertTrue(is_clean_ascii_file(fname))
+            print(
+                f"unicode_show {corpus_name}: "
+                + f"per line {corpus_mib / per_line:.1f} MiB/s, "
+                + f"byte fast path {corpus_mib / fast_path:.1f} MiB/s",
+                file=sys.stderr,
+            )
+            self.assertLess(fast_path, per_line)
+
+    @unittest.skipIf(usable_cpu_count() < 2, "needs more than one CPU")
+    def test_scan_paths_jobs(self) -> None:
+        """
+        Scanning many files must scale with worker processes.
+        """
+        jobs = min(usable_cpu_count(), 8)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fnames = []
+            for file_number in range(400):
+                fnames.append(os.path.join(tmp_dir, f"{file_number}.txt"))
+                with open(fnames[-1], "w", encoding="utf-8") as f:
+                    f.writelines(_SOURCE_LINES[:1500])
+                    ## Not plain ASCII, every file takes the per-line path.
+                    f.write("caf\u00e9\n")
+            corpus_mib = sum(os.path.getsize(fname) for fname in fnames)
+            corpus_mib /= 2**20
+            with contextlib.redirect_stdout(io.StringIO()):
+                sequential = _best_of(partial(scan_paths, fnames, 1))
+                parallel = _best_of(partial(scan_paths, fnames, jobs))
+        print(
+            f"unicode_show {len(fnames)} files: "
+            + f"sequential {corpus_mib / sequential:.1f} MiB/s, "
+            + f"--jobs {jobs} {corpus_mib / parallel:.1f} MiB/s",
+            file=sys.stderr,
+        )
+        self.assertLess(parallel, sequential)
+
+    def test_batch(self) -> None:
+        """
+        Scanning the files and paths of a change set with --batch must be
+        cheaper than starting a process per file and per path.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fnames = []
+            for file_number in range(50):
+                fnames.append(os.path.join(tmp_dir, f"{file_number}.txt"))
+                with open(fnames[-1], "w", encoding="utf-8") as f:
+                    f.writelines(_SOURCE_LINES[:30])
+                    if file_number % 2:
+                        f.write("caf\u00e9\n")
+            start = time.perf_counter()
+            per_process_codes = _scan_per_process(fnames)
+            per_process = time.perf_counter() - start
+            start = time.perf_counter()
+            batch_codes = _scan_batch(fnames)
+            batch = time.perf_counter() - start
+        self.assertEqual(batch_codes, per_process_codes)
+        print(
+            f"unicode_show {len(fnames)} files and paths: "
+            + f"one process each {len(fnames) / per_process:.0f} files/s, "
+            + f"--batch {len(fnames) / batch:.0f} files/s",
+            file=sys.stderr,
+        )
+        self.assertLess(batch, per_process)
+
+
+if __name__ == "__main__":
+    unittest.main()
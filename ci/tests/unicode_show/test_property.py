@@ -15,11 +15,64 @@ Properties asserted for ALL inputs:
   - all printable-ASCII codepoints (U+0020..U+007E) except none are
     classified non-suspicious; this is the contract every other
     consumer of unicode_show implicitly relies on
+  - scan_line(line) prints and returns exactly what a straightforward
+    per-character scan built on is_suspicious() does
+  - is_clean_ascii() on the UTF-8 bytes of a text agrees with scan_file()
+    on the text itself
+  - scan_file() reports the same findings at the same columns no matter how
+    small the windows it reads long lines in are
 """
 
+import contextlib
+import io
 import unittest
+from unittest import mock
 from hypothesis import given, strategies as st
-from unicode_show.unicode_show import describe_char, is_suspicious
+from unicode_show import unicode_show
+from unicode_show.unicode_show import (
+    describe_char,
+    is_clean_ascii,
+    is_suspicious,
+    scan_file,
+    scan_line,
+)
+
+
+def _scan_line_reference(line: str) -> tuple[bool, str]:
+    """
+    Per-character reference for scan_line(), the way it was written before
+    it was optimized. Returns the result and the printed output.
+    """
+    annotated = ""
+    descrs = []
+    for c in line:
+        if is_suspicious(c):
+            annotated += f"[U+{ord(c):04X}]"
+            descrs.append(f"   -> {describe_char(c)}")
+        else:
+            annotated += c
+    if annotated and annotated[-1] == "\n":
+        annotated = annotated[:-1]
+    annotated_stripped = annotated.rstrip()
+    for c in annotated[len(annotated_stripped) :]:
+        annotated_stripped += f"[U+{ord(c):04X}]"
+        descrs.append(f"   -> {describe_char(c)}")
+    if not descrs:
+        return False, ""
+    return True, "".join(
+        f"{out}\n" for out in [f"<stdin>:1: {annotated_stripped}", *descrs]
+    )
+
+
+## Mostly clean text, with the characters that decide where runs start and
+## end, and where trailing whitespace begins.
+_SCAN_LINE_TEXT = st.lists(
+    st.one_of(
+        st.sampled_from(["a", "Z", "0", "~", " ", "\t", "\n", "\r", "\x0b"]),
+        st.sampled_from(["\x1b", "\u00a0", "\u200b", "\u202e", "\u3000"]),
+        st.characters(),
+    )
+).map("".join)
 
 
 class TestUnicodeShowProperties(unittest.TestCase):
@@ -50,6 +103,51 @@ class TestUnicodeShowProperties(unittest.TestCase):
             f"printable ASCII {c!r} (U+{ord(c):04X}) flagged as suspicious",
         )
 
+    @given(_SCAN_LINE_TEXT)
+    def test_scan_line_matches_reference(self, line: str) -> None:
+        """
+        scan_line() must annotate exactly like the per-character scan.
+        """
+        self.assertFalse(unicode_show.USE_COLOR)
+        stdout_buf = io.StringIO()
+        with contextlib.redirect_stdout(stdout_buf):
+            result = scan_line(line, lineno=1)
+        self.assertEqual(
+            (result, stdout_buf.getvalue()), _scan_line_reference(line)
+        )
+
+    @given(_SCAN_LINE_TEXT)
+    def test_is_clean_ascii_matches_scan_file(self, text: str) -> None:
+        """
+        The byte-level fast path must call a text clean exactly when the
+        full scan finds nothing to report.
+        """
+        try:
+            data = text.encode("utf-8")
+        except UnicodeEncodeError:
+            return
+        with contextlib.redirect_stdout(io.StringIO()):
+            found = scan_file(io.StringIO(text, newline="\n"))
+        self.assertEqual(is_clean_ascii(data), not found)
+
+    @given(_SCAN_LINE_TEXT, st.integers(min_value=1, max_value=8))
+    def test_scan_file_windows(self, text: str, window_size: int) -> None:
+        """
+        Reading lines in windows must not change the findings, including
+        trailing whitespace and a missing newline at a window boundary.
+        """
+        outputs = []
+        for size in (len(text) + 1, window_size):
+            stdout_buf = io.StringIO()
+            with (
+                mock.patch.object(unicode_show, "JSON_OUTPUT", True),
+                mock.patch.object(unicode_show, "LINE_WINDOW_SIZE", size),
+                contextlib.redirect_stdout(stdout_buf),
+            ):
+                found = scan_file(io.StringIO(text, newline="\n"))
+            outputs.append((found, stdout_buf.getvalue()))
+        self.assertEqual(outputs[1], outputs[0])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -6,26 +6,48 @@
 # pylint: disable=broad-exception-caught
 
 """
-Unified implementation of 'append', 'append-once', and 'overwrite' tools.
+Unified implementation of 'append', 'append-once', 'overwrite', and
+'append-batch' tools.
 """
 
 import sys
 import os
 import shutil
+from collections import deque
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-
+from typing import TextIO
 
 _executable_name: str = ""
 
 
+## Modes of the operations in an append-batch manifest.
+BATCH_MODES: tuple[str, ...] = ("append", "append-once", "overwrite")
+
+## Number of characters read at once while looking for a line.
+READ_CHUNK_SIZE: int = 2**20
+
+## Durability levels of writes: no fsync, fsync of the file, fsync of the
+## file and of its folder.
+SYNC_LEVELS: tuple[str, ...] = ("none", "file", "dir")
+
+
 def _print_usage() -> None:
     """
     Prints a brief usage message.
     """
 
+    options: str = "[--sync=none|file|dir] [--] "
+    if _executable_name == "append-batch":
+        print(
+            f"Usage: {_executable_name} {options}[MANIFEST]", file=sys.stderr
+        )
+        return
+    if _executable_name == "append":
+        options = "[--in-place] " + options
     print(
-        f"Usage: {_executable_name} /path/to/file 'content'",
+        f"Usage: {_executable_name} {options}/path/to/file 'content'",
         file=sys.stderr,
     )
 
@@ -46,41 +68,31 @@ def _print_error(error_msg: str) -> None:
     print(f"{_executable_name}: ERROR: {error_msg}", file=sys.stderr)
 
 
-# pylint: disable=too-many-return-statements, too-many-branches, too-many-statements
-def append_shared(executable_name: str, argv: list[str]) -> int:
+def _resolve_file_path(mode: str, orig_file_path: Path) -> Path | None:
     """
-    Single function called by all three tools to append to, add to, or
-    overwrite a file.
+    Returns the file written by mode for orig_file_path. 'overwrite' replaces
+    symlinks, the other modes write to their target. Prints an error and
+    returns None if the path cannot be resolved.
     """
 
-    # pylint: disable=global-statement
-    global _executable_name
-    _executable_name = executable_name
-    if executable_name not in ("append", "append-once", "overwrite"):
-        _print_error("Unrecognized executable!")
-        return 1
-
-    if len(argv) != 2:
-        _print_usage()
-        return 1
+    if mode == "overwrite":
+        return orig_file_path
+    try:
+        return orig_file_path.resolve()
+    except Exception:
+        _print_error(f"Error while resolving path '{str(orig_file_path)}'!")
+        return None
 
-    file_path: Path = Path(argv[0])
-    orig_file_path: Path = file_path
-    line_to_append: str = argv[1]
-    file_contents: str = ""
 
-    if not executable_name == "overwrite":
-        try:
-            file_path = file_path.resolve()
-        except Exception:
-            _print_error(
-                f"Error while resolving path '{str(orig_file_path)}'!"
-            )
-            return 1
+def _check_file(file_path: Path, orig_file_path: Path) -> bool | None:
+    """
+    Checks that file_path can be written. Returns whether it exists, prints
+    an error and returns None if it cannot be used.
+    """
 
     if not os.access(file_path.parent, os.W_OK):
         _print_error(f"Folder '{str(file_path.parent)}' is not writable!")
-        return 1
+        return None
 
     file_exists: bool = file_path.exists()
     file_is_file: bool = file_path.is_file()
@@ -88,55 +100,202 @@ def append_shared(executable_name: str, argv: list[str]) -> int:
     if file_exists:
         if not file_is_file:
             _print_error(f"'{str(orig_file_path)}' is not a file!")
-            return 1
-        if executable_name != "overwrite":
-            if not os.access(file_path, os.R_OK):
-                _print_error(f"File '{str(orig_file_path)}' not readable!")
-                return 1
-            with open(file_path, "r", encoding="utf-8") as f:
-                try:
-                    file_contents = f.read()
-                except Exception:
-                    _print_error(
-                        f"Error while reading file '{str(orig_file_path)}'!"
-                    )
-                    return 1
-                if len(file_contents) != 0 and not file_contents.endswith(
-                    "\n"
-                ):
-                    ## Fix a missing terminating newline. Some text editors
-                    ## will fail to write these properly and it will break our
-                    ## line appending if we don't correct it first.
-                    file_contents += "\n"
+            return None
     else:
         _print_info(f"File does not exist yet: '{str(orig_file_path)}'")
 
+    return file_exists
+
+
+def _iter_chunks(f: TextIO, file_parts: list[str]) -> Iterator[str]:
+    """
+    Yields the contents of f in chunks, each also appended to file_parts,
+    and a newline if the file lacks a terminating one. Some text editors
+    will fail to write these properly and it will break our line appending
+    if we don't correct it first.
+    """
+
+    chunk: str = ""
+    while new_chunk := f.read(READ_CHUNK_SIZE):
+        chunk = new_chunk
+        file_parts.append(chunk)
+        yield chunk
+    if chunk and not chunk.endswith("\n"):
+        file_parts.append("\n")
+        yield "\n"
+
+
+def _contains_line(chunks: Iterable[str], line_to_append: str) -> bool:
+    """
+    Returns whether line_to_append, which ends with a newline, occurs on
+    whole lines of the concatenated chunks. Stops consuming chunks at the
+    first match and only keeps as much of the previous chunk as a match
+    could span.
+    """
+
+    ## Look for a whole line match, not just a substring match. The extra
+    ## newline at the beginning of the pattern ensures that line_to_append
+    ## occurs on a line by itself, the extra newline in front of the first
+    ## chunk allows it to match the first line.
+    pattern: str = "\n" + line_to_append
+    tail: str = "\n"
+    for chunk in chunks:
+        window: str = tail + chunk
+        if pattern in window:
+            return True
+        tail = window[1 - len(pattern) :]
+    return False
+
+
+def _read_file(
+    file_path: Path,
+    orig_file_path: Path,
+    file_parts: list[str],
+    line_to_append: str | None,
+) -> bool | None:
+    """
+    Reads file_path into file_parts, with a missing terminating newline
+    fixed. If line_to_append is given, stops reading as soon as it is found.
+    Returns whether it was found, prints an error and returns None if the
+    file cannot be read.
+    """
+
+    if not os.access(file_path, os.R_OK):
+        _print_error(f"File '{str(orig_file_path)}' not readable!")
+        return None
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            chunks: Iterator[str] = _iter_chunks(f, file_parts)
+            if line_to_append is not None:
+                return _contains_line(chunks, line_to_append)
+            deque(chunks, maxlen=0)
+    except Exception:
+        _print_error(f"Error while reading file '{str(orig_file_path)}'!")
+        return None
+    return False
+
+
+class _FileContents:
+    """
+    The contents of a file being edited, kept as a list of parts. If use_set
+    is set, single lines are looked up in a set of all lines, built on the
+    first lookup, which pays off when checking many lines.
+    """
+
+    def __init__(self, file_parts: list[str], use_set: bool) -> None:
+        self.file_parts: list[str] = file_parts
+        self._use_set: bool = use_set
+        self._line_set: set[str] | None = None
+
+    def contains(self, line_to_append: str) -> bool:
+        """
+        Returns whether line_to_append occurs on whole lines.
+        """
+
+        if not self._use_set or "\n" in line_to_append[:-1]:
+            return _contains_line(self.file_parts, line_to_append)
+        if self._line_set is None:
+            self._line_set = set(self.text()[:-1].split("\n"))
+            if not self.file_parts:
+                self._line_set.clear()
+        return line_to_append[:-1] in self._line_set
+
+    def append(self, line_to_append: str) -> None:
+        """
+        Appends line_to_append.
+        """
+
+        self.file_parts.append(line_to_append)
+        if self._line_set is not None:
+            self._line_set.update(line_to_append[:-1].split("\n"))
+
+    def overwrite(self, line_to_append: str) -> None:
+        """
+        Replaces the contents with line_to_append.
+        """
+
+        self.file_parts = [line_to_append]
+        self._line_set = None
+
+    def text(self) -> str:
+        """
+        Returns the contents as one string.
+        """
+
+        return "".join(self.file_parts)
+
+
+def _apply_line(
+    file_contents: _FileContents,
+    mode: str,
+    orig_file_path: Path,
+    line_to_append: str,
+) -> bool:
+    """
+    Appends line_to_append to file_contents, or replaces them with it for
+    'overwrite'. Returns False if 'append-once' finds the line already.
+    """
+
     if not line_to_append.endswith("\n"):
         line_to_append += "\n"
 
-    if executable_name == "append-once":
-        ## Look for a whole line match, not just a substring match. The extra
-        ## newline at the beginning of line_to_append ensures that
-        ## line_to_append occurs on a line by itself, the extra newline at the
-        ## beginning of file_contents allows line_to_append to match the first
-        ## line of the file.
-        if "\n" + line_to_append in "\n" + file_contents:
-            _print_info(f"Line already exists in: '{str(orig_file_path)}'")
-            return 0
-
-    file_contents += line_to_append
+    if mode == "append-once" and file_contents.contains(line_to_append):
+        _print_info(f"Line already exists in: '{str(orig_file_path)}'")
+        return False
 
-    if executable_name == "overwrite":
+    if mode == "overwrite":
         _print_info(f"Overwriting file: '{str(orig_file_path)}'")
+        file_contents.overwrite(line_to_append)
     else:
         _print_info(f"Appending data to: '{str(orig_file_path)}'")
+        file_contents.append(line_to_append)
+    return True
+
+
+def _fsync_dir(dir_path: Path) -> None:
+    """
+    Fsyncs the folder dir_path, which makes renames and newly created
+    files in it durable.
+    """
+
+    dir_fd: int = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _write_file(
+    file_path: Path, orig_file_path: Path, file_contents: str, sync: str
+) -> int:
+    """
+    Atomically replaces file_path with file_contents, keeping its mode.
+    The temporary file is created in the folder of file_path, so that it
+    can be renamed over it. If that fails, it is created in the default
+    temporary folder and moved, which may copy it. sync is one of
+    SYNC_LEVELS. Returns 0 on success, prints an error and returns 1
+    otherwise.
+    """
 
     temp_file = None
     try:
-        # pylint: disable=consider-using-with
-        temp_file = NamedTemporaryFile(mode="w", delete=False)
+        same_dir: bool = True
+        try:
+            # pylint: disable=consider-using-with
+            temp_file = NamedTemporaryFile(
+                mode="w",
+                dir=file_path.parent,
+                prefix=f".{file_path.name}.",
+                delete=False,
+            )
+        except OSError:
+            same_dir = False
+            # pylint: disable=consider-using-with
+            temp_file = NamedTemporaryFile(mode="w", delete=False)
         temp_file.write(file_contents)
         temp_file.flush()
+        if sync != "none":
+            os.fsync(temp_file.fileno())
         temp_file.close()
         if file_path.exists():
             shutil.copymode(file_path, temp_file.name)
@@ -145,7 +304,10 @@ def append_shared(executable_name: str, argv: list[str]) -> int:
             os.umask(current_umask)
             new_mode = 0o666 & (current_umask ^ 0o777)
             os.chmod(temp_file.name, new_mode)
-        shutil.move(temp_file.name, file_path)
+        if same_dir:
+            os.replace(temp_file.name, file_path)
+        else:
+            shutil.move(temp_file.name, file_path)
     except Exception:
         try:
             if temp_file is not None:
@@ -162,4 +324,289 @@ def append_shared(executable_name: str, argv: list[str]) -> int:
         )
         return 1
 
+    try:
+        if not same_dir and sync != "none":
+            with open(file_path, "rb") as f:
+                os.fsync(f.fileno())
+        if sync == "dir":
+            _fsync_dir(file_path.parent)
+    except Exception:
+        _print_error(f"Error while syncing file '{str(orig_file_path)}'!")
+        return 1
+
+    return 0
+
+
+def _append_in_place(
+    file_path: Path, orig_file_path: Path, line_to_append: str, sync: str
+) -> int:
+    """
+    Appends line_to_append to file_path in place, opened with O_APPEND, and
+    syncs it according to sync, one of SYNC_LEVELS. Only the last byte of
+    the file is read, to fix a missing terminating newline, so the rest of
+    it is neither copied nor checked to be valid UTF-8. Returns 0 on
+    success, prints an error and returns 1 otherwise.
+    """
+
+    if file_path.exists():
+        if not file_path.is_file():
+            _print_error(f"'{str(orig_file_path)}' is not a file!")
+            return 1
+    else:
+        _print_info(f"File does not exist yet: '{str(orig_file_path)}'")
+
+    if not line_to_append.endswith("\n"):
+        line_to_append += "\n"
+
+    try:
+        fd: int = os.open(
+            file_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o666
+        )
+    except Exception:
+        _print_error(f"Error while opening file '{str(orig_file_path)}'!")
+        return 1
+    try:
+        data: bytes = line_to_append.encode("utf-8")
+        file_size: int = os.fstat(fd).st_size
+        if file_size != 0 and os.pread(fd, 1, file_size - 1) != b"\n":
+            ## Fix a missing terminating newline, see _iter_chunks().
+            data = b"\n" + data
+        _print_info(f"Appending data to: '{str(orig_file_path)}'")
+        view: memoryview = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+        if sync != "none":
+            os.fsync(fd)
+        if sync == "dir":
+            _fsync_dir(file_path.parent)
+    except Exception:
+        _print_error(f"Error while writing file '{str(orig_file_path)}'!")
+        return 1
+    finally:
+        os.close(fd)
+
     return 0
+
+
+def _parse_manifest(manifest: bytes) -> list[tuple[str, Path, str]] | None:
+    """
+    Splits an append-batch manifest into (mode, path, line) operations. The
+    manifest is a sequence of 'mode\\0path\\0line\\0' records. Prints an
+    error and returns None if it is malformed.
+    """
+
+    fields: list[bytes] = manifest.split(b"\0")
+    if fields.pop() != b"" or len(fields) % 3 != 0:
+        _print_error("Manifest does not consist of NUL-terminated records!")
+        return None
+    operations: list[tuple[str, Path, str]] = []
+    for index in range(0, len(fields), 3):
+        mode: str = os.fsdecode(fields[index])
+        if mode not in BATCH_MODES:
+            _print_error(f"Unrecognized mode in record {index // 3 + 1}!")
+            return None
+        operations.append(
+            (
+                mode,
+                Path(os.fsdecode(fields[index + 1])),
+                os.fsdecode(fields[index + 2]),
+            )
+        )
+    return operations
+
+
+def _group_operations(
+    operations: list[tuple[str, Path, str]],
+) -> dict[Path, list[tuple[str, Path, str]]] | None:
+    """
+    Groups operations by the file they write, keeping their order. Prints an
+    error and returns None if a path cannot be resolved.
+    """
+
+    groups: dict[Path, list[tuple[str, Path, str]]] = {}
+    overwritten: set[Path] = set()
+    for operation in operations:
+        mode, orig_file_path, _ = operation
+        file_path: Path | None = _resolve_file_path(mode, orig_file_path)
+        if file_path is None:
+            return None
+        if mode == "overwrite":
+            overwritten.add(Path(os.path.abspath(orig_file_path)))
+        elif Path(os.path.abspath(orig_file_path)) in overwritten:
+            ## An earlier operation replaced the symlink by a file.
+            file_path = orig_file_path
+        groups.setdefault(Path(os.path.abspath(file_path)), []).append(
+            operation
+        )
+    return groups
+
+
+def _apply_group(
+    file_path: Path, operations: list[tuple[str, Path, str]], sync: str
+) -> int:
+    """
+    Applies all operations on file_path in one read-modify-write, synced
+    according to sync. Returns 0 on success, prints an error and returns 1
+    otherwise, in which case the file is left untouched.
+    """
+
+    mode, orig_file_path, line_to_append = operations[0]
+    file_exists: bool | None = _check_file(file_path, orig_file_path)
+    if file_exists is None:
+        return 1
+
+    file_parts: list[str] = []
+    if file_exists and mode != "overwrite":
+        find_line: str | None = None
+        if len(operations) == 1 and mode == "append-once":
+            ## A single line is looked for while reading, which stops at the
+            ## first match instead of reading the whole file.
+            find_line = line_to_append
+            if not find_line.endswith("\n"):
+                find_line += "\n"
+        found: bool | None = _read_file(
+            file_path, orig_file_path, file_parts, find_line
+        )
+        if found is None:
+            return 1
+        if found:
+            _print_info(f"Line already exists in: '{str(orig_file_path)}'")
+            return 0
+        if find_line is not None:
+            operations = [("append", orig_file_path, line_to_append)]
+
+    append_once_count: int = sum(
+        operation[0] == "append-once" for operation in operations
+    )
+    file_contents: _FileContents = _FileContents(
+        file_parts, append_once_count > 1
+    )
+    changed: bool = False
+    for operation in operations:
+        if _apply_line(file_contents, *operation):
+            changed = True
+    if not changed:
+        return 0
+    return _write_file(file_path, orig_file_path, file_contents.text(), sync)
+
+
+def _append_batch(argv: list[str], sync: str) -> int:
+    """
+    Applies the operations of the manifest in argv, or stdin if argv is
+    empty or '-'. Each file is read and atomically replaced once, synced
+    according to sync.
+    """
+
+    if len(argv) > 1:
+        _print_usage()
+        return 1
+
+    manifest: bytes
+    try:
+        if not argv or argv[0] == "-":
+            manifest = sys.stdin.buffer.read()
+        else:
+            manifest = Path(argv[0]).read_bytes()
+    except Exception:
+        _print_error("Error while reading manifest!")
+        return 1
+
+    operations: list[tuple[str, Path, str]] | None = _parse_manifest(manifest)
+    if operations is None:
+        return 1
+    groups: dict[Path, list[tuple[str, Path, str]]] | None = _group_operations(
+        operations
+    )
+    if groups is None:
+        return 1
+
+    exit_code: int = 0
+    for file_path, file_operations in groups.items():
+        if _apply_group(file_path, file_operations, sync) != 0:
+            exit_code = 1
+    return exit_code
+
+
+# pylint: disable=too-few-public-methods
+class _Options:
+    """
+    Options of the tools.
+    """
+
+    def __init__(self) -> None:
+        self.in_place: bool = False
+        self.sync: str | None = None
+
+
+def _parse_options(argv: list[str]) -> tuple[_Options, list[str]] | None:
+    """
+    Splits the leading options from argv. Prints an error and returns None
+    if an option value is invalid.
+    """
+
+    options: _Options = _Options()
+    while argv:
+        option: str = argv[0]
+        name, _, value = option.partition("=")
+        if option == "--in-place":
+            options.in_place = True
+        elif name == "--sync":
+            if value not in SYNC_LEVELS:
+                _print_error(f"Invalid durability level: '{value}'!")
+                return None
+            options.sync = value
+        elif option != "--":
+            break
+        argv = argv[1:]
+        if option == "--":
+            break
+    return options, argv
+
+
+# pylint: disable=too-many-return-statements
+def append_shared(executable_name: str, argv: list[str]) -> int:
+    """
+    Single function called by all tools to append to, add to, or
+    overwrite a file, or to apply a manifest of such operations.
+    """
+
+    # pylint: disable=global-statement
+    global _executable_name
+    _executable_name = executable_name
+    if executable_name not in (*BATCH_MODES, "append-batch"):
+        _print_error("Unrecognized executable!")
+        return 1
+
+    parsed_options: tuple[_Options, list[str]] | None = _parse_options(argv)
+    if parsed_options is None:
+        _print_usage()
+        return 1
+    options, argv = parsed_options
+    ## Appending in place is meant for durable logs, so it syncs the file
+    ## by default.
+    sync: str = options.sync or ("file" if options.in_place else "none")
+
+    if options.in_place and executable_name != "append":
+        _print_error("Option '--in-place' is only supported by 'append'!")
+        return 1
+
+    if executable_name == "append-batch":
+        return _append_batch(argv, sync)
+
+    if len(argv) != 2:
+        _print_usage()
+        return 1
+
+    orig_file_path: Path = Path(argv[0])
+    file_path: Path | None = _resolve_file_path(
+        executable_name, orig_file_path
+    )
+    if file_path is None:
+        return 1
+
+    if options.in_place:
+        return _append_in_place(file_path, orig_file_path, argv[1], sync)
+
+    return _apply_group(
+        file_path, [(executable_name, orig_file_path, argv[1])], sync
+    )
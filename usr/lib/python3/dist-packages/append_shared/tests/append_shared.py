@@ -7,12 +7,19 @@
 Tests for the append_shared tools.
 """
 
+# pylint: disable=too-many-lines
+
 import os
 import stat
 import shutil
+import sys
+from contextlib import chdir
+from io import BytesIO, TextIOWrapper
 from pathlib import Path
-from tempfile import TemporaryDirectory
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from typing import Any
 from unittest import TestCase
+from unittest.mock import patch
 from append_shared.append_shared import append_shared
 
 
@@ -53,6 +60,15 @@ class TestAppendShared(TestCase):
 
         return os.stat(file_path).st_mode & 0o7777
 
+    @staticmethod
+    def _append_batch(manifest: bytes) -> int:
+        """
+        Runs 'append-batch' with manifest on stdin.
+        """
+
+        with patch.object(sys, "stdin", TextIOWrapper(BytesIO(manifest))):
+            return append_shared("append-batch", [])
+
     def test_reject_unrecognized_executable(self) -> None:
         """
         Tests if append-shared properly rejects an unrecognized executable
@@ -727,3 +743,381 @@ class TestAppendShared(TestCase):
         )
         self.assertEqual(TestAppendShared._get_perms_str(target_file), 0o600)
         os.unlink(target_file)
+
+    def test_append_batch(self) -> None:
+        """
+        Tests if 'append-batch' applies all operations of a manifest in
+        order, grouped by file.
+        """
+
+        target_file: str = self.work_dir + "/append_batch"
+        target_file_path: Path = Path(target_file)
+        target_file_path.write_text("line 1", encoding="utf-8")
+        other_file: str = self.work_dir + "/append_batch_other"
+        other_file_path: Path = Path(other_file)
+        manifest: bytes = (
+            f"append-once\0{target_file}\0line 1\0"
+            + f"append\0{other_file}\0other 1\0"
+            + f"append-once\0{target_file}\0line 2\0"
+            + f"append-once\0{target_file}\0line 2\0"
+            + f"append\0{target_file}\0line 1\0"
+            + f"overwrite\0{other_file}\0other 2\0"
+            + f"append-once\0{other_file}\0other 3\0"
+        ).encode()
+        self.assertEqual(TestAppendShared._append_batch(manifest), 0)
+        self.assertEqual(
+            target_file_path.read_text(encoding="utf-8"),
+            "line 1\nline 2\nline 1\n",
+        )
+        self.assertEqual(
+            other_file_path.read_text(encoding="utf-8"), "other 2\nother 3\n"
+        )
+        self.assertEqual(TestAppendShared._get_perms_str(target_file), 0o600)
+        self.assertEqual(TestAppendShared._get_perms_str(other_file), 0o600)
+        os.unlink(target_file)
+        os.unlink(other_file)
+
+    def test_append_batch_manifest_file(self) -> None:
+        """
+        Tests if 'append-batch' reads a manifest file and skips writing files
+        it does not change.
+        """
+
+        target_file: str = self.work_dir + "/append_batch_manifest_file"
+        target_file_path: Path = Path(target_file)
+        target_file_path.write_text("line 1", encoding="utf-8")
+        manifest_file: str = self.work_dir + "/append_batch_manifest"
+        Path(manifest_file).write_bytes(
+            f"append-once\0{target_file}\0line 1\0".encode()
+        )
+        self.assertEqual(append_shared("append-batch", [manifest_file]), 0)
+        self.assertEqual(
+            target_file_path.read_text(encoding="utf-8"), "line 1"
+        )
+        self.assertEqual(
+            append_shared("append-batch", [manifest_file, "too_many"]), 1
+        )
+        os.unlink(target_file)
+        os.unlink(manifest_file)
+
+    def test_append_batch_reject_malformed_manifest(self) -> None:
+        """
+        Tests if 'append-batch' rejects a malformed manifest without writing
+        any file.
+        """
+
+        target_file: str = self.work_dir + "/append_batch_malformed"
+        target_file_path: Path = Path(target_file)
+        for manifest in (
+            f"append\0{target_file}\0line 1".encode(),
+            f"append\0{target_file}\0".encode(),
+            (
+                f"append\0{target_file}\0line 1\0"
+                + f"nope\0{target_file}\0line 2\0"
+            ).encode(),
+        ):
+            self.assertEqual(TestAppendShared._append_batch(manifest), 1)
+            self.assertFalse(target_file_path.exists())
+
+    def test_append_batch_keep_failed_file(self) -> None:
+        """
+        Tests if 'append-batch' leaves a file untouched if one of its
+        operations fails, while still applying those on other files.
+        """
+
+        target_file: str = self.work_dir + "/append_batch_failed"
+        target_file_path: Path = Path(target_file)
+        target_file_path.write_bytes(b"\xff")
+        other_file: str = self.work_dir + "/append_batch_failed_other"
+        other_file_path: Path = Path(other_file)
+        manifest: bytes = (
+            f"append\0{target_file}\0line 1\0"
+            + f"append\0{other_file}\0other 1\0"
+            + f"overwrite\0{target_file}\0line 2\0"
+        ).encode()
+        self.assertEqual(TestAppendShared._append_batch(manifest), 1)
+        self.assertEqual(target_file_path.read_bytes(), b"\xff")
+        self.assertEqual(
+            other_file_path.read_text(encoding="utf-8"), "other 1\n"
+        )
+        os.unlink(target_file)
+        os.unlink(other_file)
+
+    def test_append_batch_symlink(self) -> None:
+        """
+        Tests if 'append-batch' appends to a symlink's target until an
+        'overwrite' breaks the symlink, like the separate tools would.
+        """
+
+        target_file: str = self.work_dir + "/append_batch_symlink"
+        target_file_path: Path = Path(target_file)
+        target_file_path.write_text("line 1\n", encoding="utf-8")
+        target_symlink: str = self.work_dir + "/append_batch_symlink_link"
+        target_symlink_path: Path = Path(target_symlink)
+        os.symlink(target_file, target_symlink)
+        manifest: bytes = (
+            f"append\0{target_symlink}\0line 2\0"
+            + f"overwrite\0{target_symlink}\0link 1\0"
+            + f"append\0{target_symlink}\0link 2\0"
+        ).encode()
+        self.assertEqual(TestAppendShared._append_batch(manifest), 0)
+        self.assertEqual(
+            target_file_path.read_text(encoding="utf-8"), "line 1\nline 2\n"
+        )
+        self.assertFalse(target_symlink_path.is_symlink())
+        self.assertEqual(
+            target_symlink_path.read_text(encoding="utf-8"),
+            "link 1\nlink 2\n",
+        )
+        os.unlink(target_file)
+        os.unlink(target_symlink)
+
+    def test_append_once_multiple_lines(self) -> None:
+        """
+        Tests if 'append-once' only finds text spanning several lines if it
+        occurs on whole consecutive lines.
+        """
+
+        target_file: str = self.work_dir + "/append_once_multiple_lines"
+        target_file_path: Path = Path(target_file)
+        target_file_path.write_text("line 1\nline 2\nline 3", encoding="utf-8")
+        self.assertEqual(
+            append_shared("append-once", [target_file, "line 2\nline 3"]), 0
+        )
+        self.assertEqual(
+            target_file_path.read_text(encoding="utf-8"),
+            "line 1\nline 2\nline 3",
+        )
+        self.assertEqual(
+            append_shared("append-once", [target_file, "ine 1\nline 2"]), 0
+        )
+        self.assertEqual(
+            target_file_path.read_text(encoding="utf-8"),
+            "line 1\nline 2\nline 3\nine 1\nline 2\n",
+        )
+        os.unlink(target_file)
+
+    def test_append_batch_append_once_lines(self) -> None:
+        """
+        Tests if 'append-batch' finds lines that exist in the file or were
+        appended by earlier operations when checking many lines.
+        """
+
+        target_file: str = self.work_dir + "/append_batch_append_once_lines"
+        target_file_path: Path = Path(target_file)
+        for contents, expected in (
+            ("", "\nline 1\nline 2\nline 3\n"),
+            ("line 1\nline 2", "line 1\nline 2\n\nline 3\n"),
+        ):
+            target_file_path.write_text(contents, encoding="utf-8")
+            manifest: bytes = "".join(
+                f"append-once\0{target_file}\0{line}\0"
+                for line in (
+                    "",
+                    "line 1",
+                    "",
+                    "line 2\n",
+                    "line 1\nline 2",
+                    "line 3",
+                    "line 3",
+                )
+            ).encode()
+            self.assertEqual(TestAppendShared._append_batch(manifest), 0)
+            self.assertEqual(
+                target_file_path.read_text(encoding="utf-8"), expected
+            )
+        os.unlink(target_file)
+
+    def test_append_in_place(self) -> None:
+        """
+        Tests if 'append --in-place' creates a file and appends to it in
+        place, repairing a missing trailing newline.
+        """
+
+        target_file: str = self.work_dir + "/append_in_place"
+        target_file_path: Path = Path(target_file)
+        self.assertEqual(
+            append_shared("append", ["--in-place", target_file, "line 1"]), 0
+        )
+        self.assertEqual(
+            target_file_path.read_text(encoding="utf-8"), "line 1\n"
+        )
+        self.assertEqual(TestAppendShared._get_perms_str(target_file), 0o600)
+        target_file_path.write_text("line 1\nline 2", encoding="utf-8")
+        os.chmod(target_file, 0o640)
+        inode: int = os.stat(target_file).st_ino
+        self.assertEqual(
+            append_shared("append", ["--in-place", target_file, "line 1"]), 0
+        )
+        self.assertEqual(
+            target_file_path.read_text(encoding="utf-8"),
+            "line 1\nline 2\nline 1\n",
+        )
+        self.assertEqual(os.stat(target_file).st_ino, inode)
+        self.assertEqual(TestAppendShared._get_perms_str(target_file), 0o640)
+        os.unlink(target_file)
+
+    def test_append_in_place_symlink(self) -> None:
+        """
+        Tests if 'append --in-place' writes to a symlink's target.
+        """
+
+        target_file: str = self.work_dir + "/append_in_place_symlink"
+        target_file_path: Path = Path(target_file)
+        target_file_path.write_text("line 1\n", encoding="utf-8")
+        target_symlink: str = self.work_dir + "/append_in_place_symlink_link"
+        os.symlink(target_file, target_symlink)
+        self.assertEqual(
+            append_shared("append", ["--in-place", target_symlink, "line 2"]),
+            0,
+        )
+        self.assertTrue(os.path.islink(target_symlink))
+        self.assertEqual(
+            target_file_path.read_text(encoding="utf-8"), "line 1\nline 2\n"
+        )
+        os.unlink(target_file)
+        os.unlink(target_symlink)
+
+    def test_append_in_place_skip_validation(self) -> None:
+        """
+        Tests if 'append --in-place' appends to a file containing invalid
+        UTF-8 characters without reading it.
+        """
+
+        target_file: str = self.work_dir + "/append_in_place_invalid_utf8"
+        target_file_path: Path = Path(target_file)
+        target_file_path.write_bytes(b"\xff")
+        self.assertEqual(
+            append_shared("append", ["--in-place", target_file, "line 1"]), 0
+        )
+        self.assertEqual(target_file_path.read_bytes(), b"\xff\nline 1\n")
+        os.unlink(target_file)
+
+    def test_append_in_place_reject(self) -> None:
+        """
+        Tests if '--in-place' is rejected for directories and by tools other
+        than 'append', and if '--' ends the options.
+        """
+
+        self.assertEqual(
+            append_shared("append", ["--in-place", self.work_dir, "line 1"]),
+            1,
+        )
+        target_file: str = self.work_dir + "/append_in_place_reject"
+        for executable_name in ("append-once", "overwrite"):
+            self.assertEqual(
+                append_shared(
+                    executable_name, ["--in-place", target_file, "line 1"]
+                ),
+                1,
+            )
+        self.assertFalse(Path(target_file).exists())
+        self.assertEqual(
+            append_shared(
+                "append", ["--in-place", "--", target_file, "line 1"]
+            ),
+            0,
+        )
+        self.assertEqual(
+            Path(target_file).read_text(encoding="utf-8"), "line 1\n"
+        )
+        with chdir(self.work_dir):
+            self.assertEqual(
+                append_shared("append", ["--", "--in-place", "line 1"]), 0
+            )
+            ## A file named '--' needs '--' before it.
+            self.assertEqual(append_shared("append", ["--", "line 1"]), 1)
+            self.assertFalse(Path("--").exists())
+            self.assertEqual(
+                append_shared("append", ["--", "--", "line 1"]), 0
+            )
+            self.assertEqual(
+                Path("--").read_text(encoding="utf-8"), "line 1\n"
+            )
+            os.unlink("--")
+        self.assertEqual(
+            Path(self.work_dir, "--in-place").read_text(encoding="utf-8"),
+            "line 1\n",
+        )
+        os.unlink(Path(self.work_dir, "--in-place"))
+        os.unlink(target_file)
+
+    def test_append_temp_file_in_target_dir(self) -> None:
+        """
+        Tests if files are replaced by a temporary file created next to them
+        and renamed, falling back to the default temporary folder.
+        """
+
+        target_dir: str = self.work_dir + "/append_temp_file_in_target_dir"
+        os.mkdir(target_dir)
+        target_file: str = target_dir + "/file"
+        target_file_path: Path = Path(target_file)
+        target_file_path.write_text("line 1\n", encoding="utf-8")
+        temp_dirs: list[str | None] = []
+
+        def named_temporary_file(**kwargs: Any) -> Any:
+            """
+            Fails to create the second temporary file in the target folder.
+            """
+
+            temp_dirs.append(kwargs.get("dir"))
+            if kwargs.get("dir") is not None and len(temp_dirs) > 1:
+                raise PermissionError
+            return NamedTemporaryFile(**kwargs)
+
+        with patch(
+            "append_shared.append_shared.NamedTemporaryFile",
+            named_temporary_file,
+        ):
+            self.assertEqual(
+                append_shared("append", [target_file, "line 2"]), 0
+            )
+            self.assertEqual(
+                append_shared("append", [target_file, "line 3"]), 0
+            )
+        self.assertEqual(temp_dirs, [Path(target_dir), Path(target_dir), None])
+        self.assertEqual(os.listdir(target_dir), ["file"])
+        self.assertEqual(
+            target_file_path.read_text(encoding="utf-8"),
+            "line 1\nline 2\nline 3\n",
+        )
+        shutil.rmtree(target_dir)
+
+    def test_sync_levels(self) -> None:
+        """
+        Tests if the durability levels fsync the file and its folder.
+        """
+
+        target_file: str = self.work_dir + "/sync_levels"
+        target_file_path: Path = Path(target_file)
+        for argv, fsync_count in (
+            ([], 0),
+            (["--sync=none"], 0),
+            (["--sync=file"], 1),
+            (["--sync=dir"], 2),
+            (["--in-place"], 1),
+            (["--in-place", "--sync=none"], 0),
+            (["--sync=dir", "--in-place"], 2),
+        ):
+            target_file_path.write_text("line 1\n", encoding="utf-8")
+            with patch.object(os, "fsync", wraps=os.fsync) as fsync:
+                self.assertEqual(
+                    append_shared("append", [*argv, target_file, "line 2"]),
+                    0,
+                )
+            self.assertEqual(fsync.call_count, fsync_count, argv)
+            self.assertEqual(
+                target_file_path.read_text(encoding="utf-8"),
+                "line 1\nline 2\n",
+            )
+        for executable_name in ("append-once", "overwrite", "append"):
+            self.assertEqual(
+                append_shared(
+                    executable_name, ["--sync=disk", target_file, "line 3"]
+                ),
+                1,
+            )
+        self.assertEqual(
+            target_file_path.read_text(encoding="utf-8"), "line 1\nline 2\n"
+        )
+        os.unlink(target_file)
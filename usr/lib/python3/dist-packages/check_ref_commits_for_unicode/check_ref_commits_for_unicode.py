@@ -0,0 +1,258 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+"""
+check_ref_commits_for_unicode.py: Scan the commits a git ref adds on top of
+HEAD for suspicious Unicode.
+
+Exit codes:
+  0 - no suspicious unicode found in the ref's new commits
+  1 - suspicious unicode found
+  2 - error (no target ref given, ref does not exist, not inside a git
+      working tree, no new commits in the ref, or a git failure)
+
+This mirrors unicode-show (0 clean / 1 found / 2 error) so a caller can tell
+a real detection apart from a usage or setup error by the exit code, rather
+than both sharing exit 1.
+"""
+
+import subprocess
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from re import Pattern, compile as re_compile
+from text_safety_scan import text_safety_scan_lib
+from text_safety_scan.text_safety_scan_lib import detect_log_colors, log
+from unicode_show import unicode_show
+from unicode_show.unicode_show import SCAN_CLEAN, scan_bytes
+
+PROG: str = "check-ref-commits-for-unicode"
+
+## The commit message is intentionally included since it could contain
+## malicious unicode too.
+## Identity and message are scanned WHOLE and unfiltered -- a commit
+## message line may legitimately start with '-', and the removal filter
+## below must never reach it.
+COMMIT_META_FORMAT: str = (
+    "Author: %an%nAuthor email: %ae%nCommitter: %cn%nCommitter email: %ce%n%B"
+)
+## Every commit in the output of 'git log' starts with a marker holding its
+## hash and ends its metadata with a NUL byte. Formatted metadata never
+## contains NUL bytes, git cuts messages at the first one.
+COMMIT_MARKER_RE: Pattern[bytes] = re_compile(b"\0COMMIT ([0-9a-f]+)\0")
+
+
+def die(exit_code: int, message: str) -> int:
+    """
+    Log an error and return exit_code, like die() in log_run_die.sh.
+    """
+
+    log("error", message, source=PROG)
+    log("error", "Aborting.", source=PROG)
+    return exit_code
+
+
+def git_output(args: list[str], quiet: bool = False) -> bytes | None:
+    """
+    Run git with args and return its stdout, or None if it failed. stderr is
+    passed through unless quiet is set.
+    """
+
+    try:
+        return subprocess.run(
+            ["git", *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL if quiet else None,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def split_commits(
+    log_output: bytes, commit_list: list[str]
+) -> list[tuple[bytes, bytes]] | None:
+    """
+    Split the output of 'git log' run with the markers of COMMIT_MARKER_RE
+    into the metadata and diff of every commit, in the same form
+    'git show --no-patch' and 'git show --format=' would have printed them.
+    Return None unless the markers are exactly those of commit_list, in
+    order; a diff could contain something that looks like a marker.
+    """
+
+    markers: list[tuple[int, int, str]] = [
+        (match.start(), match.end(), match.group(1).decode("ascii"))
+        for match in COMMIT_MARKER_RE.finditer(log_output)
+    ]
+    if [commit for _, _, commit in markers] != commit_list:
+        return None
+    if markers[0][0] != 0:
+        return None
+    commits: list[tuple[bytes, bytes]] = []
+    for index, (_, marker_end, _) in enumerate(markers):
+        record_end: int = (
+            markers[index + 1][0]
+            if index + 1 < len(markers)
+            else len(log_output)
+        )
+        commit_meta, separator, commit_diff = log_output[
+            marker_end:record_end
+        ].partition(b"\0")
+        if not separator:
+            return None
+        ## Command substitution strips trailing newlines. git separates the
+        ## diff from the metadata by newlines, 'git show --format=' does not
+        ## print them.
+        commits.append((commit_meta.rstrip(b"\n"), commit_diff.strip(b"\n")))
+    return commits
+
+
+def diff_additions(commit_diff: bytes) -> bytes:
+    """
+    Return what a commit diff ADDS, not what it removes, one line per line.
+    """
+
+    ## With the removal lines included, the commit that DELETES a hostile
+    ## character is flagged as hostile -- the diff line '-dirty <U+202E>line'
+    ## still contains it. So the cleanup commit gets the same warning as the
+    ## attack, and a scanner that flags fixes trains reviewers to ignore it.
+    ## Nothing a commit removes can end up in the resulting tree, so a removal
+    ## cannot be the attack.
+    ##
+    ## '---' is the file header, not a removal, and both file headers are KEPT:
+    ## a hostile FILENAME has to stay detectable.
+    additions: list[bytes] = []
+    for diff_line in commit_diff.split(b"\n"):
+        if diff_line.startswith(b"@@ "):
+            ## A hunk header ends with a FUNCNAME suffix --
+            ## '@@ -3,0 +4 @@ text' -- where 'text' is the nearest preceding
+            ## line, which the commit did NOT touch. When that surrounding
+            ## line already contains hostile unicode, every later commit
+            ## anywhere near it is flagged for a character it neither added
+            ## nor removed. Keep the ranges, which are pure ASCII, and drop
+            ## the decoration.
+            hunk_ranges, separator, _ = diff_line[3:].partition(b"@@")
+            if separator:
+                diff_line = b"@@ " + hunk_ranges + b"@@"
+        elif diff_line.startswith(b"-") and not diff_line.startswith(b"---"):
+            continue
+        additions.append(diff_line + b"\n")
+    return b"".join(additions)
+
+
+def scan_commit(commit_meta: bytes, commit_diff: bytes) -> tuple[int, str]:
+    """
+    Run unicode-show on the metadata and additions of a commit. Return its
+    exit code and everything it printed.
+    """
+
+    report_buf: StringIO = StringIO()
+    with redirect_stdout(report_buf), redirect_stderr(report_buf):
+        result: int = scan_bytes(
+            commit_meta + diff_additions(commit_diff) + b"\n"
+        )
+    return (
+        0 if result == SCAN_CLEAN else 1,
+        report_buf.getvalue().rstrip("\n"),
+    )
+
+
+# pylint: disable=too-many-return-statements
+def check_ref_commits_for_unicode(target_ref: str) -> int:
+    """
+    Scan the commits in HEAD..target_ref. Return the exit code.
+    """
+
+    if not target_ref:
+        return die(2, "No target ref specified!")
+
+    inside_work_tree: bytes | None = git_output(
+        ["rev-parse", "--is-inside-work-tree"], quiet=True
+    )
+    if inside_work_tree is None or inside_work_tree.rstrip(b"\n") != b"true":
+        return die(
+            2, "Current working directory is not inside a Git working tree!"
+        )
+
+    if git_output(["rev-parse", "--verify", target_ref], quiet=True) is None:
+        return die(2, "Target ref does not exist!")
+
+    git_log_cmd: list[str] = ["log", "--format=%H", f"HEAD..{target_ref}"]
+    git_log_output: bytes | None = git_output(git_log_cmd)
+    if git_log_output is None:
+        return die(
+            2, "git_log_cmd failed! git_log_cmd: git " + " ".join(git_log_cmd)
+        )
+    commit_list: list[str] = git_log_output.decode("ascii").split()
+    if not commit_list:
+        return die(2, "No new commits in target ref!")
+
+    ## One git process for all commits, printing what 'git show' prints for
+    ## each of them.
+    ##
+    ## --no-ext-diff prevents use of external diff drivers.
+    ##
+    ## --unified=0 prevents false positives from unicode-show resulting from
+    ## unmodified empty lines showing up in the diff as one (or in the case of
+    ## merge commits sometimes two) spaces.
+    ##
+    ## --no-textconv prevents text conversion filters from running.
+    ##
+    ## --cc shows merge commits like 'git show' does.
+    git_patch_cmd: list[str] = [
+        "log",
+        f"--format=%x00COMMIT %H%x00{COMMIT_META_FORMAT}%x00",
+        "--no-ext-diff",
+        "--unified=0",
+        "--no-textconv",
+        "--cc",
+        f"HEAD..{target_ref}",
+    ]
+    git_patch_output: bytes | None = git_output(git_patch_cmd)
+    if git_patch_output is None:
+        return die(
+            2,
+            "git_patch_cmd failed! git_patch_cmd: git "
+            + " ".join(git_patch_cmd),
+        )
+    commits: list[tuple[bytes, bytes]] | None = split_commits(
+        git_patch_output, commit_list
+    )
+    if commits is None:
+        return die(2, "Failed to split git_patch_cmd output into commits!")
+
+    found_malicious_unicode: bool = False
+    for commit, (commit_meta, commit_diff) in zip(commit_list, commits):
+        unicode_show_exit_code, unicode_report = scan_commit(
+            commit_meta, commit_diff
+        )
+        if unicode_report or unicode_show_exit_code != 0:
+            log(
+                "warn",
+                "Potentially malicious unicode detected in commit "
+                + f"'{commit}'! Details:",
+                source=PROG,
+            )
+            print(unicode_report or "'No stdout or stderr from unicode-show!'")
+            found_malicious_unicode = True
+
+    if found_malicious_unicode:
+        return die(1, "Potentially malicious unicode detected!")
+    log("notice", "No unicode detected.", source=PROG)
+    return 0
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+
+    unicode_show.USE_COLOR = False
+    text_safety_scan_lib.LOG_COLORS = detect_log_colors()
+    return check_ref_commits_for_unicode(
+        sys.argv[1] if len(sys.argv) > 1 else ""
+    )
@@ -0,0 +1,203 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+# pylint: disable=missing-module-docstring
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from unittest import TestCase, mock, skipUnless
+from check_ref_commits_for_unicode.check_ref_commits_for_unicode import (
+    diff_additions,
+    main as check_ref_commits_for_unicode_main,
+    split_commits,
+)
+
+## Identity of the commits of the test repository, and no user config.
+GIT_ENV: dict[str, str] = {
+    "GIT_AUTHOR_NAME": "Author",
+    "GIT_AUTHOR_EMAIL": "author@example.invalid",
+    "GIT_COMMITTER_NAME": "Committer",
+    "GIT_COMMITTER_EMAIL": "committer@example.invalid",
+    "GIT_CONFIG_GLOBAL": os.devnull,
+    "GIT_CONFIG_NOSYSTEM": "1",
+}
+
+
+class TestCheckRefCommitsForUnicode(TestCase):
+    """
+    Tests for check_ref_commits_for_unicode.py.
+    """
+
+    maxDiff = None
+
+    def _git(self, *args: str) -> str:
+        """
+        Run git in the current directory and return its stdout.
+        """
+
+        return subprocess.run(
+            ["git", *args],
+            stdout=subprocess.PIPE,
+            check=True,
+            env={**os.environ, **GIT_ENV},
+            text=True,
+        ).stdout.strip()
+
+    def _commit(self, message: str, files: dict[str, bytes]) -> str:
+        """
+        Write files, commit them and return the commit hash.
+        """
+
+        for name, contents in files.items():
+            with open(name, "wb") as f:
+                f.write(contents)
+        self._git("add", "--all")
+        self._git("commit", "--quiet", "--allow-empty", "--message", message)
+        return self._git("rev-parse", "HEAD")
+
+    def _test_args(
+        self,
+        stdout_string: str,
+        stderr_string: str,
+        exit_code: int,
+        args: list[str],
+    ) -> None:
+        """
+        Executes check-ref-commits-for-unicode with the specified arguments
+        and ensures its output matches an expected value.
+        """
+
+        stdout_buf: StringIO = StringIO()
+        stderr_buf: StringIO = StringIO()
+        with (
+            mock.patch.object(
+                sys, "argv", ["check-ref-commits-for-unicode", *args]
+            ),
+            mock.patch.object(sys, "stdout", stdout_buf),
+            mock.patch.object(sys, "stderr", stderr_buf),
+        ):
+            ret_exit_code: int = check_ref_commits_for_unicode_main()
+        self.assertEqual(stdout_buf.getvalue(), stdout_string)
+        self.assertEqual(stderr_buf.getvalue(), stderr_string)
+        self.assertEqual(ret_exit_code, exit_code)
+
+    @skipUnless(shutil.which("git"), "needs git")
+    def test_ref_commits(self) -> None:
+        """
+        Tests that every new commit is scanned and reported by hash, that
+        removals and hunk header context are not reported, and the errors.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            old_cwd: str = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                self._git("init", "--quiet", "--initial-branch=main")
+                self._commit("Initial", {"a.py": b"def f():\n    pass\n"})
+                self._git("checkout", "--quiet", "-b", "feature")
+                hostile: str = self._commit(
+                    "Hostile\n\n- dash line",
+                    {"a.py": b"def f():\n    pass\nx = '\xe2\x80\xae'\n"},
+                )
+                self._commit(
+                    "Fix",
+                    {"a.py": b"def f():\n    pass\nx = ''\n"},
+                )
+                message: str = self._commit("Message\u200b", {})
+                self._git("checkout", "--quiet", "main")
+
+                # pylint: disable=line-too-long
+                self._test_args(
+                    stdout_string="""\
+<stdin>:5: Message[U+200B]
+   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)
+<stdin>:12: +x = '[U+202E]'
+   -> '\\u202e' (U+202E, RIGHT-TO-LEFT OVERRIDE, Cf)
+""",
+                    stderr_string=f"""\
+check-ref-commits-for-unicode [WARN]: Potentially malicious unicode detected in commit '{message}'! Details:
+check-ref-commits-for-unicode [WARN]: Potentially malicious unicode detected in commit '{hostile}'! Details:
+check-ref-commits-for-unicode [ERROR]: Potentially malicious unicode detected!
+check-ref-commits-for-unicode [ERROR]: Aborting.
+""",
+                    exit_code=1,
+                    args=["feature"],
+                )
+                ## Only the commit removing the hostile character.
+                self._git("checkout", "--quiet", "feature~2")
+                self._test_args(
+                    stdout_string="",
+                    stderr_string="""\
+check-ref-commits-for-unicode [NOTICE]: No unicode detected.
+""",
+                    exit_code=0,
+                    args=["feature~1"],
+                )
+                self._git("checkout", "--quiet", "main")
+                for args, error in [
+                    ([], "No target ref specified!"),
+                    (["missing"], "Target ref does not exist!"),
+                    (["main"], "No new commits in target ref!"),
+                ]:
+                    self._test_args(
+                        stdout_string="",
+                        stderr_string=f"""\
+check-ref-commits-for-unicode [ERROR]: {error}
+check-ref-commits-for-unicode [ERROR]: Aborting.
+""",
+                        exit_code=2,
+                        args=args,
+                    )
+            finally:
+                os.chdir(old_cwd)
+
+    def test_split_commits(self) -> None:
+        """
+        Tests splitting 'git log' output into commits, and refusing output
+        whose markers do not match the commit list.
+        """
+
+        log_output: bytes = (
+            b"\0COMMIT aa\0meta a\n\n\0\n\ndiff a\n"
+            + b"\0COMMIT bb\0meta b\n\0\n"
+        )
+        self.assertEqual(
+            split_commits(log_output, ["aa", "bb"]),
+            [(b"meta a", b"diff a"), (b"meta b", b"")],
+        )
+        self.assertIsNone(split_commits(log_output, ["aa"]))
+        self.assertIsNone(split_commits(log_output, ["bb", "aa"]))
+        self.assertIsNone(split_commits(b"x" + log_output, ["aa", "bb"]))
+        self.assertIsNone(
+            split_commits(
+                b"\0COMMIT aa\0meta a\0\n\ndiff a\0COMMIT bb\0\n"
+                + b"\0COMMIT bb\0meta b\0",
+                ["aa", "bb"],
+            )
+        )
+
+    def test_diff_additions(self) -> None:
+        """
+        Tests that removals and hunk header context are dropped and file
+        headers are kept.
+        """
+
+        self.assertEqual(
+            diff_additions(
+                b"diff --git a/x b/x\n--- a/x\n+++ b/x\n"
+                + b"@@ -1 +1 @@ context\n-removed\n+added\n"
+                + b"@@@ -1 -1 +1 @@@ merge\n -kept\n@@ -1 +1"
+            ),
+            b"diff --git a/x b/x\n--- a/x\n+++ b/x\n"
+            + b"@@ -1 +1 @@\n+added\n"
+            + b"@@@ -1 -1 +1 @@@ merge\n -kept\n@@ -1 +1\n",
+        )
+        self.assertEqual(diff_additions(b""), b"\n")
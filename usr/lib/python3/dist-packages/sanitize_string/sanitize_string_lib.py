@@ -10,8 +10,17 @@ sanitize_string_lib.py: Library for stripping markup and control characters
 from a string.
 """
 
-from strip_markup.strip_markup_lib import strip_markup
-from stdisplay.stdisplay import stdisplay
+from re import Pattern, compile as re_compile
+from strip_markup.strip_markup_lib import extract_markup_text
+from stdisplay.stdisplay import get_sanitize_regex, stdisplay
+
+## Characters replaced with an underscore by the final stage: everything
+## stdisplay(sgr=-1) redacts plus the markup metacharacters strip_markup()
+## neutralizes. Both replace single characters with a single underscore, so
+## applying them in one pass is the same as applying them one after another.
+_FINAL_SANITIZE_RE: Pattern[str] = re_compile(
+    get_sanitize_regex(sgr=-1).pattern + r"|[<>&]"
+)
 
 
 def sanitize_string(untrusted_string: str) -> str:
@@ -35,8 +44,27 @@ def sanitize_string(untrusted_string: str) -> str:
     ## In benchmarking, stdisplay is anywhere between three and ten times
     ## faster than strip_markup, thus we use "strip escapes, strip markup,
     ## then strip escapes again."
+    ##
+    ## The stages are fused where that provably does not change the result:
+    ##
+    ## * Without '<' and '&' there can be neither tags nor entities, and
+    ##   stdisplay never produces those characters, so the HTML parser would
+    ##   return its input unchanged. All stages then reduce to a single
+    ##   character replacement pass over the input.
+    ## * Otherwise, the metacharacter neutralization of strip_markup and the
+    ##   second stdisplay pass are applied together after the parser.
+    ##
+    ## The HTML parser itself is deliberately not reimplemented, see the
+    ## comments in strip_markup_lib.
+
+    if "<" not in untrusted_string and "&" not in untrusted_string:
+        return str(_FINAL_SANITIZE_RE.sub("_", untrusted_string))
 
     step_one_sanitized_string: str = stdisplay(untrusted_string, sgr=-1)
-    step_two_sanitized_string: str = strip_markup(step_one_sanitized_string)
-    final_sanitized_string: str = stdisplay(step_two_sanitized_string, sgr=-1)
+    step_two_sanitized_string: str = extract_markup_text(
+        step_one_sanitized_string
+    )
+    final_sanitized_string: str = str(
+        _FINAL_SANITIZE_RE.sub("_", step_two_sanitized_string)
+    )
     return final_sanitized_string
@@ -12,10 +12,13 @@ import sys
 from io import BytesIO, StringIO, TextIOWrapper
 from unittest import mock
 
+from strip_markup.strip_markup_lib import strip_markup
 from strip_markup.tests.strip_markup import TestStripMarkupBase
+from stdisplay.stdisplay import stdisplay
 from stdisplay.tests.stdisplay import simple_escape_cases
 
 import sanitize_string.sanitize_string as sanitize_string_module
+from sanitize_string.sanitize_string_lib import sanitize_string
 
 ## Single import of the module (aliased below) rather than also using
 ## 'from sanitize_string.sanitize_string import main', which CodeQL flags as
@@ -516,3 +519,33 @@ That is, with a n""",
                 args=[test_case[1]],
                 stdin_string=test_case[0],
             )
+
+    def test_matches_staged_pipeline(self) -> None:
+        """
+        Ensures the fused sanitizer reaches the same result as running
+        stdisplay, strip_markup and stdisplay one after another.
+        """
+
+        test_case_list: list[str] = [
+            *(test_case[0] for test_case in simple_escape_cases),
+            "plain text\n",
+            "a > b",
+            "a < b & c > d",
+            "<p>&lt;b&gt;&#27;[31m&eacute;&#x202e;</p>",
+            "<<sc<script>script>alert(1)<</sc</script>/script>",
+            "<b>\x1b[8mhidden</b> shown",
+            "<![x] a & b",
+            "<!-- comment \x1b[31m --> text",
+            "<script>\u202e</script>&",
+            "http://example.com/?a=1&b=2\r\n",
+            "&#0;&#128;&#xd800;&#x10ffff;&#65;",
+            "\x1b<b>\x1b</b>\x1b&amp;",
+        ]
+        for test_case in test_case_list:
+            with self.subTest(test_case=test_case):
+                self.assertEqual(
+                    sanitize_string(test_case),
+                    stdisplay(
+                        strip_markup(stdisplay(test_case, sgr=-1)), sgr=-1
+                    ),
+                )
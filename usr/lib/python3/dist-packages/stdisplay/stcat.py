@@ -6,9 +6,8 @@
 
 """Safely print stdin or file to stdout."""
 
-from pathlib import Path
 from sys import argv, stdin, stdout
-from stdisplay.stdisplay import stdisplay
+from stdisplay.stdisplay import stdisplay, stdisplay_stream
 
 
 def main() -> None:
@@ -32,9 +31,9 @@ def main() -> None:
                 for untrusted_line in stdin:
                     stdout.write(stdisplay(untrusted_line))
         else:
-            path = Path(untrusted_arg)
-            untrusted_text = path.read_text(
-                encoding="utf-8", errors="replace", newline="\n"
-            )
-            stdout.write(stdisplay(untrusted_text))
+            ## Stream the file in fixed-size chunks rather than reading it
+            ## whole, so memory usage does not grow with the file size.
+            with open(untrusted_arg, "rb") as untrusted_file:
+                for sanitized_text in stdisplay_stream(untrusted_file):
+                    stdout.write(sanitized_text)
     stdout.flush()
@@ -37,7 +37,7 @@ def main() -> None:
                 for untrusted_line in stdin:
                     stdout.write(stdisplay(untrusted_line).rstrip() + "\n")
         else:
-            ## We cannot read the entire file in at once like we do with
+            ## We cannot stream the file in fixed-size chunks like we do with
             ## stcat, since we need to trim trailing whitespace from each
             ## individual line in the file.
             with open(
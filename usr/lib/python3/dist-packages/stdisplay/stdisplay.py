@@ -9,9 +9,24 @@ Sanitize text to be safely printed to the terminal.
 """
 
 import curses
+from codecs import getincrementaldecoder
+from enum import Enum
+from functools import cache, lru_cache, partial
 from os import environ
-from re import compile as re_compile, sub as re_sub
-from typing import Optional
+from re import Pattern, compile as re_compile
+from typing import BinaryIO, Iterable, Iterator, Literal, Optional
+
+## Default read size of stdisplay_stream().
+STREAM_CHUNK_SIZE: int = 2**20
+
+## An ESC at the end of a chunk that may still become an allowed SGR sequence
+## once the next chunk arrives. SGR parameters only consist of digits,
+## semicolons and colons, so anything else after the ESC settles the match.
+_PARTIAL_SGR_RE: Pattern[str] = re_compile(r"\x1b(\[[0-9;:]*)?")
+## Longest partial SGR sequence carried over between chunks. The SGR pattern
+## allows any number of parameters, but real sequences are far shorter, and
+## carrying an endless one would copy it again for every chunk.
+MAX_PARTIAL_SGR_LENGTH: int = 2**12
 
 
 def get_sgr_support() -> int:
@@ -80,12 +95,67 @@ def get_sgr_support() -> int:
     if environ.get("TERM") == "dumb":
         return -1
     try:
-        curses.setupterm()
+        ## Pass the stdout file descriptor explicitly instead of letting curses
+        ## query sys.stdout, which may have been replaced by an object without
+        ## a file descriptor by the time SGR support is first detected.
+        curses.setupterm(fd=1)
         return curses.tigetnum("colors")
     except curses.error:
         return -2
 
 
+class SgrDetect(Enum):
+    """Sentinel type of the default sgr argument, see SGR_DETECT."""
+
+    DETECT = "detect"
+
+
+## Default sgr argument: detect SGR support lazily, see get_default_sgr().
+SGR_DETECT: Literal[SgrDetect.DETECT] = SgrDetect.DETECT
+
+
+@cache
+def get_default_sgr() -> int:
+    """Returns the memoized result of get_sgr_support().
+
+    The terminfo lookup in get_sgr_support() is only done when a caller
+    relies on the default sgr argument for the first time, instead of every
+    time this module is imported. Callers that always pass sgr explicitly,
+    such as sanitize_string and unicode_show, never pay for it.
+
+    Returns
+    -------
+    int
+        Number of supported SGR codes.
+    """
+    return get_sgr_support()
+
+
+def resolve_sgr(sgr: Optional[int] | SgrDetect) -> Optional[int]:
+    """Replace SGR_DETECT with the detected SGR support.
+
+    Parameters
+    ----------
+    sgr : Optional[int] | SgrDetect
+        Number of SGR codes the terminal supports or SGR_DETECT.
+
+    Returns
+    -------
+    Optional[int]
+        Number of SGR codes the terminal supports.
+
+    Examples
+    --------
+    Explicit values are kept as they are:
+    >>> resolve_sgr(-1)
+    -1
+    """
+    if sgr is SGR_DETECT:
+        return get_default_sgr()
+    assert not isinstance(sgr, SgrDetect)
+    return sgr
+
+
 def exclude_pattern(original_pattern: str, negate_pattern: list[str]) -> str:
     """Exclude matching next expression if provided expression matches.
 
@@ -240,9 +310,63 @@ def get_sgr_pattern(
     return str(sgr_re)
 
 
+@lru_cache(maxsize=32)
+def _compile_sanitize_regex(
+    sgr: int,
+    exclude_sgr: tuple[str, ...],
+) -> Pattern[str]:
+    """Compile the sanitizer RegEx for a normalized (sgr, exclude_sgr) key.
+
+    Use get_sanitize_regex() instead, it normalizes the arguments so that
+    equivalent configurations share a single cache entry.
+    """
+    sgr_pattern = get_sgr_pattern(sgr=sgr, exclude_sgr=list(exclude_sgr))
+    sgr_pattern = r"(\x1b(?!\[" + sgr_pattern + r")|[^\x1b\n\t\x20-\x7E])"
+    return re_compile(sgr_pattern)
+
+
+def get_sanitize_regex(
+    sgr: Optional[int],
+    exclude_sgr: Optional[list[str]] = None,
+) -> Pattern[str]:
+    """Return the compiled sanitizer RegEx used by stdisplay().
+
+    Building the SGR pattern string and compiling it costs far more than
+    applying it to a single line, and the utilities that sanitize line by
+    line (stcat, stcatn, sttee) ask for the same pattern every time. The
+    compiled pattern is therefore cached, keyed on the normalized
+    (sgr, tuple(exclude_sgr)) pair.
+
+    Parameters
+    ----------
+    sgr : Optional[int]
+        Number of SGR codes the terminal supports.
+    exclude_sgr : Optional[list[str]] = None
+        SGR codes to be excluded.
+
+    Returns
+    -------
+    Pattern[str]
+        Compiled pattern matching every character that must be replaced.
+
+    Examples
+    --------
+    Equivalent configurations share the same compiled pattern:
+    >>> get_sanitize_regex(sgr=None) is get_sanitize_regex(sgr=-1)
+    True
+    >>> get_sanitize_regex(2**4, None) is get_sanitize_regex(2**4, [])
+    True
+    """
+    ## Every value below 8 (and None) disables SGR entirely, which makes the
+    ## exclusion list irrelevant as well.
+    if not sgr or sgr < 8:
+        return _compile_sanitize_regex(-1, ())
+    return _compile_sanitize_regex(sgr, tuple(exclude_sgr or ()))
+
+
 def stdisplay(
     untrusted_text: str,
-    sgr: Optional[int] = get_sgr_support(),
+    sgr: Optional[int] | SgrDetect = SGR_DETECT,
     exclude_sgr: Optional[list[str]] = None,
 ) -> str:
     """Sanitize untrusted text to be printed to the terminal.
@@ -257,8 +381,9 @@ def stdisplay(
     ----------
     untrusted_text : str
         The unsafe text to be sanitized.
-    sgr : Optional[int] = get_sgr_support()
-        Number of SGR codes the terminal supports.
+    sgr : Optional[int] | SgrDetect = SGR_DETECT
+        Number of SGR codes the terminal supports. Detected on first use by
+        default, see get_default_sgr().
     exclude_sgr : Optional[list[str]] = None
         SGR codes to be excluded.
 
@@ -281,6 +406,118 @@ def stdisplay(
     >>> stdisplay("\x1b[38;5;0m\x1b[31m\x1b[38;2;0;0;0m", sgr=2**4)
     '_[38;5;0m\x1b[31m_[38;2;0;0;0m'
     """
-    sgr_pattern = get_sgr_pattern(sgr=sgr, exclude_sgr=exclude_sgr)
-    sgr_pattern = r"(\x1b(?!\[" + sgr_pattern + r")|[^\x1b\n\t\x20-\x7E])"
-    return str(re_sub(re_compile(sgr_pattern), "_", untrusted_text))
+    sanitize_regex = get_sanitize_regex(
+        sgr=resolve_sgr(sgr), exclude_sgr=exclude_sgr
+    )
+    return str(sanitize_regex.sub("_", untrusted_text))
+
+
+def stdisplay_stream(
+    untrusted_stream: BinaryIO,
+    sgr: Optional[int] | SgrDetect = SGR_DETECT,
+    exclude_sgr: Optional[list[str]] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Sanitize an untrusted binary stream chunk by chunk.
+
+    Reads fixed-size binary chunks and sanitizes them with
+    stdisplay_chunks(). Memory usage is bounded by the chunk size instead of
+    the stream size.
+
+    Parameters
+    ----------
+    untrusted_stream : BinaryIO
+        The unsafe binary stream to be sanitized.
+    sgr : Optional[int] | SgrDetect = SGR_DETECT
+        Number of SGR codes the terminal supports. Detected on first use by
+        default, see get_default_sgr().
+    exclude_sgr : Optional[list[str]] = None
+        SGR codes to be excluded.
+    chunk_size : int = STREAM_CHUNK_SIZE
+        Number of bytes to read at once.
+
+    Yields
+    ------
+    str
+        Sanitized text.
+
+    Examples
+    --------
+    The SGR sequence split between chunks is kept:
+    >>> from io import BytesIO
+    >>> list(stdisplay_stream(BytesIO(b"a\x1b[31mb\x07"), 2**4, None, 3))
+    ['a', '\x1b[31m', 'b_']
+    """
+    return stdisplay_chunks(
+        iter(partial(untrusted_stream.read, chunk_size), b""),
+        sgr=sgr,
+        exclude_sgr=exclude_sgr,
+    )
+
+
+def stdisplay_chunks(
+    untrusted_chunks: Iterable[bytes],
+    sgr: Optional[int] | SgrDetect = SGR_DETECT,
+    exclude_sgr: Optional[list[str]] = None,
+) -> Iterator[str]:
+    """Sanitize untrusted binary chunks.
+
+    Decodes the chunks incrementally as UTF-8 with replacement of invalid
+    bytes and sanitizes each chunk the same way as stdisplay(). Chunks may
+    have any size, such as the partial reads of a pipe.
+
+    Whether an ESC is allowed depends on the characters following it, so an
+    ESC near the end of a chunk that may still start an allowed SGR sequence
+    is carried over to the next chunk, up to MAX_PARTIAL_SGR_LENGTH
+    characters. Longer ones are sanitized like an ESC that does not start an
+    SGR sequence. Apart from these, the concatenated output is identical to
+    sanitizing the whole decoded input at once.
+
+    Parameters
+    ----------
+    untrusted_chunks : Iterable[bytes]
+        The unsafe binary chunks to be sanitized.
+    sgr : Optional[int] | SgrDetect = SGR_DETECT
+        Number of SGR codes the terminal supports. Detected on first use by
+        default, see get_default_sgr().
+    exclude_sgr : Optional[list[str]] = None
+        SGR codes to be excluded.
+
+    Yields
+    ------
+    str
+        Sanitized text.
+
+    Examples
+    --------
+    Chunks of any size are sanitized as they arrive:
+    >>> list(stdisplay_chunks([b"a\x07", b"b\n"], 2**4))
+    ['a_', 'b\n']
+    """
+    decoder = getincrementaldecoder("utf-8")(errors="replace")
+    sanitize_regex = get_sanitize_regex(
+        sgr=resolve_sgr(sgr), exclude_sgr=exclude_sgr
+    )
+    carry = ""
+    for untrusted_chunk in untrusted_chunks:
+        untrusted_text = carry + decoder.decode(untrusted_chunk)
+        carry = ""
+        esc_index = untrusted_text.rfind("\x1b")
+        if esc_index != -1 and _PARTIAL_SGR_RE.fullmatch(
+            untrusted_text, esc_index
+        ):
+            if len(untrusted_text) - esc_index > MAX_PARTIAL_SGR_LENGTH:
+                ## Too long to be kept: the ESC is replaced like any ESC that
+                ## does not start an SGR sequence, the parameters are all
+                ## printable.
+                yield str(
+                    sanitize_regex.sub("_", untrusted_text[:esc_index])
+                ) + ("_" + untrusted_text[esc_index + 1 :])
+                continue
+            carry = untrusted_text[esc_index:]
+            untrusted_text = untrusted_text[:esc_index]
+        if untrusted_text:
+            yield str(sanitize_regex.sub("_", untrusted_text))
+    untrusted_text = carry + decoder.decode(b"", final=True)
+    if untrusted_text:
+        yield str(sanitize_regex.sub("_", untrusted_text))
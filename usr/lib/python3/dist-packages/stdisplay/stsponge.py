@@ -6,29 +6,143 @@
 
 """Safely print stdin to stdout or file."""
 
+import errno
+import os
+import stat
+from shutil import copyfileobj
 from sys import argv, stdin, stdout
-from stdisplay.stdisplay import stdisplay
+from tempfile import SpooledTemporaryFile, mkstemp
+from typing import IO
+from stdisplay.stdisplay import stdisplay_stream
+
+## Sanitized input is kept in memory up to this many bytes and spilled to a
+## temporary file beyond that.
+SPONGE_MEMORY_LIMIT: int = 2**24
+
+
+def get_umask() -> int:
+    """Return the file mode creation mask of the process."""
+    umask: int = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def write_in_place(sponge: IO[bytes], file: str) -> None:
+    """Truncate file and copy the sanitized input into it."""
+    sponge.seek(0)
+    with open(file, "wb") as out_file:
+        copyfileobj(sponge, out_file)
+
+
+def copy_metadata(target: str, target_stat: os.stat_result, fd: int) -> None:
+    """Give fd the owner, group, mode and extended attributes of target.
+
+    Extended attributes include ACLs. Raises OSError if any of them cannot be
+    copied, for example the owner of another user when not running as root.
+    """
+    fd_stat: os.stat_result = os.fstat(fd)
+    if (fd_stat.st_uid, fd_stat.st_gid) != (
+        target_stat.st_uid,
+        target_stat.st_gid,
+    ):
+        os.fchown(fd, target_stat.st_uid, target_stat.st_gid)
+    ## After fchown, which clears the setuid and setgid bits.
+    os.fchmod(fd, stat.S_IMODE(target_stat.st_mode))
+    try:
+        names: list[str] = os.listxattr(target)
+    except OSError as error:
+        if error.errno != errno.ENOTSUP:
+            raise
+        names = []
+    for name in names:
+        os.setxattr(fd, name, os.getxattr(target, name))
+
+
+def create_replacement(
+    target: str, target_stat: os.stat_result | None
+) -> tuple[int, str] | None:
+    """Create a temporary file next to target to replace it.
+
+    The temporary file gets the metadata of an existing target or the
+    default mode of a new file. Returns None if the temporary file cannot be
+    created or the metadata cannot be copied.
+    """
+    directory, name = os.path.split(target)
+    try:
+        tmp_fd, tmp_file = mkstemp(prefix=f".{name}.", dir=directory)
+    except OSError:
+        return None
+    try:
+        if target_stat is None:
+            os.fchmod(tmp_fd, 0o666 & ~get_umask())
+        else:
+            copy_metadata(target, target_stat, tmp_fd)
+    except OSError:
+        os.close(tmp_fd)
+        os.unlink(tmp_file)
+        return None
+    except BaseException:
+        os.close(tmp_fd)
+        os.unlink(tmp_file)
+        raise
+    return tmp_fd, tmp_file
+
+
+def write_atomic(sponge: IO[bytes], file: str) -> None:
+    """Replace file with a copy of the sanitized input.
+
+    The copy is written to a temporary file next to the target, which then
+    replaces it, so readers see either the old or the new content. Symbolic
+    links are followed and the owner, group, mode and extended attributes of
+    an existing file are kept. Targets which are not regular files, such as
+    devices and pipes, targets with hard links, targets whose metadata
+    cannot be copied and targets in a directory where no temporary file can
+    be created are written in place.
+    """
+    target: str = os.path.realpath(file)
+    target_stat: os.stat_result | None = None
+    try:
+        target_stat = os.stat(target)
+    except FileNotFoundError:
+        pass
+    replacement: tuple[int, str] | None = None
+    if target_stat is None or (
+        stat.S_ISREG(target_stat.st_mode) and target_stat.st_nlink == 1
+    ):
+        replacement = create_replacement(target, target_stat)
+    if replacement is None:
+        write_in_place(sponge, file)
+        return
+    tmp_fd, tmp_file = replacement
+    try:
+        with open(tmp_fd, "wb") as out_file:
+            sponge.seek(0)
+            copyfileobj(sponge, out_file)
+        os.replace(tmp_file, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_file)
+        except OSError:
+            pass
+        raise
 
 
 def main() -> None:
-    """Safely print stdin to stdout or file."""
-    stdout.reconfigure(  # type: ignore
-        encoding="ascii", errors="replace", newline="\n"
-    )
-    if stdin is not None:
-        stdin.reconfigure(  # type: ignore
-            encoding="utf-8", errors="replace", newline="\n"
-        )
-    untrusted_text_list = []
-    if stdin is not None:
-        for untrusted_text in stdin:
-            untrusted_text_list.append(untrusted_text)
-    if len(argv) == 1:
-        stdout.write(stdisplay("".join(untrusted_text_list)))
-        stdout.flush()
-    else:
-        for file in argv[1:]:
-            with open(
-                file, "w", encoding="ascii", errors="replace", newline="\n"
-            ) as out_file:
-                out_file.write(stdisplay("".join(untrusted_text_list)))
+    """Safely print stdin to stdout or file.
+
+    Stdin is sanitized once, chunk by chunk, into a sponge which only keeps
+    SPONGE_MEMORY_LIMIT bytes in memory. Every output is then copied from
+    the sponge.
+    """
+    with SpooledTemporaryFile(max_size=SPONGE_MEMORY_LIMIT) as sponge:
+        if stdin is not None:
+            for sanitized_text in stdisplay_stream(stdin.buffer):
+                sponge.write(sanitized_text.encode("ascii", errors="replace"))
+        if len(argv) == 1:
+            stdout.flush()
+            sponge.seek(0)
+            copyfileobj(sponge, stdout.buffer)
+            stdout.buffer.flush()
+        else:
+            for file in argv[1:]:
+                write_atomic(sponge, file)
@@ -7,39 +7,54 @@
 """Safely print stdin to stdout and file."""
 
 from contextlib import ExitStack
+from functools import partial
 from sys import argv, stdin, stdout
-from typing import TextIO
-from stdisplay.stdisplay import stdisplay
+from typing import BinaryIO, Callable
+from stdisplay.stdisplay import STREAM_CHUNK_SIZE, stdisplay_chunks
+
+
+def parse_args(args: list[str]) -> tuple[bool, list[str]]:
+    """Split the leading options from the file arguments.
+
+    Returns whether the sinks are flushed after every line and the files.
+    """
+    line_buffered: bool = False
+    while args and args[0] in ("-l", "--line-buffered", "--"):
+        option: str = args[0]
+        args = args[1:]
+        if option == "--":
+            break
+        line_buffered = True
+    return line_buffered, args
 
 
 def main() -> None:
-    """Safely print stdin to stdout and file."""
-    stdout.reconfigure(  # type: ignore
-        encoding="ascii", errors="replace", newline="\n"
-    )
-    if stdin is not None:
-        stdin.reconfigure(  # type: ignore
-            encoding="utf-8", errors="replace", newline="\n"
-        )
+    """Safely print stdin to stdout and file.
+
+    Every chunk of stdin is sanitized and encoded once, and the same bytes
+    are written to all sinks. Sinks are flushed after every chunk ending
+    lines if --line-buffered is given or stdout is a terminal, otherwise
+    only once their buffer is full.
+    """
+    line_buffered, files = parse_args(argv[1:])
+    line_buffered = line_buffered or stdout.isatty()
+    stdout.flush()
     with ExitStack() as stack:
-        output_files: list[TextIO] = []
-        if len(argv) > 1:
-            for file_arg in argv[1:]:
-                output_files.append(
-                    stack.enter_context(
-                        open(
-                            file_arg,
-                            "w",
-                            encoding="ascii",
-                            errors="replace",
-                            newline="\n",
-                        )
-                    )
-                )
+        sinks: list[BinaryIO] = [stdout.buffer]
+        for file_arg in files:
+            sinks.append(stack.enter_context(open(file_arg, "wb")))
         if stdin is not None:
-            for untrusted_text in stdin:
-                rendered_text: str = stdisplay(untrusted_text)
-                stdout.write(rendered_text)
-                for output_file in output_files:
-                    output_file.write(rendered_text)
-        stdout.flush()
+            ## Partial reads, so that lines are passed on as they arrive.
+            read_chunk: Callable[[], bytes] = partial(
+                stdin.buffer.read1, STREAM_CHUNK_SIZE  # type: ignore
+            )
+            for sanitized_text in stdisplay_chunks(iter(read_chunk, b"")):
+                sanitized_bytes: bytes = sanitized_text.encode(
+                    "ascii", errors="replace"
+                )
+                for sink in sinks:
+                    sink.write(sanitized_bytes)
+                if line_buffered and b"\n" in sanitized_bytes:
+                    for sink in sinks:
+                        sink.flush()
+        stdout.buffer.flush()
@@ -12,16 +12,25 @@ Test the stdisplay module.
 """
 
 import os
+import subprocess
+import sys
 import unittest
 import curses
+from io import BytesIO
 from unittest import mock
 from typing import (
     Any,
 )
 from stdisplay.stdisplay import (
+    MAX_PARTIAL_SGR_LENGTH,
+    SGR_DETECT,
     exclude_pattern,
+    get_default_sgr,
+    get_sanitize_regex,
     get_sgr_support,
+    resolve_sgr,
     stdisplay,
+    stdisplay_stream,
 )
 
 ## This is split into a global so it can be used by sanitize_string.py's tests.
@@ -347,6 +356,180 @@ class TestSTDisplay(unittest.TestCase):
         self.run_stdisplay_cases(cases, sgr=2**24)
 
 
+class TestSTDisplayStream(unittest.TestCase):
+    """
+    Test stdisplay_stream
+    """
+
+    def test_stdisplay_stream_matches_whole(self) -> None:
+        """
+        Chunk boundaries must not change the result, even when they split an
+        escape sequence or a multibyte character.
+        """
+
+        cases = [
+            b"",
+            b"a b\nc d",
+            b"\x1b[0mTest\x1b[2Kor\x1b]1;is\x1b\n[m",
+            b"\x1b[38;2;255;0;1m\x1b[38:5:1;31mred\x1b[0m\n",
+            b"\x1b[;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;;31m",
+            b"\x1b[38;5;1",
+            b"trailing escape\x1b",
+            b"\x1b\x1b[31m\x1b\x1b[",
+            "\u00d6 or \u00f6 \u202e\U0001f600".encode(encoding="utf-8"),
+            b"a\xffb\xe2\x80\n\xf0\x9f\x98",
+        ]
+        for untrusted_bytes in cases:
+            for sgr in (-1, 2**4, 2**24):
+                expected_result = stdisplay(
+                    untrusted_bytes.decode(encoding="utf-8", errors="replace"),
+                    sgr=sgr,
+                )
+                for chunk_size in (1, 2, 3, 5, 8, 4096):
+                    with self.subTest(
+                        untrusted_bytes=untrusted_bytes,
+                        sgr=sgr,
+                        chunk_size=chunk_size,
+                    ):
+                        result = "".join(
+                            stdisplay_stream(
+                                BytesIO(untrusted_bytes),
+                                sgr=sgr,
+                                chunk_size=chunk_size,
+                            )
+                        )
+                        self.assertEqual(result, expected_result)
+
+    def test_stdisplay_stream_bounded_chunks(self) -> None:
+        """
+        Output must be produced per chunk, not accumulated until the end.
+        """
+
+        untrusted_bytes = b"line\x07\n" * 64
+        chunks = list(
+            stdisplay_stream(BytesIO(untrusted_bytes), sgr=-1, chunk_size=16)
+        )
+        self.assertEqual(len(chunks), len(untrusted_bytes) // 16)
+        self.assertTrue(all(len(chunk) == 16 for chunk in chunks))
+
+    def test_stdisplay_stream_unterminated_sgr(self) -> None:
+        """
+        An endless unterminated SGR sequence must not be carried over from
+        chunk to chunk, which copies it again every time.
+        """
+
+        chunk_size = 2**10
+        untrusted_bytes = b"\x1b[" + b"1;" * 2**19
+        chunks = list(
+            stdisplay_stream(
+                BytesIO(untrusted_bytes), sgr=2**24, chunk_size=chunk_size
+            )
+        )
+        self.assertEqual(
+            "".join(chunks), "_" + untrusted_bytes[1:].decode("ascii")
+        )
+        self.assertLessEqual(
+            max(map(len, chunks)), MAX_PARTIAL_SGR_LENGTH + chunk_size
+        )
+        self.assertGreater(
+            len(chunks), len(untrusted_bytes) // chunk_size // 2
+        )
+
+
+class TestGetSanitizeRegex(unittest.TestCase):
+    """
+    get_sanitize_regex() caches the compiled pattern per normalized
+    configuration.
+    """
+
+    def test_equivalent_configurations_share_pattern(self) -> None:
+        """
+        Configurations that produce the same pattern must hit the same cache
+        entry instead of compiling a new one.
+        """
+
+        self.assertIs(get_sanitize_regex(None), get_sanitize_regex(-1))
+        self.assertIs(get_sanitize_regex(0), get_sanitize_regex(7))
+        self.assertIs(
+            get_sanitize_regex(-1, ["0*30"]), get_sanitize_regex(-1, None)
+        )
+        self.assertIs(get_sanitize_regex(2**4, []), get_sanitize_regex(2**4))
+        self.assertIs(
+            get_sanitize_regex(2**24, ["0*30", "0*37"]),
+            get_sanitize_regex(2**24, ["0*30", "0*37"]),
+        )
+
+    def test_distinct_configurations_differ(self) -> None:
+        """
+        Configurations that produce different patterns must not collide.
+        """
+
+        self.assertIsNot(get_sanitize_regex(2**3), get_sanitize_regex(2**4))
+        self.assertIsNot(
+            get_sanitize_regex(2**24, ["0*30"]), get_sanitize_regex(2**24)
+        )
+
+
+class TestDefaultSgr(unittest.TestCase):
+    """
+    SGR support is detected lazily, once, and only when the default sgr
+    argument is used.
+    """
+
+    def test_import_does_not_detect(self) -> None:
+        """
+        Importing the module and passing sgr explicitly must not touch the
+        terminfo database. Runs in a subprocess because the module under test
+        is already imported here.
+        """
+
+        pkg_parent = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        code = (
+            "import curses\n"
+            + "def fail(*args, **kwargs):\n"
+            + "    raise SystemExit('setupterm called')\n"
+            + "curses.setupterm = fail\n"
+            + "from stdisplay.stdisplay import stdisplay\n"
+            + "assert stdisplay('\\x1b[31m', sgr=-1) == '_[31m'\n"
+            + "stdisplay('text')\n"
+        )
+        env = dict(os.environ)
+        env.update({"PYTHONPATH": pkg_parent, "NO_COLOR": "", "TERM": "xterm"})
+        env.pop("COLORTERM", None)
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            cwd=pkg_parent,
+            capture_output=True,
+            check=False,
+            text=True,
+            timeout=10,
+        )
+        self.assertEqual(result.stderr, "setupterm called\n")
+        self.assertEqual(result.returncode, 1)
+
+    def test_detection_is_memoized(self) -> None:
+        """
+        The default is detected on first use and then reused.
+        """
+
+        get_default_sgr.cache_clear()
+        try:
+            with mock.patch(
+                "stdisplay.stdisplay.get_sgr_support", return_value=2**4
+            ) as get_sgr_support_mock:
+                self.assertEqual(stdisplay("\x1b[91m\x1b[4m"), "\x1b[91m_[4m")
+                self.assertEqual(stdisplay("\x1b[91m"), "\x1b[91m")
+                self.assertEqual(resolve_sgr(SGR_DETECT), 2**4)
+                self.assertEqual(resolve_sgr(-1), -1)
+                self.assertEqual(resolve_sgr(None), None)
+            get_sgr_support_mock.assert_called_once_with()
+        finally:
+            get_default_sgr.cache_clear()
+
+
 class TestGetSgrSupport(unittest.TestCase):
     """
     get_sgr_support() reads the environment to decide how much colour is safe.
@@ -6,8 +6,14 @@
 
 # pylint: disable=missing-module-docstring disable=duplicate-code
 
+import errno
+import os
+import stat
+from io import BytesIO, TextIOWrapper
 from pathlib import Path
+from unittest.mock import patch
 import stdisplay.tests
+import stdisplay.stsponge
 
 
 class TestSTSponge(stdisplay.tests.TestSTBase):
@@ -87,3 +93,115 @@ class TestSTSponge(stdisplay.tests.TestSTBase):
             self.text_malicious_unicode_sanitized,
             Path(self.tmpfiles["fill"]).read_text(encoding="utf-8"),
         )
+
+    def test_stsponge_spill(self) -> None:
+        """
+        Test that input larger than the memory limit is spilled to disk and
+        still written to every file.
+        """
+        stdin_buf: TextIOWrapper = TextIOWrapper(
+            BytesIO(self.text_dirty.encode("utf-8", errors="surrogateescape"))
+        )
+        with (
+            patch.object(stdisplay.stsponge, "SPONGE_MEMORY_LIMIT", 4),
+            patch.object(stdisplay.stsponge, "stdin", stdin_buf),
+            patch.object(
+                stdisplay.stsponge,
+                "argv",
+                ["stsponge", self.tmpfiles["fill"], self.tmpfiles["fill2"]],
+            ),
+        ):
+            stdisplay.stsponge.main()
+        for file in ("fill", "fill2"):
+            self.assertEqual(
+                self.text_dirty_sanitized,
+                Path(self.tmpfiles[file]).read_text(encoding="utf-8"),
+            )
+
+    def test_stsponge_atomic(self) -> None:
+        """
+        Test that the target of a symbolic link is replaced, keeping its
+        mode.
+        """
+        target: str = self.tmpfiles["fill"]
+        link: str = os.path.join(self.tmpdir, "link")
+        os.chmod(target, 0o640)
+        os.symlink(target, link)
+        inode: int = os.stat(target).st_ino
+        self.assertEqual(
+            "", self._test_util(stdin=self.text_dirty, argv=[link])
+        )
+        self.assertTrue(os.path.islink(link))
+        self.assertNotEqual(inode, os.stat(target).st_ino)
+        self.assertEqual(0o640, stat.S_IMODE(os.stat(target).st_mode))
+        self.assertEqual(
+            self.text_dirty_sanitized,
+            Path(target).read_text(encoding="utf-8"),
+        )
+        self.assertEqual(
+            sorted(os.listdir(self.tmpdir)),
+            sorted([*map(os.path.basename, self.tmpfiles_list), "link"]),
+        )
+
+    def test_stsponge_metadata(self) -> None:
+        """
+        Test that the owner, group and extended attributes of the target are
+        kept, and that the target is written in place if they cannot be.
+        """
+        target: str = self.tmpfiles["fill"]
+        try:
+            os.setxattr(target, "user.stsponge", b"kept")
+        except OSError as error:
+            if error.errno != errno.ENOTSUP:
+                raise
+        xattrs: list[str] = os.listxattr(target)
+        owner: tuple[int, int] = (os.getuid() + 1, os.getgid() + 1)
+        if os.getuid() == 0:
+            os.chown(target, *owner)
+        inode: int = os.stat(target).st_ino
+        self.assertEqual(
+            "", self._test_util(stdin=self.text_dirty, argv=[target])
+        )
+        target_stat: os.stat_result = os.stat(target)
+        self.assertNotEqual(inode, target_stat.st_ino)
+        if os.getuid() == 0:
+            self.assertEqual(owner, (target_stat.st_uid, target_stat.st_gid))
+        self.assertEqual(xattrs, os.listxattr(target))
+        for name in xattrs:
+            self.assertEqual(b"kept", os.getxattr(target, name))
+        inode = target_stat.st_ino
+        with patch.object(
+            os,
+            "listxattr",
+            side_effect=PermissionError(
+                errno.EPERM, "Operation not permitted"
+            ),
+        ):
+            self.assertEqual(
+                "", self._test_util(stdin="changed", argv=[target])
+            )
+        self.assertEqual(inode, os.stat(target).st_ino)
+        self.assertEqual("changed", Path(target).read_text(encoding="utf-8"))
+        self.assertEqual(
+            sorted(os.listdir(self.tmpdir)),
+            sorted(map(os.path.basename, self.tmpfiles_list)),
+        )
+
+    def test_stsponge_hard_link(self) -> None:
+        """
+        Test that a target with hard links is written in place, so that all
+        of its names see the new content.
+        """
+        target: str = self.tmpfiles["fill"]
+        link: str = os.path.join(self.tmpdir, "hard_link")
+        os.link(target, link)
+        inode: int = os.stat(target).st_ino
+        self.assertEqual(
+            "", self._test_util(stdin=self.text_dirty, argv=[target])
+        )
+        self.assertEqual(inode, os.stat(target).st_ino)
+        self.assertEqual(inode, os.stat(link).st_ino)
+        self.assertEqual(
+            self.text_dirty_sanitized,
+            Path(link).read_text(encoding="utf-8"),
+        )
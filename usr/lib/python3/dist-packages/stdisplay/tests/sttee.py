@@ -6,6 +6,7 @@
 
 # pylint: disable=missing-module-docstring
 
+from contextlib import chdir
 from pathlib import Path
 import stdisplay.tests
 
@@ -87,3 +88,30 @@ class TestSTTee(stdisplay.tests.TestSTBase):
             self.text_malicious_unicode_sanitized,
             Path(self.tmpfiles["fill"]).read_text(encoding="utf-8"),
         )
+
+    def test_sttee_options(self) -> None:
+        """
+        Test sttee options.
+        """
+        for option in ("-l", "--line-buffered"):
+            self.assertEqual(
+                self.text_dirty_sanitized,
+                self._test_util(
+                    stdin=self.text_dirty,
+                    argv=[option, self.tmpfiles["fill"]],
+                ),
+            )
+            self.assertEqual(
+                self.text_dirty_sanitized,
+                Path(self.tmpfiles["fill"]).read_text(encoding="utf-8"),
+            )
+        # File names after the end of options marker.
+        with chdir(self.tmpdir):
+            self.assertEqual(
+                "a_b\n",
+                self._test_util(stdin="a\x07b\n", argv=["--", "-l"]),
+            )
+        self.assertEqual(
+            "a_b\n",
+            Path(self.tmpdir, "-l").read_text(encoding="utf-8"),
+        )
@@ -10,11 +10,97 @@ A configuration parsing library based on tomllib that strictly validates
 configuration files against a schema.
 """
 
+import copy
+import os
 from pathlib import Path
 from typing import Any
 import tomllib
 import schema  # type: ignore
 
+## Path, mtime_ns, size and inode of a configuration file.
+FileSignature = tuple[str, int, int, int]
+
+
+class ConfigCache:
+    """
+    Cache for parse_config_files() in programs that reload their
+    configuration often. A file is only parsed again if its signature
+    changed. If no file was added, removed or changed, and the schema and
+    defaults are the same, the previously merged and validated configuration
+    is returned without merging or validating again.
+    """
+
+    def __init__(self) -> None:
+        self.parsed_files: dict[FileSignature, dict[str, Any]] = {}
+        self.file_signatures: list[FileSignature] | None = None
+        self.conf_schema: schema.Schema | None = None
+        self.defaults_dict: dict[str, Any] | None = None
+        self.config_dict: dict[str, Any] = {}
+
+    def is_current(
+        self,
+        file_signatures: list[FileSignature],
+        conf_schema: schema.Schema,
+        defaults_dict: dict[str, Any] | None,
+    ) -> bool:
+        """
+        Returns whether config_dict was built from the same files, schema and
+        defaults.
+        """
+
+        return (
+            self.file_signatures == file_signatures
+            and self.conf_schema is conf_schema
+            and self.defaults_dict == defaults_dict
+        )
+
+    def load(self, file_signature: FileSignature) -> dict[str, Any]:
+        """
+        Returns a copy of the parsed file, parsing it only if its signature
+        is not cached yet.
+        """
+
+        if file_signature not in self.parsed_files:
+            with open(file_signature[0], "rb") as f:
+                self.parsed_files[file_signature] = tomllib.load(f)
+        return copy.deepcopy(self.parsed_files[file_signature])
+
+    def store(
+        self,
+        file_signatures: list[FileSignature],
+        conf_schema: schema.Schema,
+        defaults_dict: dict[str, Any] | None,
+        config_dict: dict[str, Any],
+    ) -> None:
+        """
+        Remembers a validated configuration and drops the parsed files it
+        was not built from.
+        """
+
+        self.parsed_files = {
+            file_signature: self.parsed_files[file_signature]
+            for file_signature in file_signatures
+        }
+        self.file_signatures = file_signatures
+        self.conf_schema = conf_schema
+        self.defaults_dict = copy.deepcopy(defaults_dict)
+        self.config_dict = copy.deepcopy(config_dict)
+
+
+def get_file_signature(config_file: Path) -> FileSignature:
+    """
+    Returns the signature of a configuration file, which changes whenever
+    the file is replaced or written to.
+    """
+
+    stat_result: os.stat_result = os.stat(config_file)
+    return (
+        str(config_file),
+        stat_result.st_mtime_ns,
+        stat_result.st_size,
+        stat_result.st_ino,
+    )
+
 
 def merge_config_dict(
     master_dict: dict[str, Any], sub_dict: dict[str, Any]
@@ -53,6 +139,7 @@ def parse_config_files(
     conf_item_list: list[str],
     conf_schema: schema.Schema,
     defaults_dict: dict[str, Any] | None = None,
+    config_cache: ConfigCache | None = None,
 ) -> dict[str, Any]:
     """
     Parses a prioritized list of configuration files and directories, and
@@ -63,6 +150,10 @@ def parse_config_files(
     If it points to a file, that file will be inserted into the list of files
     to parse. If it points to a directory, all .conf files in that directory
     will be sorted and inserted into the list of files to parse.
+
+    If config_cache is given, unchanged files are not parsed again, and an
+    unchanged configuration is neither merged nor validated again. A copy of
+    the cached configuration is returned, so it can be modified.
     """
 
     master_config_dict: dict[str, Any] = {}
@@ -70,7 +161,9 @@ def parse_config_files(
     config_file_list: list[Path] = []
 
     if defaults_dict is not None:
-        merge_config_dict(master_config_dict, defaults_dict)
+        ## Copied, as merging extends the lists and dicts of master_config_dict
+        ## in place.
+        merge_config_dict(master_config_dict, copy.deepcopy(defaults_dict))
 
     for conf_item in conf_item_list:
         conf_path: Path = Path(conf_item)
@@ -90,6 +183,24 @@ def parse_config_files(
         ## Intentional fall-through; if an item points to neither a file nor
         ## a directory, we ignore it entirely.
 
+    if config_cache is not None:
+        file_signatures: list[FileSignature] = [
+            get_file_signature(config_file) for config_file in config_file_list
+        ]
+        if config_cache.is_current(
+            file_signatures, conf_schema, defaults_dict
+        ):
+            return copy.deepcopy(config_cache.config_dict)
+        for file_signature in file_signatures:
+            merge_config_dict(
+                master_config_dict, config_cache.load(file_signature)
+            )
+        conf_schema.validate(master_config_dict)
+        config_cache.store(
+            file_signatures, conf_schema, defaults_dict, master_config_dict
+        )
+        return master_config_dict
+
     for config_file in config_file_list:
         with open(config_file, "rb") as f:
             new_config_dict: dict[str, Any] = tomllib.load(f)
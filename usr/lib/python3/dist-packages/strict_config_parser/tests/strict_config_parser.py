@@ -3,15 +3,19 @@
 ## Copyright (C) 2025 - 2025 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
 ## See the file COPYING for copying conditions.
 
-# pylint: disable=missing-module-docstring,unknown-option-value
+# pylint: disable=missing-module-docstring,unknown-option-value,too-many-lines
 
 import unittest
 from typing import Any
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 import tomllib
 import schema  # type: ignore
-from strict_config_parser.strict_config_parser import parse_config_files
+from strict_config_parser.strict_config_parser import (
+    ConfigCache,
+    parse_config_files,
+)
 
 
 class TestStrictConfigParser(unittest.TestCase):
@@ -53,16 +57,24 @@ class TestStrictConfigParser(unittest.TestCase):
                 str(x) for x in Path(temp_dir).iterdir()
             ]
             conf_item_list.sort()
-            try:
-                parsed_config: dict[str, Any] = parse_config_files(
-                    conf_item_list=conf_item_list,
-                    conf_schema=conf_schema,
-                    defaults_dict=default_config,
-                )
-                self.assertFalse(expect_error)
-                self.assertEqual(expected_config, parsed_config)
-            except (ValueError, schema.SchemaError, tomllib.TOMLDecodeError):
-                self.assertTrue(expect_error)
+            config_cache: ConfigCache = ConfigCache()
+            ## Without a cache, with an empty cache and with a filled one.
+            for cache in (None, config_cache, config_cache):
+                try:
+                    parsed_config: dict[str, Any] = parse_config_files(
+                        conf_item_list=conf_item_list,
+                        conf_schema=conf_schema,
+                        defaults_dict=default_config,
+                        config_cache=cache,
+                    )
+                    self.assertFalse(expect_error)
+                    self.assertEqual(expected_config, parsed_config)
+                except (
+                    ValueError,
+                    schema.SchemaError,
+                    tomllib.TOMLDecodeError,
+                ):
+                    self.assertTrue(expect_error)
 
     def test_empty(self) -> None:
         """
@@ -942,3 +954,73 @@ speed = 123
             expect_error=True,
             expected_config={},
         )
+
+    def test_config_cache(self) -> None:
+        """
+        Tests that a ConfigCache only parses changed files again and notices
+        added and removed files, changed defaults and invalid changes.
+        """
+
+        list_schema: schema.Schema = schema.Schema(
+            {schema.Optional("items"): [str], schema.Optional("level"): int}
+        )
+        config_cache: ConfigCache = ConfigCache()
+
+        def parse(
+            conf_dir: str,
+            expected_loads: int,
+            defaults_dict: dict[str, Any] | None = None,
+        ) -> dict[str, Any]:
+            """
+            Parses conf_dir with the cache, checking the number of files
+            parsed.
+            """
+
+            with patch.object(tomllib, "load", wraps=tomllib.load) as load:
+                parsed_config: dict[str, Any] = parse_config_files(
+                    conf_item_list=[conf_dir],
+                    conf_schema=list_schema,
+                    defaults_dict=defaults_dict,
+                    config_cache=config_cache,
+                )
+            self.assertEqual(expected_loads, load.call_count)
+            return parsed_config
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            conf_a: Path = Path(temp_dir) / "a.conf"
+            conf_b: Path = Path(temp_dir) / "b.conf"
+            conf_a.write_text('items = ["a"]\n')
+            conf_b.write_text('items = ["b"]\n')
+            self.assertEqual({"items": ["a", "b"]}, parse(temp_dir, 2))
+            ## Modifying the result does not modify the cache.
+            parse(temp_dir, 0)["items"].append("c")
+            self.assertEqual({"items": ["a", "b"]}, parse(temp_dir, 0))
+            conf_b.write_text('items = ["b", "bb"]\n')
+            self.assertEqual({"items": ["a", "b", "bb"]}, parse(temp_dir, 1))
+            (Path(temp_dir) / "c.conf").write_text("level = 1\n")
+            self.assertEqual(
+                {"items": ["a", "b", "bb"], "level": 1}, parse(temp_dir, 1)
+            )
+            conf_a.unlink()
+            self.assertEqual(
+                {"items": ["b", "bb"], "level": 1}, parse(temp_dir, 0)
+            )
+            defaults_dict: dict[str, Any] = {"items": ["default"]}
+            self.assertEqual(
+                {"items": ["default", "b", "bb"], "level": 1},
+                parse(temp_dir, 0, defaults_dict),
+            )
+            self.assertEqual({"items": ["default"]}, defaults_dict)
+            self.assertEqual(
+                {"items": ["default", "b", "bb"], "level": 1},
+                parse(temp_dir, 0, defaults_dict),
+            )
+            conf_b.write_text("items = 1\n")
+            with self.assertRaises(schema.SchemaError):
+                parse(temp_dir, 1)
+            with self.assertRaises(schema.SchemaError):
+                parse(temp_dir, 0)
+            conf_b.write_text('items = ["fixed"]\n')
+            self.assertEqual(
+                {"items": ["fixed"], "level": 1}, parse(temp_dir, 1)
+            )
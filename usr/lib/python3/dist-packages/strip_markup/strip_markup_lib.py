@@ -9,9 +9,16 @@
 strip_markup_lib.py: Library for stripping markup from a string.
 """
 
+import threading
 from io import StringIO
 from html.parser import HTMLParser
 
+## str.translate() table replacing every markup metacharacter with an
+## underscore, see _underscore_sanitize().
+MARKUP_METACHAR_TABLE: dict[int, str] = str.maketrans(
+    {"<": "_", ">": "_", "&": "_"}
+)
+
 
 ## Inspired by https://stackoverflow.com/a/925630/19474638
 class StripMarkupEngine(HTMLParser):
@@ -24,10 +31,19 @@ class StripMarkupEngine(HTMLParser):
         Init function.
         """
 
-        super().__init__()
-        self.reset()
-        self.convert_charrefs = True
+        ## HTMLParser.__init__() calls reset(), which needs the buffer.
         self.text: StringIO = StringIO()
+        super().__init__(convert_charrefs=True)
+
+    def reset(self) -> None:
+        """
+        Resets parser state and discards accumulated text, so that the
+        instance can be reused for new input.
+        """
+
+        super().reset()
+        self.text.seek(0)
+        self.text.truncate(0)
 
     def handle_data(self, data: str) -> None:
         """
@@ -44,13 +60,34 @@ class StripMarkupEngine(HTMLParser):
         return self.text.getvalue()
 
 
+## One reusable StripMarkupEngine per thread, see get_strip_markup_engine().
+_engine_pool: threading.local = threading.local()
+
+
+def get_strip_markup_engine() -> StripMarkupEngine:
+    """
+    Returns the calling thread's StripMarkupEngine, reset and ready to be fed.
+    Constructing an engine is costly compared to parsing a single line, so it
+    is created once per thread and reused. The engine must not be used after
+    the next call to this function from the same thread.
+    """
+
+    engine: StripMarkupEngine | None = getattr(_engine_pool, "engine", None)
+    if engine is None:
+        engine = StripMarkupEngine()
+        _engine_pool.engine = engine
+    else:
+        engine.reset()
+    return engine
+
+
 def _underscore_sanitize(text: str) -> str:
     """
     Neuter markup metacharacters when the parser path is unsafe.
     See https://stackoverflow.com/a/10371699/19474638
     """
 
-    return "".join("_" if char in ["<", ">", "&"] else char for char in text)
+    return text.translate(MARKUP_METACHAR_TABLE)
 
 
 def _strip_once(text: str) -> str:
@@ -60,26 +97,48 @@ def _strip_once(text: str) -> str:
     _underscore_sanitize so no exception ever reaches the outer caller.
     """
 
-    markup_stripper: StripMarkupEngine = StripMarkupEngine()
-    markup_stripper.feed(text)
-    markup_stripper.close()
-    return markup_stripper.get_data()
+    markup_stripper: StripMarkupEngine = get_strip_markup_engine()
+    try:
+        markup_stripper.feed(text)
+        markup_stripper.close()
+        return markup_stripper.get_data()
+    finally:
+        ## Do not keep the (possibly large) input and output alive in the
+        ## pooled engine until its next use.
+        markup_stripper.reset()
 
 
-def strip_markup(untrusted_string: str) -> str:
+def extract_markup_text(untrusted_string: str) -> str:
     """
-    Stripping function.
+    Run the markup stripper over the input once and return the extracted
+    text, or the input unchanged if the parser fails. The result may still
+    contain markup metacharacters, callers must neutralize them afterwards
+    the way strip_markup() does.
     """
 
+    ## Without '<' there is no tag and without '&' there is no entity, so the
+    ## parser would return its input unchanged. Most log lines and
+    ## notification bodies take this path and skip setting up a parser.
+    if "<" not in untrusted_string and "&" not in untrusted_string:
+        return untrusted_string
+
     try:
-        strip_one_string: str = _strip_once(untrusted_string)
+        return _strip_once(untrusted_string)
     except Exception:
         ## CPython's HTMLParser raises uncaught exceptions on some
         ## malformed inputs (e.g. AssertionError on '<![...' patterns
         ## before gh-77057 landed). Sanitization must never propagate
         ## parser internals to the caller, so fall back to the
         ## underscore strategy on the original input.
-        return _underscore_sanitize(untrusted_string)
+        return untrusted_string
+
+
+def strip_markup(untrusted_string: str) -> str:
+    """
+    Stripping function.
+    """
+
+    strip_one_string: str = extract_markup_text(untrusted_string)
 
     ## Previously, we had code here that re-stripped the stripped string,
     ## detected if a second strip changed the string further, and returned a
@@ -6,10 +6,16 @@
 # pylint: disable=missing-module-docstring,fixme,unknown-option-value
 
 import sys
+import threading
 from io import BytesIO, TextIOWrapper
 from typing import Callable
 from unittest import TestCase, mock
 from strip_markup.strip_markup import main as strip_markup_main
+from strip_markup.strip_markup_lib import (
+    StripMarkupEngine,
+    get_strip_markup_engine,
+    strip_markup,
+)
 
 
 class TestStripMarkupBase(TestCase):
@@ -552,3 +558,69 @@ input.
                 args=[],
                 stdin_string=in_str,
             )
+
+    def test_markup_free_skips_parser(self) -> None:
+        """
+        Ensure strings that cannot contain markup are not fed to the parser,
+        but are still neutralized.
+        """
+
+        with mock.patch(
+            "strip_markup.strip_markup_lib._strip_once",
+            side_effect=AssertionError("parser used"),
+        ) as strip_once_mock:
+            self._test_args(
+                main_func=strip_markup_main,
+                argv0=self.argv0,
+                stdout_string="a _ b\n",
+                stderr_string="",
+                exit_code=0,
+                args=["a > b\n"],
+            )
+        strip_once_mock.assert_not_called()
+
+
+class TestStripMarkupEngine(TestCase):
+    """
+    Tests for the reusable per-thread StripMarkupEngine.
+    """
+
+    def test_engine_reuse(self) -> None:
+        """
+        Ensure a reused engine gives the same result as a fresh one, even
+        after it was left in the middle of a document.
+        """
+
+        test_case_list: list[str] = [
+            "<p>first <b>bold</b></p>",
+            "<script>unterminated & <b>",
+            "<!-- unterminated comment",
+            "<p>after &amp; before &lt;b&gt;</p>",
+            "<<sc<script>script>alert(1)<</sc</script>/script>",
+            "plain & simple",
+        ]
+        for test_case in test_case_list:
+            fresh_engine: StripMarkupEngine = StripMarkupEngine()
+            fresh_engine.feed(test_case)
+            fresh_engine.close()
+            expect_str: str = fresh_engine.get_data().translate(
+                str.maketrans("<>&", "___")
+            )
+            ## Leave the pooled engine dirty, as an exception mid-feed would.
+            get_strip_markup_engine().feed("<style>left over &amp")
+            with self.subTest(test_case=test_case):
+                self.assertEqual(strip_markup(test_case), expect_str)
+
+    def test_engine_per_thread(self) -> None:
+        """
+        Ensure threads do not share an engine, and a thread reuses its own.
+        """
+
+        self.assertIs(get_strip_markup_engine(), get_strip_markup_engine())
+        engine_list: list[StripMarkupEngine] = []
+        thread: threading.Thread = threading.Thread(
+            target=lambda: engine_list.append(get_strip_markup_engine())
+        )
+        thread.start()
+        thread.join()
+        self.assertIsNot(engine_list[0], get_strip_markup_engine())
@@ -0,0 +1,664 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+# pylint: disable=missing-module-docstring
+
+import os
+import sqlite3
+import sys
+import tempfile
+from contextlib import closing
+from io import BytesIO, TextIOWrapper
+from unittest import TestCase, mock
+from text_safety_scan.text_safety_scan import main as text_safety_scan_main
+from text_safety_scan import text_safety_scan_lib
+from text_safety_scan.text_safety_scan_lib import (
+    GREP_INITIAL_BUFFER_SIZE,
+    find_modelines,
+    string_quote_safe,
+)
+
+## Split to avoid false-positive self detection by modeline-show.
+MODELINE: str = "# vi" + "m: set ts=2:"
+
+
+class TestTextSafetyScan(TestCase):
+    """
+    Tests for text_safety_scan.py.
+    """
+
+    maxDiff = None
+    argv0 = "text-safety-scan"
+
+    # pylint: disable=line-too-long
+    ## Code duplication. Copied from usr/lib/python3/dist-packages/unicode_show/tests/unicode_show.py.
+    ## Modified to take stdin as bytes, None meaning closed.
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def _test_args(
+        self,
+        stdout_string: str,
+        stderr_string: str,
+        exit_code: int,
+        args: list[str],
+        stdin_bytes: bytes | None = None,
+    ) -> None:
+        """
+        Executes text-safety-scan with the specified arguments and stdin, and
+        ensures its output matches an expected value.
+        """
+
+        args_arr: list[str] = [self.argv0, *args]
+        stdout_buf: TextIOWrapper = TextIOWrapper(
+            buffer=BytesIO(),
+            encoding="utf-8",
+            newline="\n",
+            errors="surrogateescape",
+        )
+        stderr_buf: TextIOWrapper = TextIOWrapper(
+            buffer=BytesIO(),
+            encoding="utf-8",
+            newline="\n",
+            errors="surrogateescape",
+        )
+        stdin_buf: TextIOWrapper | None = None
+        if stdin_bytes is not None:
+            stdin_buf = TextIOWrapper(buffer=BytesIO(stdin_bytes))
+        with (
+            mock.patch.object(sys, "argv", args_arr),
+            mock.patch.object(sys, "stdout", stdout_buf),
+            mock.patch.object(sys, "stderr", stderr_buf),
+            mock.patch.object(sys, "stdin", stdin_buf),
+        ):
+            ret_exit_code: int = text_safety_scan_main()
+        stdout_buf.seek(0, 0)
+        stderr_buf.seek(0, 0)
+        self.assertEqual(stdout_buf.read(), stdout_string)
+        self.assertEqual(stderr_buf.read(), stderr_string)
+        self.assertEqual(ret_exit_code, exit_code)
+        stdout_buf.close()
+        stderr_buf.close()
+
+    def _write_files(self, tmp_dir: str, files: dict[str, bytes]) -> None:
+        """
+        Create files with the given names and contents in tmp_dir.
+        """
+
+        for name, contents in files.items():
+            with open(os.path.join(tmp_dir, name), "wb") as f:
+                f.write(contents)
+
+    def test_files(self) -> None:
+        """
+        Tests the report, summary and exit code for clean files, findings of
+        each plugin and of both plugins in the same file.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self._write_files(
+                tmp_dir,
+                {
+                    "clean.txt": b"Hello world!\n",
+                    "unicode.txt": b"Hello\xe2\x80\x8b world!\n",
+                    "modeline.txt": MODELINE.encode() + b"\n",
+                    "both.txt": MODELINE.encode() + b"\xc2\xa0\n",
+                },
+            )
+            old_cwd: str = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                self._test_args(
+                    stdout_string="",
+                    stderr_string="""\
+text-safety-scan [INFO]: unicode-show: clean.txt OK
+text-safety-scan [INFO]: modeline-show: clean.txt OK
+text-safety-scan [NOTICE]: OK (1 file(s), 2 plugin run(s))
+""",
+                    exit_code=0,
+                    args=["clean.txt"],
+                )
+                self._test_args(
+                    stdout_string=f"""\
+unicode.txt:1: Hello[U+200B] world!
+   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)
+1:{MODELINE}
+both.txt:1: {MODELINE}[U+00A0]
+   -> '\\xa0' (U+00A0, NO-BREAK SPACE, Zs)
+1:{MODELINE}\xa0
+""",
+                    stderr_string="""\
+text-safety-scan [INFO]: unicode-show: clean.txt OK
+text-safety-scan [INFO]: modeline-show: clean.txt OK
+text-safety-scan [WARN]: unicode-show: unicode.txt finding (exit 1)
+text-safety-scan [INFO]: modeline-show: unicode.txt OK
+text-safety-scan [INFO]: unicode-show: modeline.txt OK
+modeline-show [WARN]: Vim or Emacs modeline found in file 'modeline.txt'! Details:
+modeline-show [WARN]: Modelines found.
+text-safety-scan [WARN]: modeline-show: modeline.txt finding (exit 1)
+text-safety-scan [WARN]: unicode-show: both.txt finding (exit 1)
+modeline-show [WARN]: Vim or Emacs modeline found in file 'both.txt'! Details:
+modeline-show [WARN]: Modelines found.
+text-safety-scan [WARN]: modeline-show: both.txt finding (exit 1)
+text-safety-scan [ERROR]: FAIL (4 finding(s), 0 plugin error(s), 0 internal error(s); 3 of 4 scanned file(s) flagged, 0 file(s) with error(s))
+""",
+                    exit_code=1,
+                    args=[
+                        "clean.txt",
+                        "unicode.txt",
+                        "modeline.txt",
+                        "both.txt",
+                    ],
+                )
+            finally:
+                os.chdir(old_cwd)
+
+    def test_errors(self) -> None:
+        """
+        Tests internal errors for missing and directory targets, plugin
+        errors for undecodable and unreadable files, and that scanning goes
+        on after each of them.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self._write_files(
+                tmp_dir,
+                {"clean.txt": b"Hello world!\n", "invalid.txt": b"\xc3\n"},
+            )
+            os.mkdir(os.path.join(tmp_dir, "dir"))
+            old_cwd: str = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                self._test_args(
+                    stdout_string="",
+                    stderr_string="""\
+text-safety-scan [ERROR]: target 'missing\\ file' does not exist
+text-safety-scan [ERROR]: target 'dir' is a directory; use --recursive or text-safety-scan-find
+[ERROR] Unicode decode error [invalid.txt]: 'utf-8' codec can't decode byte 0xc3 in position 0: invalid continuation byte
+text-safety-scan [ERROR]: unicode-show: invalid.txt error (exit 2)
+text-safety-scan [INFO]: modeline-show: invalid.txt OK
+text-safety-scan [INFO]: unicode-show: clean.txt OK
+text-safety-scan [INFO]: modeline-show: clean.txt OK
+text-safety-scan [ERROR]: FAIL (0 finding(s), 1 plugin error(s), 2 internal error(s); 0 of 2 scanned file(s) flagged, 1 file(s) with error(s))
+""",
+                    exit_code=2,
+                    args=["missing file", "dir", "invalid.txt", "clean.txt"],
+                )
+                with mock.patch(
+                    "text_safety_scan.text_safety_scan_lib.read_target",
+                    return_value=PermissionError(13, "Permission denied"),
+                ):
+                    self._test_args(
+                        stdout_string="",
+                        stderr_string="""\
+[ERROR] File read error [clean.txt]: [Errno 13] Permission denied
+text-safety-scan [ERROR]: unicode-show: clean.txt error (exit 2)
+modeline-show [ERROR]: Error reading file 'clean.txt': [Errno 13] Permission denied
+modeline-show [ERROR]: Errors encountered.
+text-safety-scan [ERROR]: modeline-show: clean.txt error (exit 2)
+text-safety-scan [ERROR]: FAIL (0 finding(s), 2 plugin error(s), 0 internal error(s); 0 of 1 scanned file(s) flagged, 1 file(s) with error(s))
+""",
+                        exit_code=2,
+                        args=["clean.txt"],
+                    )
+            finally:
+                os.chdir(old_cwd)
+
+    def test_stdin(self) -> None:
+        """
+        Tests scanning stdin, and failing if stdin is closed.
+        """
+
+        self._test_args(
+            stdout_string=f"""\
+<stdin>:1: Hello[U+200B] world!
+   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)
+2:{MODELINE}
+""",
+            stderr_string="""\
+text-safety-scan [WARN]: unicode-show: stdin finding (exit 1)
+modeline-show [WARN]: Vim or Emacs modeline found in stdin! Details:
+modeline-show [WARN]: Modelines found.
+text-safety-scan [WARN]: modeline-show: stdin finding (exit 1)
+text-safety-scan [ERROR]: FAIL (2 finding(s), 0 plugin error(s), 0 internal error(s); 1 of 1 scanned file(s) flagged, 0 file(s) with error(s))
+""",
+            exit_code=1,
+            args=[],
+            stdin_bytes=b"Hello\xe2\x80\x8b world!\n"
+            + MODELINE.encode()
+            + b"\n",
+        )
+        self._test_args(
+            stdout_string="",
+            stderr_string="""\
+text-safety-scan [ERROR]: stdin is not open!
+text-safety-scan [ERROR]: Aborting.
+text-safety-scan [ERROR]: FAIL (0 finding(s), 0 plugin error(s), 0 internal error(s); 0 of 0 scanned file(s) flagged, 0 file(s) with error(s))
+""",
+            exit_code=2,
+            args=["--"],
+        )
+
+    def test_options(self) -> None:
+        """
+        Tests --help, unknown options, and '--' making a path that starts
+        with '-' a target.
+        """
+
+        with mock.patch(
+            "text_safety_scan.text_safety_scan.USAGE", "Usage: text"
+        ):
+            self._test_args(
+                stdout_string="Usage: text\n",
+                stderr_string="",
+                exit_code=0,
+                args=["--help", "-x"],
+            )
+            self._test_args(
+                stdout_string="",
+                stderr_string="""\
+Usage: text
+text-safety-scan [ERROR]: unknown option: '-x'
+text-safety-scan [ERROR]: Aborting.
+text-safety-scan [ERROR]: FAIL (0 finding(s), 0 plugin error(s), 0 internal error(s); 0 of 0 scanned file(s) flagged, 0 file(s) with error(s))
+""",
+                exit_code=2,
+                args=["-x", "--help"],
+            )
+        self._test_args(
+            stdout_string="",
+            stderr_string="""\
+text-safety-scan [ERROR]: target '--help' does not exist
+text-safety-scan [ERROR]: FAIL (0 finding(s), 0 plugin error(s), 1 internal error(s); 0 of 0 scanned file(s) flagged, 0 file(s) with error(s))
+""",
+            exit_code=2,
+            args=["--", "--help"],
+        )
+
+    def test_recursive(self) -> None:
+        """
+        Tests walking directories with --recursive, pruning with --exclude,
+        --max-size and symlinks, and that --jobs reports the same.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for dir_name in ["tree", "tree/b", "tree/b/.git", "outside"]:
+                os.mkdir(os.path.join(tmp_dir, dir_name))
+            self._write_files(
+                tmp_dir,
+                {
+                    "tree/a.txt": b"Hello world!\n",
+                    "tree/b/c.txt": MODELINE.encode() + b"\n",
+                    "tree/b/.git/config": MODELINE.encode() + b"\n",
+                    "tree/b/image.png": b"\x89PNG\xe2\x80\x8b",
+                    "tree/large.txt": b"Hello\xe2\x80\x8b world!\n" * 100,
+                    "outside/d.txt": b"Hello\xe2\x80\x8b world!\n",
+                },
+            )
+            os.symlink("../outside", os.path.join(tmp_dir, "tree/link"))
+            os.symlink("..", os.path.join(tmp_dir, "tree/b/loop"))
+            old_cwd: str = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                for jobs in ["1", "2"]:
+                    self._test_args(
+                        stdout_string=f"""\
+1:{MODELINE}
+""",
+                        stderr_string="""\
+text-safety-scan [INFO]: unicode-show: tree/a.txt OK
+text-safety-scan [INFO]: modeline-show: tree/a.txt OK
+text-safety-scan [INFO]: unicode-show: tree/b/c.txt OK
+modeline-show [WARN]: Vim or Emacs modeline found in file 'tree/b/c.txt'! Details:
+modeline-show [WARN]: Modelines found.
+text-safety-scan [WARN]: modeline-show: tree/b/c.txt finding (exit 1)
+text-safety-scan [ERROR]: FAIL (1 finding(s), 0 plugin error(s), 0 internal error(s); 1 of 2 scanned file(s) flagged, 0 file(s) with error(s))
+""",
+                        exit_code=1,
+                        args=[
+                            "-r",
+                            "--exclude",
+                            "*.png",
+                            "--exclude=*/.git",
+                            "--max-size=1K",
+                            f"--jobs={jobs}",
+                            "tree",
+                        ],
+                    )
+                self._test_args(
+                    stdout_string="""\
+tree/link/d.txt:1: Hello[U+200B] world!
+   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)
+""",
+                    stderr_string="""\
+text-safety-scan [ERROR]: file system loop detected at 'tree/b/loop'
+text-safety-scan [WARN]: unicode-show: tree/link/d.txt finding (exit 1)
+text-safety-scan [INFO]: modeline-show: tree/link/d.txt OK
+text-safety-scan [ERROR]: FAIL (1 finding(s), 0 plugin error(s), 1 internal error(s); 1 of 1 scanned file(s) flagged, 0 file(s) with error(s))
+""",
+                    exit_code=2,
+                    args=[
+                        "--recursive",
+                        "--follow-symlinks",
+                        "--exclude",
+                        "*.txt",
+                        "--exclude",
+                        "*.png",
+                        "--exclude",
+                        ".git",
+                        "--exclude",
+                        "tree/b/loop/*",
+                        "--",
+                        "tree",
+                        "tree/link/d.txt",
+                    ],
+                )
+            finally:
+                os.chdir(old_cwd)
+
+    def test_jobs_combined_output(self) -> None:
+        """
+        Tests that --jobs interleaves stdout and stderr like a sequential run
+        when both go to the same file, as with '2>&1'.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self._write_files(
+                tmp_dir,
+                {
+                    f"{name}{number}.txt": contents
+                    for number in range(3)
+                    for name, contents in {
+                        "clean": b"Hello world!\n",
+                        "both": MODELINE.encode() + b"\xc2\xa0\n",
+                    }.items()
+                },
+            )
+            old_cwd: str = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                outputs: list[str] = []
+                for jobs in ["1", "2"]:
+                    output_buf: TextIOWrapper = TextIOWrapper(
+                        buffer=BytesIO(),
+                        encoding="utf-8",
+                        newline="\n",
+                        errors="surrogateescape",
+                    )
+                    with (
+                        mock.patch.object(
+                            sys,
+                            "argv",
+                            [
+                                self.argv0,
+                                f"--jobs={jobs}",
+                                *sorted(os.listdir()),
+                            ],
+                        ),
+                        mock.patch.object(sys, "stdout", output_buf),
+                        mock.patch.object(sys, "stderr", output_buf),
+                    ):
+                        self.assertEqual(text_safety_scan_main(), 1)
+                    output_buf.seek(0, 0)
+                    outputs.append(output_buf.read())
+                    output_buf.close()
+            finally:
+                os.chdir(old_cwd)
+        self.assertIn(
+            "Zs)\ntext-safety-scan [WARN]: unicode-show: both0.txt finding "
+            + "(exit 1)\nmodeline-show [WARN]: Vim or Emacs modeline found "
+            + "in file 'both0.txt'! Details:\n1:",
+            outputs[0],
+        )
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_cache(self) -> None:
+        """
+        Tests that --cache skips files found clean before with the same
+        report, rescans everything after plugin changes or corruption, and
+        evicts the least recently used files.
+        """
+
+        clean_report: str = """\
+text-safety-scan [INFO]: unicode-show: clean.txt OK
+text-safety-scan [INFO]: modeline-show: clean.txt OK
+text-safety-scan [INFO]: unicode-show: other.txt OK
+text-safety-scan [INFO]: modeline-show: other.txt OK
+text-safety-scan [WARN]: unicode-show: unicode.txt finding (exit 1)
+text-safety-scan [INFO]: modeline-show: unicode.txt OK
+text-safety-scan [ERROR]: FAIL (1 finding(s), 0 plugin error(s), 0 internal error(s); 1 of 3 scanned file(s) flagged, 0 file(s) with error(s))
+"""
+        unicode_report: str = """\
+unicode.txt:1: Hello[U+200B] world!
+   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)
+"""
+        args: list[str] = ["clean.txt", "other.txt", "unicode.txt"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self._write_files(
+                tmp_dir,
+                {
+                    "clean.txt": b"Hello world!\n",
+                    "other.txt": b"Hello\n",
+                    "unicode.txt": b"Hello\xe2\x80\x8b world!\n",
+                },
+            )
+            old_cwd: str = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                with mock.patch(
+                    "text_safety_scan.text_safety_scan_lib."
+                    + "run_plugins_for_target",
+                    wraps=text_safety_scan_lib.run_plugins_for_target,
+                ) as run_plugins:
+                    for jobs in ["1", "1", "2"]:
+                        self._test_args(
+                            stdout_string=unicode_report,
+                            stderr_string=clean_report,
+                            exit_code=1,
+                            args=["--cache=cache", f"--jobs={jobs}", *args],
+                        )
+                    ## Workers are not mocked, only the first run scans the
+                    ## clean files in this process.
+                    self.assertEqual(
+                        [call.args[0] for call in run_plugins.call_args_list],
+                        [*args, "unicode.txt"],
+                    )
+                    run_plugins.reset_mock()
+                    with mock.patch(
+                        "text_safety_scan.text_safety_scan_lib."
+                        + "plugin_fingerprint",
+                        return_value=b"changed plugins",
+                    ):
+                        self._test_args(
+                            stdout_string=unicode_report,
+                            stderr_string=clean_report,
+                            exit_code=1,
+                            args=["--cache", "cache", *args],
+                        )
+                    self.assertEqual(run_plugins.call_count, 3)
+                    run_plugins.reset_mock()
+
+                    with open("cache", "r+b") as f:
+                        f.write(b"\0" * 100)
+                    self._test_args(
+                        stdout_string=unicode_report,
+                        stderr_string="text-safety-scan [WARN]: cache "
+                        + "'cache' is corrupt, starting over: file is not a "
+                        + "database\n"
+                        + clean_report,
+                        exit_code=1,
+                        args=["--cache", "cache", *args],
+                    )
+                    self.assertEqual(run_plugins.call_count, 3)
+
+                self._test_args(
+                    stdout_string=unicode_report,
+                    stderr_string=clean_report,
+                    exit_code=1,
+                    args=["--cache=cache", "--cache-max-entries=1", *args],
+                )
+                with closing(sqlite3.connect("cache")) as connection:
+                    self.assertEqual(
+                        connection.execute(
+                            "SELECT count(*) FROM clean_v1"
+                        ).fetchone(),
+                        (1,),
+                    )
+            finally:
+                os.chdir(old_cwd)
+
+    def test_cache_environment(self) -> None:
+        """
+        Tests that a file found clean with a setting that suppresses a
+        finding is scanned again once the setting is gone.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self._write_files(tmp_dir, {"no_newline.txt": b"abc"})
+            old_cwd: str = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                for jobs in ["1", "2"]:
+                    with mock.patch.dict(
+                        os.environ,
+                        {"UNICODE_SHOW_ALLOW_MISSING_FINAL_NEWLINE": "1"},
+                    ):
+                        self._test_args(
+                            stdout_string="",
+                            stderr_string="""\
+text-safety-scan [INFO]: unicode-show: no_newline.txt OK
+text-safety-scan [INFO]: modeline-show: no_newline.txt OK
+text-safety-scan [NOTICE]: OK (1 file(s), 2 plugin run(s))
+""",
+                            exit_code=0,
+                            args=[
+                                f"--cache=cache{jobs}",
+                                f"--jobs={jobs}",
+                                "no_newline.txt",
+                            ],
+                        )
+                    with mock.patch.dict(os.environ):
+                        os.environ.pop(
+                            "UNICODE_SHOW_ALLOW_MISSING_FINAL_NEWLINE", None
+                        )
+                        self._test_args(
+                            stdout_string="""\
+no_newline.txt:1: [missing newline at end]
+""",
+                            stderr_string="""\
+text-safety-scan [WARN]: unicode-show: no_newline.txt finding (exit 1)
+text-safety-scan [INFO]: modeline-show: no_newline.txt OK
+text-safety-scan [ERROR]: FAIL (1 finding(s), 0 plugin error(s), 0 internal error(s); 1 of 1 scanned file(s) flagged, 0 file(s) with error(s))
+""",
+                            exit_code=1,
+                            args=[
+                                f"--cache=cache{jobs}",
+                                f"--jobs={jobs}",
+                                "no_newline.txt",
+                            ],
+                        )
+            finally:
+                os.chdir(old_cwd)
+
+    def test_option_errors(self) -> None:
+        """
+        Tests invalid option values.
+        """
+
+        with mock.patch(
+            "text_safety_scan.text_safety_scan.USAGE", "Usage: text"
+        ):
+            for args, message in [
+                (["--jobs"], "missing value for option: '--jobs'"),
+                (["--jobs=x", "a"], "invalid number for option '--jobs': 'x'"),
+                (
+                    ["--cache-max-entries", "-1", "a"],
+                    "invalid number for option '--cache-max-entries': '-1'",
+                ),
+                (["--max-size", "1T", "a"], "invalid size: '1T'"),
+                (["--recursive=1", "a"], "unknown option: '--recursive=1'"),
+            ]:
+                self._test_args(
+                    stdout_string="",
+                    stderr_string=f"""\
+Usage: text
+text-safety-scan [ERROR]: {message}
+text-safety-scan [ERROR]: Aborting.
+text-safety-scan [ERROR]: FAIL (0 finding(s), 0 plugin error(s), 0 internal error(s); 0 of 0 scanned file(s) flagged, 0 file(s) with error(s))
+""",
+                    exit_code=2,
+                    args=args,
+                )
+
+    def test_string_quote_safe(self) -> None:
+        """
+        Tests if paths are quoted like 'LC_ALL=C printf %q' does.
+        """
+
+        test_cases: list[tuple[str, str]] = [
+            ("", "''"),
+            ("a-b/c.d_e=f:g@h%i+j", "a-b/c.d_e=f:g@h%i+j"),
+            ("a b'c\"d", "a\\ b\\'c\\\"d"),
+            (
+                "!$&()*,;<>?[\\]^`{|}",
+                "\\!\\$\\&\\(\\)\\*\\,\\;\\<\\>\\?\\[\\\\\\]\\^\\`\\{\\|\\}",
+            ),
+            ("~x~", "\\~x~"),
+            ("#x#", "\\#x#"),
+            ("\x1b[1m", "$'\\E[1m'"),
+            ("a\nb\t", "$'a\\nb\\t'"),
+            ("\a\b\f\v\r", "$'\\a\\b\\f\\v\\r'"),
+            ("~ '\\\x01", "$'~ \\'\\\\\\001'"),
+            ("\x7f", "$'\\177'"),
+            ("\u00e9", "$'\\303\\251'"),
+            ("\udcff", "$'\\377'"),
+        ]
+        for test_case in test_cases:
+            self.assertEqual(
+                string_quote_safe(test_case[0]), test_case[1], test_case[0]
+            )
+
+    def test_find_modelines(self) -> None:
+        """
+        Tests the modeline patterns and grep's handling of binary data.
+        """
+
+        ## Split to avoid false-positive self detection by modeline-show.
+        colon: str = ":"
+        test_cases: list[tuple[bytes, list[str]]] = [
+            (b"", []),
+            (b"vi" + b"m is an editor\n", []),
+            (
+                b"\n\nvi" + b": 1 vim" + b": 2\n",
+                ["3:vi" + colon + " 1 vim" + colon + " 2"],
+            ),
+            (
+                b"Vim900" + b": x\nvim<800" + b": x\n",
+                ["1:Vim900" + colon + " x", "2:vim<800" + colon + " x"],
+            ),
+            (b"ex" + b": x\n\tex" + b": x\n", ["2:\tex" + colon + " x"]),
+            (b"\xe3\x80\x80ex" + b": x\n", ["1:\u3000ex" + colon + " x"]),
+            (b"\xc2\xa0ex" + b": x\n", []),
+            (
+                b"a-*" + b"-\n -*" + b"- x\n-*" + b"-",
+                ["2: -*" + "- x", "3:-*" + "-"],
+            ),
+            (b"Local Var" + b"iables:\r\n", ["1:Local Var" + "iables:\r"]),
+            (b"\xc3 vi" + b": x\nvi" + b": y\n", ["2:vi" + colon + " y"]),
+            (b"vi" + b": x\n\0", []),
+            (
+                b"vi"
+                + b": x\n"
+                + b"x" * GREP_INITIAL_BUFFER_SIZE
+                + b"\nvi"
+                + b": y\0\nvi"
+                + b": z\n",
+                ["1:vi" + colon + " x"],
+            ),
+        ]
+        for test_case in test_cases:
+            self.assertEqual(
+                find_modelines(test_case[0]), test_case[1], test_case[0][:40]
+            )
@@ -0,0 +1,240 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+"""
+text_safety_scan.py: Run all text-safety plugins across files or stdin.
+
+See text-safety-scan(1) for the full description, options, examples, and
+security model.
+"""
+
+import os
+import sys
+from collections.abc import Iterator
+from unicode_show import unicode_show
+from . import text_safety_scan_lib
+from .text_safety_scan_lib import (
+    ScanCache,
+    ScanCounters,
+    ScanOptions,
+    detect_log_colors,
+    internal_error,
+    log,
+    parse_size,
+    run_plugins_for_target,
+    scan_targets,
+    string_quote_safe,
+    walk_directory,
+)
+
+USAGE: str = """\
+Usage: text-safety-scan [OPTION...] [PATH...]
+       text-safety-scan < input
+
+Scan one or more files (or stdin) using all known plugins.
+All plugins run for every input even if an earlier plugin reports
+a finding.
+
+Options:
+  -h, --help     Show this help and exit.
+  -r, --recursive
+                 Scan every regular file under directory PATHs.
+  -L, --follow-symlinks
+                 Follow symlinks while walking directories.
+  --exclude GLOB Skip files and directories whose name matches GLOB
+                 while walking, or whose path does if GLOB contains '/'.
+                 May be given more than once.
+  --max-size SIZE
+                 Skip files larger than SIZE bytes while walking. SIZE
+                 may end in K, M or G.
+  --jobs N       Scan files in N worker processes, 0 meaning one per
+                 CPU. Default 1.
+  --cache FILE   Remember the contents of clean files in the cache FILE
+                 and do not scan them again.
+  --cache-max-entries N
+                 Keep at most N files in the cache, dropping the least
+                 recently used ones. Default 1000000.
+  --             End of options; remaining arguments are paths.
+                 Paths whose first character is '-' are supported via
+                 this marker, e.g.
+                     text-safety-scan -- --weird-name
+
+Exit codes:
+  0  clean
+  1  at least one finding
+  2  at least one internal error (unreadable file, plugin not found,
+     target is a directory, etc.)"""
+
+## Options that take a value, as the next argument or after '='.
+VALUE_OPTIONS: tuple[str, ...] = (
+    "--exclude",
+    "--max-size",
+    "--jobs",
+    "--cache",
+    "--cache-max-entries",
+)
+
+
+def set_option_value(options: ScanOptions, option: str, value: str) -> None:
+    """
+    Set the option of VALUE_OPTIONS named option. Raise ValueError if value
+    is invalid.
+    """
+
+    if option == "--exclude":
+        options.exclude.append(value)
+    elif option == "--max-size":
+        options.max_size = parse_size(value)
+    elif option == "--cache":
+        options.cache_file = value
+    elif not value.isdecimal() or not value.isascii():
+        raise ValueError(f"invalid number for option '{option}': '{value}'")
+    elif option == "--jobs":
+        options.jobs = int(value) or unicode_show.usable_cpu_count()
+    else:
+        options.cache_max_entries = int(value)
+
+
+def parse_args(args: list[str]) -> tuple[ScanOptions, list[str]]:
+    """
+    Split the leading options from the path arguments. Stop at --help.
+    Raise ValueError on invalid options.
+    """
+
+    options: ScanOptions = ScanOptions()
+    while args and args[0].startswith("-"):
+        option: str = args[0]
+        args = args[1:]
+        if option == "--":
+            break
+        if option in ("-h", "--help"):
+            options.show_help = True
+            break
+        if option in ("-r", "--recursive"):
+            options.recursive = True
+            continue
+        if option in ("-L", "--follow-symlinks"):
+            options.follow_symlinks = True
+            continue
+        name, has_value, value = option.partition("=")
+        if name not in VALUE_OPTIONS:
+            raise ValueError(f"unknown option: '{option}'")
+        if not has_value:
+            if not args:
+                raise ValueError(f"missing value for option: '{name}'")
+            value, args = args[0], args[1:]
+        set_option_value(options, name, value)
+    return options, args
+
+
+def iter_targets(
+    args: list[str], options: ScanOptions, counters: ScanCounters
+) -> Iterator[str]:
+    """
+    Yield the files to scan for the path arguments, walking directories if
+    options.recursive is set. Log an internal error for every argument that
+    cannot be scanned.
+    """
+
+    for target in args:
+        if not os.path.exists(target):
+            internal_error(
+                f"target '{string_quote_safe(target)}' does not exist",
+                counters,
+            )
+            continue
+        if os.path.isdir(target):
+            if options.recursive:
+                yield from walk_directory(target, options, counters)
+                continue
+            internal_error(
+                f"target '{string_quote_safe(target)}' is a directory; "
+                + "use --recursive or text-safety-scan-find",
+                counters,
+            )
+            continue
+        yield target
+
+
+def cleanup(exit_code: int, counters: ScanCounters) -> int:
+    """
+    Print the summary and return exit_code.
+    """
+
+    if exit_code == 0:
+        log(
+            "notice",
+            f"OK ({counters.files_scanned} file(s), "
+            + f"{counters.plugins_run} plugin run(s))",
+        )
+    else:
+        log(
+            "error",
+            f"FAIL ({counters.plugins_findings} finding(s), "
+            + f"{counters.plugins_errors} plugin error(s), "
+            + f"{counters.internal_errors} internal error(s); "
+            + f"{counters.files_with_findings} of {counters.files_scanned} "
+            + "scanned file(s) flagged, "
+            + f"{counters.files_with_errors} file(s) with error(s))",
+        )
+    return exit_code
+
+
+def die(exit_code: int, message: str, counters: ScanCounters) -> int:
+    """
+    Log an error, abort and return exit_code after printing the summary.
+    """
+
+    log("error", message)
+    log("error", "Aborting.")
+    return cleanup(exit_code, counters)
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+
+    counters: ScanCounters = ScanCounters()
+    options: ScanOptions
+    args: list[str]
+    try:
+        options, args = parse_args(sys.argv[1:])
+    except ValueError as e:
+        print(USAGE, file=sys.stderr)
+        return die(2, str(e), counters)
+    if options.show_help:
+        print(USAGE)
+        return 0
+
+    unicode_show.USE_COLOR = unicode_show.detect_color()
+    text_safety_scan_lib.LOG_COLORS = detect_log_colors()
+
+    if not args:
+        if sys.stdin is None:
+            return die(2, "stdin is not open!", counters)
+        try:
+            stdin_data: bytes = sys.stdin.buffer.read()
+        except OSError:
+            return die(2, "failed to capture stdin", counters)
+        run_plugins_for_target(None, stdin_data, counters)
+    else:
+        scan_cache: ScanCache | None = None
+        if options.cache_file is not None:
+            scan_cache = ScanCache(
+                options.cache_file, options.cache_max_entries
+            )
+        scan_targets(
+            iter_targets(args, options, counters),
+            options.jobs,
+            counters,
+            scan_cache,
+        )
+        if scan_cache is not None:
+            scan_cache.close()
+
+    return cleanup(counters.overall_exit, counters)
@@ -0,0 +1,926 @@
+#!/usr/bin/python3 -Bsu
+
+## Copyright (C) 2026 - 2026 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
+## See the file COPYING for copying conditions.
+
+## AI-Assisted
+
+# pylint: disable=broad-exception-caught
+
+"""
+In-process engine of text-safety-scan. Every plugin is a Python function
+that receives the contents of a target, read once, and prints its report
+like the command line tool of the same name.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+import unicodedata
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from fnmatch import fnmatchcase
+from functools import cache
+from io import StringIO
+from itertools import repeat
+from re import MULTILINE, Pattern, compile as re_compile
+from typing import Callable
+from urllib.parse import quote
+from sanitize_string.sanitize_string_lib import sanitize_string
+from stdisplay.stdisplay import stdisplay
+from term_colors.term_colors import TermColors
+from unicode_show import unicode_show
+from unicode_show.unicode_show import (
+    SCAN_CLEAN,
+    SCAN_FOUND,
+    scan_bytes,
+)
+
+PROG: str = "text-safety-scan"
+LOG_LEVEL: str = "info"
+
+## Same numbers as __log_level_num() in log_run_die.sh.
+LOG_LEVEL_NUM: dict[str, int] = {
+    "bug": 0,
+    "error": 0,
+    "question": 0,
+    "warn": 1,
+    "notice": 2,
+    "info": 3,
+    "debug": 4,
+    "echo": 5,
+    "null": 6,
+}
+## TermColors attribute used for each log type, see log() in log_run_die.sh.
+LOG_COLOR_NAME: dict[str, str] = {
+    "bug": "yellow",
+    "question": "blue",
+    "error": "red",
+    "warn": "magenta",
+    "info": "cyan",
+    "debug": "cyan",
+    "notice": "green",
+}
+
+## Characters that 'LC_ALL=C printf %q' escapes with a backslash. '~' and '#'
+## are only escaped at the start of the string.
+SHELL_SPECIAL_BYTES: bytes = b" !\"$&'()*,;<>?[\\]^`{|}"
+SHELL_SPECIAL_LEADING_BYTES: bytes = b"~#"
+## Backslash escapes SHELL_SPECIAL_BYTES, for str.translate().
+SHELL_SPECIAL_ESCAPES: dict[int, str] = {
+    byte: "\\" + chr(byte) for byte in SHELL_SPECIAL_BYTES
+}
+## Escapes of non-printable bytes inside $'...'.
+ANSI_C_ESCAPES: dict[int, str] = {
+    0x07: "\\a",
+    0x08: "\\b",
+    0x09: "\\t",
+    0x0A: "\\n",
+    0x0B: "\\v",
+    0x0C: "\\f",
+    0x0D: "\\r",
+    0x1B: "\\E",
+    0x27: "\\'",
+    0x5C: "\\\\",
+}
+
+## [[:space:]] of grep in a UTF-8 locale, minus the newline grep splits
+## lines on.
+GREP_SPACE: str = (
+    "[\t\x0b\x0c\r \u1680\u2000-\u2006\u2008-\u200a\u2028\u2029\u205f"
+    + "\u3000]"
+)
+## The regex of modeline-show, translated from grep's basic regex syntax.
+## Split to avoid false-positive self detection.
+## Code duplication. Translated from usr/bin/modeline-show.
+MODELINE_RE: Pattern[str] = re_compile(
+    "(?:vi|[Vv]im(?:[<=>]?[0-9]+)?|"
+    + GREP_SPACE
+    + "ex):|(?:"
+    + GREP_SPACE
+    + "|^)-\\*-|Local"
+    + " Variables:",
+    MULTILINE,
+)
+## Escape sequences log() uses, keyed by TermColors attribute. Set by main()
+## and by worker processes, empty means no colors.
+LOG_COLORS: dict[str, str] = {}
+
+## Multipliers of the suffixes --max-size accepts.
+SIZE_SUFFIXES: dict[str, int] = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+SIZE_RE: Pattern[str] = re_compile("([0-9]+)([KMG]?)")
+
+## Bump if the meaning of a cache entry changes.
+CACHE_FORMAT: str = "text-safety-scan clean cache 1"
+## Default of --cache-max-entries. A few dozen bytes each.
+CACHE_MAX_ENTRIES: int = 1000000
+## Environment variables the verdicts of the plugins depend on, part of every
+## cache key. Add every new one here, or the cache reports stale verdicts.
+CACHE_ENVIRONMENT: tuple[str, ...] = (
+    "UNICODE_SHOW_ALLOW_MISSING_FINAL_NEWLINE",
+)
+## Seconds to wait for another text-safety-scan writing to the same cache.
+CACHE_TIMEOUT: float = 60.0
+## Error codes of a cache that is not a usable database.
+CACHE_CORRUPT_ERRORCODES: tuple[int, ...] = (
+    sqlite3.SQLITE_CORRUPT,
+    sqlite3.SQLITE_NOTADB,
+)
+
+## Every match of MODELINE_RE contains one of these. Split to avoid
+## false-positive self detection.
+MODELINE_HINTS: tuple[bytes, ...] = (
+    b"vi" + b":",
+    b"vi" + b"m",
+    b"Vi" + b"m",
+    b"ex" + b":",
+    b"-*" + b"-",
+    b"Local" + b" Variables:",
+)
+## Size of the first buffer grep reads and checks for binary data.
+GREP_INITIAL_BUFFER_SIZE: int = 96 * 1024
+## Matches what errors="surrogateescape" decodes invalid UTF-8 bytes to.
+ENCODING_ERROR_RE: Pattern[str] = re_compile("[\udc80-\udcff]")
+
+
+# pylint: disable=too-many-instance-attributes,too-few-public-methods
+class ScanCounters:
+    """
+    Summary counters of a text-safety-scan run.
+    """
+
+    def __init__(self) -> None:
+        self.plugins_run: int = 0
+        self.plugins_findings: int = 0
+        self.plugins_errors: int = 0
+        self.internal_errors: int = 0
+        self.files_scanned: int = 0
+        self.files_with_findings: int = 0
+        self.files_with_errors: int = 0
+        self.overall_exit: int = 0
+
+    def bump_exit(self, new: int) -> None:
+        """
+        Bump overall_exit to the highest severity seen so far. 2 (error) wins
+        over 1 (finding) wins over 0 (clean).
+        """
+
+        self.overall_exit = max(self.overall_exit, new)
+
+    def add(self, other: "ScanCounters") -> None:
+        """
+        Add the counters of other, gathered by a worker process, to these.
+        """
+
+        self.plugins_run += other.plugins_run
+        self.plugins_findings += other.plugins_findings
+        self.plugins_errors += other.plugins_errors
+        self.internal_errors += other.internal_errors
+        self.files_scanned += other.files_scanned
+        self.files_with_findings += other.files_with_findings
+        self.files_with_errors += other.files_with_errors
+        self.bump_exit(other.overall_exit)
+
+
+# pylint: disable=too-few-public-methods
+class ScanOptions:
+    """
+    Command line options of a text-safety-scan run.
+    """
+
+    def __init__(self) -> None:
+        self.show_help: bool = False
+        self.recursive: bool = False
+        self.follow_symlinks: bool = False
+        self.exclude: list[str] = []
+        self.max_size: int | None = None
+        self.jobs: int = 1
+        self.cache_file: str | None = None
+        self.cache_max_entries: int = CACHE_MAX_ENTRIES
+
+
+@cache
+def plugin_fingerprint() -> bytes:
+    """
+    Return a digest of everything the verdicts of the plugins depend on other
+    than the contents of a target: their code, the Python version and its
+    Unicode database. Any change to those invalidates every cache entry.
+    """
+
+    fingerprint = hashlib.sha256(
+        f"{CACHE_FORMAT}\0{sys.version}\0".encode()
+        + f"{unicodedata.unidata_version}\0".encode()
+    )
+    for module_file in (unicode_show.__file__, __file__):
+        with open(module_file, "rb") as f:
+            fingerprint.update(f.read())
+    return fingerprint.digest()
+
+
+def settings_fingerprint() -> bytes:
+    """
+    Return the settings in CACHE_ENVIRONMENT the verdicts of the plugins
+    depend on. Not cached, tests change them within a process.
+    """
+
+    return "".join(
+        f"{name}={os.environ.get(name)!r}\0" for name in CACHE_ENVIRONMENT
+    ).encode()
+
+
+def cache_key(data: bytes) -> bytes:
+    """
+    Return the cache key of the contents of a target scanned with the current
+    settings.
+    """
+
+    return hashlib.sha256(
+        plugin_fingerprint() + settings_fingerprint() + data
+    ).digest()
+
+
+class ScanCache:
+    """
+    On-disk cache of the keys of targets every plugin found clean, keeping
+    the max_entries most recently used ones. Nothing else is cached, so
+    anything else is always scanned again, and so is everything if the cache
+    cannot be used. A corrupt cache is deleted and starts over empty.
+    """
+
+    def __init__(self, path: str, max_entries: int) -> None:
+        self.path: str = path
+        self.max_entries: int = max_entries
+        ## Keys found or added during this run, written by close().
+        self.used: list[bytes] = []
+        self.connection: sqlite3.Connection | None = self._open()
+
+    def _open(self) -> sqlite3.Connection | None:
+        """
+        Open the cache, creating it if needed. Return None if it cannot be
+        used.
+        """
+
+        for attempt in range(2):
+            connection: sqlite3.Connection | None = None
+            try:
+                connection = sqlite3.connect(self.path, timeout=CACHE_TIMEOUT)
+                if connection.execute("PRAGMA quick_check").fetchall() != [
+                    ("ok",)
+                ]:
+                    raise sqlite3.DatabaseError("quick_check failed")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS clean_v1 "
+                    + "(key BLOB PRIMARY KEY, last_used INTEGER NOT NULL) "
+                    + "WITHOUT ROWID"
+                )
+                connection.commit()
+                return connection
+            except sqlite3.Error as e:
+                if connection is not None:
+                    connection.close()
+                corrupt: bool = str(e) == "quick_check failed" or (
+                    getattr(e, "sqlite_errorcode", None)
+                    in CACHE_CORRUPT_ERRORCODES
+                )
+                if not corrupt or attempt:
+                    self._warn(e)
+                    return None
+                log(
+                    "warn",
+                    f"cache '{string_quote_safe(self.path)}' is corrupt, "
+                    + f"starting over: {e}",
+                )
+                try:
+                    os.remove(self.path)
+                except OSError as remove_error:
+                    self._warn(remove_error)
+                    return None
+        return None
+
+    def _warn(self, error: Exception) -> None:
+        """
+        Log that the cache is not used for the rest of this run.
+        """
+
+        log(
+            "warn",
+            f"cannot use cache '{string_quote_safe(self.path)}', "
+            + f"scanning without it: {error}",
+        )
+
+    def lookup(self, key: bytes) -> bool:
+        """
+        Return whether the target with cache key key is known to be clean.
+        """
+
+        if self.connection is None:
+            return False
+        try:
+            row: tuple[int] | None = self.connection.execute(
+                "SELECT 1 FROM clean_v1 WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._warn(e)
+            self.connection.close()
+            self.connection = None
+            return False
+        if row is None:
+            return False
+        self.used.append(key)
+        return True
+
+    def add(self, key: bytes) -> None:
+        """
+        Remember that the target with cache key key is clean.
+        """
+
+        self.used.append(key)
+
+    def close(self) -> None:
+        """
+        Write the keys used during this run, evict the least recently used
+        keys beyond max_entries and close the cache.
+        """
+
+        if self.connection is None:
+            return
+        now: int = time.time_ns()
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO clean_v1 VALUES (?, ?) ON CONFLICT(key) "
+                    + "DO UPDATE SET last_used = excluded.last_used",
+                    ((key, now) for key in self.used),
+                )
+                count: int = self.connection.execute(
+                    "SELECT count(*) FROM clean_v1"
+                ).fetchone()[0]
+                if count > self.max_entries:
+                    self.connection.execute(
+                        "DELETE FROM clean_v1 WHERE key IN (SELECT key FROM "
+                        + "clean_v1 ORDER BY last_used LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+        except sqlite3.Error as e:
+            self._warn(e)
+        self.connection.close()
+        self.connection = None
+
+
+def string_quote_safe(untrusted_string: str) -> str:
+    """
+    Quote a string like 'LC_ALL=C printf %q' in bash does, rendering it as a
+    pure-ASCII printable shell literal.
+    """
+
+    if not untrusted_string:
+        return "''"
+    ## Printable ASCII, as almost every path is.
+    if untrusted_string.isascii() and untrusted_string.isprintable():
+        quoted: str = untrusted_string.translate(SHELL_SPECIAL_ESCAPES)
+        if ord(untrusted_string[0]) in SHELL_SPECIAL_LEADING_BYTES:
+            quoted = "\\" + quoted
+        return quoted
+    untrusted_bytes: bytes = os.fsencode(untrusted_string)
+    ansi_c_quoted: list[str] = ["$'"]
+    for byte in untrusted_bytes:
+        if byte in ANSI_C_ESCAPES:
+            ansi_c_quoted.append(ANSI_C_ESCAPES[byte])
+        elif 0x20 <= byte <= 0x7E:
+            ansi_c_quoted.append(chr(byte))
+        else:
+            ansi_c_quoted.append(f"\\{byte:03o}")
+    ansi_c_quoted.append("'")
+    return "".join(ansi_c_quoted)
+
+
+def detect_log_colors() -> dict[str, str]:
+    """
+    Return the escape sequences log() uses, keyed by TermColors attribute.
+    Empty if get_colors.sh would disable colors because stderr is not a
+    terminal, without starting a shell to find that out.
+    """
+
+    if not sys.stderr.isatty() and os.getenv("ASSUME_TERM_PRESENT") != "true":
+        return {}
+    term_colors: TermColors = TermColors()
+    return {
+        name: getattr(term_colors, name)
+        for name in ["bold", "nocolor", *LOG_COLOR_NAME.values()]
+    }
+
+
+def log(
+    log_type: str, message: str, source: str = PROG, log_level: str = LOG_LEVEL
+) -> None:
+    """
+    Print a log message to stderr in the format of log() in log_run_die.sh,
+    with source taking the place of the script name.
+    """
+
+    if LOG_LEVEL_NUM[log_type] > LOG_LEVEL_NUM[log_level]:
+        return
+    log_color: str = LOG_COLORS.get("bold", "") + LOG_COLORS.get(
+        LOG_COLOR_NAME.get(log_type, ""), ""
+    )
+    nocolor: str = LOG_COLORS.get("nocolor", "")
+    log_content: str = sanitize_string(message).rstrip("\n")
+    log_full: str = (
+        f"{source} [{log_color}{log_type.upper()}{nocolor}]: {log_content}"
+    )
+    print(stdisplay(log_full), file=sys.stderr)
+
+
+def internal_error(message: str, counters: ScanCounters) -> None:
+    """
+    Log an internal error, bump the counter and overall_exit.
+    """
+
+    log("error", message)
+    counters.internal_errors += 1
+    counters.bump_exit(2)
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a size in bytes with an optional K, M or G suffix (powers of 1024).
+    Raise ValueError if it is not one.
+    """
+
+    match = SIZE_RE.fullmatch(value)
+    if match is None or not value.isascii():
+        raise ValueError(f"invalid size: '{value}'")
+    return int(match.group(1)) * SIZE_SUFFIXES[match.group(2)]
+
+
+def unicode_show_plugin(file_name: str | None, data: bytes | OSError) -> int:
+    """
+    The unicode-show plugin. Return the exit code unicode-show would return
+    for this target.
+    """
+
+    if isinstance(data, OSError):
+        print(
+            f"[ERROR] File read error [{stdisplay(str(file_name), sgr=-1)}]: "
+            + f"{data}",
+            file=sys.stderr,
+        )
+        return 2
+    result: int = scan_bytes(data, filename=file_name)
+    if result == SCAN_CLEAN:
+        return 0
+    if result == SCAN_FOUND:
+        return 1
+    return 2
+
+
+def find_modelines(data: bytes) -> list[str]:
+    """
+    Return every line of data that contains a Vim or Emacs modeline, prefixed
+    with its line number like 'grep --line-number'. Follows grep's
+    '--binary-files=without-match' in a UTF-8 locale: lines that are not
+    valid UTF-8 never match, and data with a NUL byte in grep's first read
+    buffer never matches. grep stops at a later NUL byte somewhere within the
+    buffer that contains it, this stops at the line that contains it, which
+    may report more lines but never fewer.
+    """
+
+    nul_index: int = data.find(b"\0")
+    if nul_index != -1:
+        if nul_index < GREP_INITIAL_BUFFER_SIZE:
+            return []
+        data = data[: data.rfind(b"\n", 0, nul_index) + 1]
+    ## Most data cannot match at all, which is much faster to find out than
+    ## to decode and search it.
+    if not any(hint in data for hint in MODELINE_HINTS):
+        return []
+    text: str = data.decode("utf-8", errors="surrogateescape")
+
+    ## Search the whole text at once and only work out line numbers for
+    ## matches, most text has none.
+    modelines: list[str] = []
+    lineno: int = 1
+    counted_until: int = 0
+    next_line_start: int = 0
+    for match in MODELINE_RE.finditer(text):
+        if match.start() < next_line_start:
+            continue
+        line_start: int = text.rfind("\n", 0, match.start()) + 1
+        line_end: int = text.find("\n", match.start())
+        if line_end == -1:
+            line_end = len(text)
+        next_line_start = line_end + 1
+        line: str = text[line_start:line_end]
+        ## Lone surrogates stand for bytes that are not valid UTF-8.
+        if not line.isascii() and ENCODING_ERROR_RE.search(line):
+            continue
+        lineno += text.count("\n", counted_until, line_start)
+        counted_until = line_start
+        modelines.append(f"{lineno}:{line}")
+    return modelines
+
+
+def modeline_show_plugin(file_name: str | None, data: bytes | OSError) -> int:
+    """
+    The modeline-show plugin. Return the exit code modeline-show would return
+    for this target.
+    """
+
+    source: str = "modeline-show"
+    if isinstance(data, OSError):
+        log(
+            "error",
+            f"Error reading file '{file_name}': {data}",
+            source=source,
+            log_level="notice",
+        )
+        log("error", "Errors encountered.", source=source, log_level="notice")
+        return 2
+    modelines: list[str] = find_modelines(data)
+    if not modelines:
+        return 0
+    where: str = "stdin" if file_name is None else f"file '{file_name}'"
+    log(
+        "warn",
+        f"Vim or Emacs modeline found in {where}! Details:",
+        source=source,
+        log_level="notice",
+    )
+    print("\n".join(modelines))
+    log("warn", "Modelines found.", source=source, log_level="notice")
+    return 1
+
+
+## Plugins run for every target, in this order.
+PLUGIN_LIST: dict[str, Callable[[str | None, bytes | OSError], int]] = {
+    "unicode-show": unicode_show_plugin,
+    "modeline-show": modeline_show_plugin,
+}
+
+
+def read_target(file_name: str) -> bytes | OSError:
+    """
+    Read a target once for all plugins. Return the error instead if it cannot
+    be read, every plugin reports it. The whole target is held in memory,
+    see --max-size.
+    """
+
+    try:
+        with open(file_name, "rb") as f:
+            return f.read()
+    except OSError as e:
+        return e
+
+
+def run_plugins_for_target(
+    file_name: str | None, data: bytes | OSError, counters: ScanCounters
+) -> bool:
+    """
+    Run every plugin in PLUGIN_LIST against a single target, file_name being
+    None for stdin, and update counters. Return whether every plugin found
+    the target clean.
+    """
+
+    target_label: str = (
+        "stdin" if file_name is None else string_quote_safe(file_name)
+    )
+    had_finding: bool = False
+    had_error: bool = False
+
+    counters.files_scanned += 1
+
+    for plugin, plugin_func in PLUGIN_LIST.items():
+        counters.plugins_run += 1
+        plugin_exit: int
+        try:
+            plugin_exit = plugin_func(file_name, data)
+        except Exception as e:
+            print(f"[ERROR] Unexpected error [{plugin}]: {e}", file=sys.stderr)
+            plugin_exit = 2
+
+        if plugin_exit == 0:
+            log("info", f"{plugin}: {target_label} OK")
+        elif plugin_exit == 1:
+            counters.plugins_findings += 1
+            had_finding = True
+            log("warn", f"{plugin}: {target_label} finding (exit 1)")
+            counters.bump_exit(1)
+        else:
+            counters.plugins_errors += 1
+            had_error = True
+            log(
+                "error", f"{plugin}: {target_label} error (exit {plugin_exit})"
+            )
+            counters.bump_exit(2)
+
+    if had_finding:
+        counters.files_with_findings += 1
+    if had_error:
+        counters.files_with_errors += 1
+    return not had_finding and not had_error
+
+
+def report_cached_target(file_name: str, counters: ScanCounters) -> None:
+    """
+    Report a target the cache knows to be clean like run_plugins_for_target()
+    would, without running the plugins.
+    """
+
+    target_label: str = string_quote_safe(file_name)
+    counters.files_scanned += 1
+    for plugin in PLUGIN_LIST:
+        counters.plugins_run += 1
+        log("info", f"{plugin}: {target_label} OK")
+
+
+class OutputRecorder(StringIO):
+    """
+    Stand-in for stdout or stderr that records what is written to it into
+    records, a list shared with the recorder of the other stream, so that
+    the output of both streams can be replayed in the order it was written.
+    """
+
+    def __init__(self, records: list[tuple[int, str]], fd: int) -> None:
+        super().__init__()
+        self.records: list[tuple[int, str]] = records
+        self.fd: int = fd
+
+    def write(self, s: str) -> int:
+        if s:
+            if self.records and self.records[-1][0] == self.fd:
+                self.records[-1] = (self.fd, self.records[-1][1] + s)
+            else:
+                self.records.append((self.fd, s))
+        return len(s)
+
+
+def replay_output(records: list[tuple[int, str]]) -> None:
+    """
+    Write the output recorded by OutputRecorder to stdout and stderr, each
+    record flushed before the next one, so that they interleave like they
+    were written when both streams go to the same file.
+    """
+
+    for fd, text in records:
+        stream = sys.stdout if fd == 1 else sys.stderr
+        stream.write(text)
+        stream.flush()
+
+
+## Read-only connection of a worker process to the cache, opened for the
+## first target it scans, and the path it was opened for.
+WORKER_CACHE: tuple[str, sqlite3.Connection | None] | None = None
+
+
+def worker_cache_lookup(path: str, key: bytes) -> bool:
+    """
+    Return whether the target with cache key key is in the cache at path, for
+    worker processes. They only read the cache, the parent process writes the
+    keys they return. Errors count as misses, the target is scanned instead.
+    """
+
+    # pylint: disable=global-statement
+    global WORKER_CACHE
+    if WORKER_CACHE is None or WORKER_CACHE[0] != path:
+        if WORKER_CACHE is not None and WORKER_CACHE[1] is not None:
+            WORKER_CACHE[1].close()
+        connection: sqlite3.Connection | None = None
+        try:
+            connection = sqlite3.connect(
+                f"file:{quote(os.path.abspath(path))}?mode=ro",
+                uri=True,
+                timeout=CACHE_TIMEOUT,
+            )
+        except sqlite3.Error:
+            pass
+        WORKER_CACHE = (path, connection)
+    if WORKER_CACHE[1] is None:
+        return False
+    try:
+        return (
+            WORKER_CACHE[1]
+            .execute("SELECT 1 FROM clean_v1 WHERE key = ?", (key,))
+            .fetchone()
+            is not None
+        )
+    except sqlite3.Error:
+        return False
+
+
+def scan_target_buffered(
+    file_name: str,
+    use_color: bool,
+    log_colors: dict[str, str],
+    cache_path: str | None,
+    environment: dict[str, str | None],
+) -> tuple[list[tuple[int, str]], ScanCounters, bytes | None]:
+    """
+    Run every plugin against file_name in a worker process, with the
+    CACHE_ENVIRONMENT variables set like in environment, unless the cache at
+    cache_path knows it to be clean. Return everything printed to stdout and
+    stderr in the order it was printed, see replay_output(), the counters of
+    this target alone, and if cache_path is set and the target is clean, its
+    cache key.
+    """
+
+    # pylint: disable=global-statement
+    global LOG_COLORS
+    LOG_COLORS = log_colors
+    unicode_show.USE_COLOR = use_color
+    ## Workers are forked from a server started by the first pool, whose
+    ## environment may be out of date.
+    for name, value in environment.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    counters: ScanCounters = ScanCounters()
+    records: list[tuple[int, str]] = []
+    data: bytes | OSError = read_target(file_name)
+    key: bytes | None = None
+    if cache_path is not None and isinstance(data, bytes):
+        key = cache_key(data)
+    with (
+        redirect_stdout(OutputRecorder(records, 1)),
+        redirect_stderr(OutputRecorder(records, 2)),
+    ):
+        clean: bool
+        if (
+            cache_path is not None
+            and key is not None
+            and worker_cache_lookup(cache_path, key)
+        ):
+            report_cached_target(file_name, counters)
+            clean = True
+        else:
+            clean = run_plugins_for_target(file_name, data, counters)
+    return records, counters, key if clean else None
+
+
+def scan_targets(
+    file_names: Iterable[str],
+    jobs: int,
+    counters: ScanCounters,
+    scan_cache: ScanCache | None = None,
+) -> None:
+    """
+    Run every plugin against every file in file_names, using jobs worker
+    processes if jobs is greater than 1, and update counters. Files
+    scan_cache knows to be clean are not scanned again. Reports are printed
+    in the order of file_names either way.
+    """
+
+    if jobs > 1:
+        _scan_targets_in_pool(list(file_names), jobs, counters, scan_cache)
+        return
+    for file_name in file_names:
+        data: bytes | OSError = read_target(file_name)
+        key: bytes | None = None
+        if scan_cache is not None and isinstance(data, bytes):
+            key = cache_key(data)
+            if scan_cache.lookup(key):
+                report_cached_target(file_name, counters)
+                continue
+        clean: bool = run_plugins_for_target(file_name, data, counters)
+        if scan_cache is not None and clean and key is not None:
+            scan_cache.add(key)
+
+
+def _scan_targets_in_pool(
+    file_name_list: list[str],
+    jobs: int,
+    counters: ScanCounters,
+    scan_cache: ScanCache | None,
+) -> None:
+    """
+    scan_targets() with jobs worker processes. The workers look targets up in
+    scan_cache themselves, they read them anyway, and the parent only writes
+    the keys they return.
+    """
+
+    if not file_name_list:
+        return
+    cache_path: str | None = None
+    if scan_cache is not None and scan_cache.connection is not None:
+        cache_path = scan_cache.path
+    ## Hand out files in batches, most files are small and quick to scan.
+    chunksize: int = max(1, min(64, len(file_name_list) // (jobs * 4)))
+    ## Not 'fork', the executor starts a management thread before the workers
+    ## and forking a multi-threaded process may deadlock.
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(file_name_list)),
+        mp_context=multiprocessing.get_context("forkserver"),
+    ) as executor:
+        for records, target_counters, clean_key in executor.map(
+            scan_target_buffered,
+            file_name_list,
+            repeat(unicode_show.USE_COLOR),
+            repeat(LOG_COLORS),
+            repeat(cache_path),
+            repeat({name: os.environ.get(name) for name in CACHE_ENVIRONMENT}),
+            chunksize=chunksize,
+        ):
+            replay_output(records)
+            counters.add(target_counters)
+            if scan_cache is not None and clean_key is not None:
+                scan_cache.add(clean_key)
+
+
+def is_excluded(path: str, name: str, exclude: list[str]) -> bool:
+    """
+    Return whether a directory entry matches one of the exclude globs. Globs
+    containing a '/' are matched against the whole path like 'find -path',
+    others against the name like 'find -name'.
+    """
+
+    for pattern in exclude:
+        if fnmatchcase(path if "/" in pattern else name, pattern):
+            return True
+    return False
+
+
+def read_directory(
+    dir_path: str, counters: ScanCounters
+) -> list[os.DirEntry[str]] | None:
+    """
+    Return the entries of a directory sorted by name, so that reports do not
+    depend on the order of the file system. Return None if it cannot be read.
+    """
+
+    try:
+        with os.scandir(dir_path) as dir_iter:
+            return sorted(dir_iter, key=lambda entry: entry.name)
+    except OSError as e:
+        internal_error(
+            f"cannot read directory '{string_quote_safe(dir_path)}': "
+            + f"{e.strerror}",
+            counters,
+        )
+        return None
+
+
+def walk_directory(
+    top: str, options: ScanOptions, counters: ScanCounters
+) -> Iterator[str]:
+    """
+    Yield the path of every regular file under the directory top, depth
+    first in name order like find, skipping excluded entries and files
+    larger than options.max_size. Symlinks are skipped unless
+    options.follow_symlinks is set, in which case symlink loops are internal
+    errors like they are for 'find -L'.
+    """
+
+    top_entries: list[os.DirEntry[str]] | None = read_directory(top, counters)
+    if top_entries is None:
+        return
+    top_stat: os.stat_result = os.stat(top)
+    ## Entries still to be looked at in each directory being walked, with the
+    ## (st_dev, st_ino) of that directory and the directories above it.
+    stack: list[tuple[Iterator[os.DirEntry[str]], set[tuple[int, int]]]] = [
+        (iter(top_entries), {(top_stat.st_dev, top_stat.st_ino)})
+    ]
+    follow: bool = options.follow_symlinks
+    while stack:
+        entries, ancestors = stack[-1]
+        entry: os.DirEntry[str] | None = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+        if is_excluded(entry.path, entry.name, options.exclude):
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=follow):
+                dir_stat: os.stat_result = entry.stat(follow_symlinks=follow)
+                dir_id: tuple[int, int] = (dir_stat.st_dev, dir_stat.st_ino)
+                if dir_id in ancestors:
+                    internal_error(
+                        "file system loop detected at "
+                        + f"'{string_quote_safe(entry.path)}'",
+                        counters,
+                    )
+                    continue
+                sub_entries: list[os.DirEntry[str]] | None = read_directory(
+                    entry.path, counters
+                )
+                if sub_entries is not None:
+                    stack.append((iter(sub_entries), ancestors | {dir_id}))
+                continue
+            if not entry.is_file(follow_symlinks=follow):
+                continue
+            if (
+                options.max_size is not None
+                and entry.stat(follow_symlinks=follow).st_size
+                > options.max_size
+            ):
+                continue
+        except OSError as e:
+            internal_error(
+                f"cannot stat '{string_quote_safe(entry.path)}': {e.strerror}",
+                counters,
+            )
+            continue
+        yield entry.path
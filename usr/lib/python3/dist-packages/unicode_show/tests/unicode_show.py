@@ -3,8 +3,9 @@
 ## Copyright (C) 2025 - 2025 ENCRYPTED SUPPORT LLC <adrelanos@whonix.org>
 ## See the file COPYING for copying conditions.
 
-# pylint: disable=missing-module-docstring
+# pylint: disable=missing-module-docstring,too-many-lines
 
+import json
 import os
 import pty
 import sys
@@ -13,10 +14,22 @@ from typing import Callable
 from io import BytesIO, FileIO, TextIOWrapper
 from unittest import TestCase, mock
 from stdisplay.stdisplay import stdisplay
-from unicode_show.unicode_show import describe_char
+from unicode_show.unicode_show import (
+    CLASSIFICATION_TABLE_SIZE,
+    MMAP_THRESHOLD,
+    char_info,
+    classify_char,
+    classify_char_cached,
+    classify_suspicious,
+    describe_char,
+    is_clean_ascii,
+    is_clean_ascii_file,
+    is_suspicious,
+)
 from unicode_show.unicode_show import main as unicode_show_main
 
 
+# pylint: disable=too-many-public-methods
 class TestUnicodeShow(TestCase):
     """
     Tests for unicode_show.py.
@@ -429,6 +442,77 @@ FILENAME_PLACEHOLDER:1: Hello world![U+0009][U+0020]
                 file_contents=test_case[0],
             )
 
+    def test_long_line_suspicious_runs(self) -> None:
+        """
+        Tests a long line with several runs of suspicious characters, and
+        trailing whitespace directly after a suspicious character.
+        """
+
+        clean_run: str = "x" * 10000
+        test_string: str = (
+            clean_run
+            + "\u200b\u200b"
+            + clean_run
+            + "\x1b"
+            + clean_run
+            + "\u00e9 \t\n"
+        )
+        stdout_string: str = (
+            "FILENAME_PLACEHOLDER:1: "
+            + clean_run
+            + "[U+200B][U+200B]"
+            + clean_run
+            + "[U+001B]"
+            + clean_run
+            + "[U+00E9][U+0020][U+0009]\n"
+            + "   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)\n"
+            + "   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)\n"
+            + "   -> '\\x1b' (U+001B, <unnamed>, Cc)\n"
+            + "   -> '\\xe9' (U+00E9, LATIN SMALL LETTER E WITH ACUTE, Ll)\n"
+            + "   -> ' ' (U+0020, SPACE, Zs)\n"
+            + "   -> '\\t' (U+0009, <unnamed>, Cc)\n"
+        )
+        self._test_file(
+            main_func=unicode_show_main,
+            argv0=self.argv0,
+            stdout_string=stdout_string,
+            stderr_string="",
+            exit_code=1,
+            file_contents=test_string + clean_run + "\n",
+        )
+
+    def test_long_line_windows(self) -> None:
+        """
+        Tests if lines longer than LINE_WINDOW_SIZE are reported window by
+        window with the column each window starts at, and if trailing
+        whitespace and a missing newline are still found at window
+        boundaries.
+        """
+
+        with mock.patch("unicode_show.unicode_show.LINE_WINDOW_SIZE", 4):
+            self._test_stdin(
+                main_func=unicode_show_main,
+                argv0=self.argv0,
+                stdout_string="""\
+<stdin>:1:5: [U+200B]efg
+   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)
+<stdin>:1:16: [U+0020][U+0009][U+0020]
+   -> ' ' (U+0020, SPACE, Zs)
+   -> '\\t' (U+0009, <unnamed>, Cc)
+   -> ' ' (U+0020, SPACE, Zs)
+<stdin>:2: a[U+0020]
+   -> ' ' (U+0020, SPACE, Zs)
+<stdin>:3:5: [U+0020][U+0020]
+   -> ' ' (U+0020, SPACE, Zs)
+   -> ' ' (U+0020, SPACE, Zs)
+<stdin>:3: [missing newline at end]
+""",
+                stderr_string="",
+                args=[],
+                exit_code=1,
+                stdin_string="abcd\u200befg  x  ij \t \na \nlong  ",
+            )
+
     def test_clean_ascii(self) -> None:
         """
         Tests if clean 7-bit ASCII passes without warnings.
@@ -456,6 +540,74 @@ FILENAME_PLACEHOLDER:1: Hello world![U+0009][U+0020]
             file_contents=test_string,
         )
 
+    def test_is_clean_ascii(self) -> None:
+        """
+        Tests the byte-level check against what scan_file() would report.
+        """
+
+        test_cases: list[tuple[bytes, bool]] = [
+            (b"", True),
+            (b"\n", True),
+            (b"\n\n", True),
+            (b"Hello world!\n", True),
+            (b"\tindented\n", True),
+            (b"Hello world!", False),
+            (b"Hello world! \n", False),
+            (b"Hello world!\t\n", False),
+            (b"Hello\r\n", False),
+            (b"Hello\x1b[31m\n", False),
+            (b"Hello\x7f\n", False),
+            (b"Hello \xc3\xa9\n", False),
+        ]
+        for test_case in test_cases:
+            self.assertEqual(
+                is_clean_ascii(test_case[0]), test_case[1], test_case[0]
+            )
+
+    def test_clean_ascii_fast_path(self) -> None:
+        """
+        Tests if clean ASCII files, including memory-mapped ones, are
+        reported clean without being decoded and scanned line by line, and
+        that any suspicious byte still goes through the full scan.
+        """
+
+        clean_line: str = "x" * 79 + "\n"
+        large_clean: str = clean_line * (MMAP_THRESHOLD // len(clean_line) + 1)
+        for file_contents in ["", clean_line, large_clean]:
+            with mock.patch(
+                "unicode_show.unicode_show.scan_file",
+                side_effect=AssertionError("scan_file called"),
+            ):
+                self._test_file(
+                    main_func=unicode_show_main,
+                    argv0=self.argv0,
+                    stdout_string="",
+                    stderr_string="",
+                    exit_code=0,
+                    file_contents=file_contents,
+                )
+
+        lineno: int = large_clean.count("\n") + 1
+        self._test_file(
+            main_func=unicode_show_main,
+            argv0=self.argv0,
+            stdout_string=f"""\
+FILENAME_PLACEHOLDER:{lineno}: Hello[U+0020]
+   -> ' ' (U+0020, SPACE, Zs)
+""",
+            stderr_string="",
+            exit_code=1,
+            file_contents=large_clean + "Hello \n",
+        )
+
+    def test_clean_ascii_file_not_regular(self) -> None:
+        """
+        Tests if files that are not regular files are left to the full scan
+        rather than being consumed by the fast path.
+        """
+
+        self.assertFalse(is_clean_ascii_file(os.devnull))
+
     def test_invalid_utf8(self) -> None:
         """
         Tests if invalid Unicode is rejected with a fatal error.
@@ -593,6 +745,234 @@ FILENAME_PLACEHOLDER:1: [missing newline at end]
             args=[dir_str],
         )
 
+    def test_jobs(self) -> None:
+        """
+        Tests if scanning with --jobs reports every file in argument order
+        with the same exit codes as a sequential scan, including stopping at
+        the first file that cannot be read.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_contents: dict[str, bytes] = {
+                "clean.txt": b"Hello world!\n",
+                "unicode.txt": b"Hello\xe2\x80\x8b world!\n",
+                "invalid.txt": b"\xc3\n",
+                "trailing.txt": b"Hello world! \n",
+            }
+            fnames: list[str] = []
+            for name, contents in file_contents.items():
+                fnames.append(os.path.join(tmp_dir, name))
+                with open(fnames[-1], "wb") as f:
+                    f.write(contents)
+            stdout_string: str = f"""\
+{fnames[1]}:1: Hello[U+200B] world!
+   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)
+{fnames[3]}:1: Hello world![U+0020]
+   -> ' ' (U+0020, SPACE, Zs)
+"""
+            stderr_string: str = (
+                f"[ERROR] Unicode decode error [{fnames[2]}]: 'utf-8' codec "
+                + "can't decode byte 0xc3 in position 0: invalid "
+                + "continuation byte\n"
+            )
+            for jobs_args in [
+                [],
+                ["--jobs", "1"],
+                ["--jobs=3"],
+                ["--jobs", "0"],
+            ]:
+                self._test_args(
+                    main_func=unicode_show_main,
+                    argv0=self.argv0,
+                    stdout_string=stdout_string,
+                    stderr_string=stderr_string,
+                    exit_code=2,
+                    args=[*jobs_args, *fnames],
+                )
+                self._test_args(
+                    main_func=unicode_show_main,
+                    argv0=self.argv0,
+                    stdout_string=f"""\
+{fnames[1]}:1: Hello[U+200B] world!
+   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)
+""",
+                    stderr_string=f"""\
+[ERROR] File read error [{tmp_dir}]: [Errno 21] Is a directory: '{tmp_dir}'
+""",
+                    exit_code=2,
+                    args=[*jobs_args, fnames[0], fnames[1], tmp_dir, *fnames],
+                )
+                self._test_args(
+                    main_func=unicode_show_main,
+                    argv0=self.argv0,
+                    stdout_string="",
+                    stderr_string="",
+                    exit_code=0,
+                    args=[*jobs_args, fnames[0], fnames[0]],
+                )
+
+    def test_options(self) -> None:
+        """
+        Tests option parsing: invalid --jobs values are rejected, and '--'
+        makes every following argument a file, even one that looks like an
+        option.
+        """
+
+        for args, stderr_string in [
+            (["--jobs"], "[ERROR] Missing value [--jobs]\n"),
+            (["--jobs", "x"], "[ERROR] Invalid value [--jobs]: x\n"),
+            (["--jobs=-1"], "[ERROR] Invalid value [--jobs]: -1\n"),
+            (["--jobs=\u0661"], "[ERROR] Invalid value [--jobs]: _\n"),
+        ]:
+            self._test_args(
+                main_func=unicode_show_main,
+                argv0=self.argv0,
+                stdout_string="",
+                stderr_string=stderr_string,
+                exit_code=2,
+                args=args,
+            )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            old_cwd: str = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                with open("--jobs", "w", encoding="utf-8") as f:
+                    f.write("Hello\u200b world!\n")
+                self._test_args(
+                    main_func=unicode_show_main,
+                    argv0=self.argv0,
+                    stdout_string="""\
+--jobs:1: Hello[U+200B] world!
+   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)
+""",
+                    stderr_string="",
+                    exit_code=1,
+                    args=["--jobs", "2", "--", "--jobs"],
+                )
+            finally:
+                os.chdir(old_cwd)
+
+    def test_json(self) -> None:
+        """
+        Tests if --json prints one JSON object per finding, with and without
+        --jobs, and for stdin.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fnames: list[str] = [
+                os.path.join(tmp_dir, "unicode\x1b.txt"),
+                os.path.join(tmp_dir, "clean.txt"),
+            ]
+            with open(fnames[0], "wb") as f:
+                f.write(b"a\xe2\x80\x8b\xc2\xa0b \nclean\n\x01c")
+            with open(fnames[1], "wb") as f:
+                f.write(b"clean\n")
+            file_json: str = json.dumps(fnames[0])
+            for jobs_args in [[], ["--jobs", "2"]]:
+                self._test_args(
+                    main_func=unicode_show_main,
+                    argv0=self.argv0,
+                    stdout_string=f"""\
+{{"file":{file_json},"line":1,"column":2,"codepoint":8203,\
+"name":"ZERO WIDTH SPACE","category":"Cf","kind":"suspicious"}}
+{{"file":{file_json},"line":1,"column":3,"codepoint":160,\
+"name":"NO-BREAK SPACE","category":"Zs","kind":"suspicious"}}
+{{"file":{file_json},"line":1,"column":5,"codepoint":32,\
+"name":"SPACE","category":"Zs","kind":"trailing-whitespace"}}
+{{"file":{file_json},"line":3,"column":1,"codepoint":1,\
+"name":null,"category":"Cc","kind":"suspicious"}}
+{{"file":{file_json},"line":3,"column":3,"codepoint":null,\
+"name":null,"category":null,"kind":"missing-final-newline"}}
+""",
+                    stderr_string="",
+                    exit_code=1,
+                    args=["--json", *jobs_args, *fnames],
+                )
+
+        self._test_stdin(
+            main_func=unicode_show_main,
+            argv0=self.argv0,
+            stdout_string="""\
+{"file":null,"line":2,"column":4,"codepoint":8238,\
+"name":"RIGHT-TO-LEFT OVERRIDE","category":"Cf","kind":"suspicious"}
+""",
+            stderr_string="",
+            args=["--json"],
+            exit_code=1,
+            stdin_string="clean\nabc\u202e\n",
+        )
+
+    def test_batch(self) -> None:
+        """
+        Tests if --batch answers every record with the exit code and the
+        sanitized output of a separate unicode-show run, and rejects
+        malformed input.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_contents: dict[str, bytes] = {
+                "clean.txt": b"Hello world!\n",
+                "unicode\x1b.txt": b"Hello\xe2\x80\x8b world!\n",
+                "invalid.txt": b"\xc3\n",
+            }
+            fnames: list[str] = []
+            for name, contents in file_contents.items():
+                fnames.append(os.path.join(tmp_dir, name))
+                with open(fnames[-1], "wb") as f:
+                    f.write(contents)
+            records: str = "".join(
+                f"file\0{fname}\0" for fname in [*fnames, tmp_dir]
+            )
+            self._test_stdin(
+                main_func=unicode_show_main,
+                argv0=self.argv0,
+                stdout_string=f"""\
+0\0\0\
+1\0{tmp_dir}/unicode_.txt:1: Hello[U+200B] world!
+   -> '\\u200b' (U+200B, ZERO WIDTH SPACE, Cf)\0\
+2\0[ERROR] Unicode decode error [{fnames[2]}]: 'utf-8' codec can't \
+decode byte 0xc3 in position 0: invalid continuation byte\0\
+2\0[ERROR] File read error [{tmp_dir}]: [Errno 21] Is a directory: \
+'{tmp_dir}'\0\
+0\0\0\
+1\0<stdin>:1: path[U+001B]
+   -> '\\x1b' (U+001B, <unnamed>, Cc)\0\
+1\0<stdin>:1: [missing newline at end]\0""",
+                stderr_string="",
+                args=["--batch"],
+                exit_code=0,
+                stdin_string=records
+                + "text\0path\n\0text\0path\x1b\n\0text\0path\0",
+            )
+
+        for stdin_string, stdout_string, stderr_string in [
+            ("", "", ""),
+            ("text\0a\n", "", "[ERROR] Truncated record [--batch]\n"),
+            (
+                "text\0a\n\0dir\0a\0",
+                "0\0\0",
+                "[ERROR] Unknown record kind [--batch]: b'dir'\n",
+            ),
+        ]:
+            self._test_stdin(
+                main_func=unicode_show_main,
+                argv0=self.argv0,
+                stdout_string=stdout_string,
+                stderr_string=stderr_string,
+                args=["--batch"],
+                exit_code=2 if stderr_string else 0,
+                stdin_string=stdin_string,
+            )
+        self._test_args(
+            main_func=unicode_show_main,
+            argv0=self.argv0,
+            stdout_string="",
+            stderr_string="[ERROR] File arguments are not allowed [--batch]\n",
+            exit_code=2,
+            args=["--batch", "--", "file"],
+        )
+
     def test_describe_char_allowed_characters(self) -> None:
         """
         Tests if describe_char outputs allowed characters literally rather
@@ -604,6 +984,39 @@ FILENAME_PLACEHOLDER:1: [missing newline at end]
         )
         self.assertEqual(describe_char("-"), "- (U+002D, HYPHEN-MINUS, Pd)")
 
+    def test_classification_table(self) -> None:
+        """
+        Tests if the classification table and the description cache give the
+        same answers as classifying each character from scratch.
+        """
+
+        for code in [
+            *range(CLASSIFICATION_TABLE_SIZE + 0x100),
+            0x200B,
+            0x202E,
+            0xDCFF,
+            0x1F600,
+        ]:
+            c: str = chr(code)
+            self.assertEqual(is_suspicious(c), classify_suspicious(c))
+            self.assertEqual(char_info(c), classify_char(c))
+        self.assertEqual(
+            char_info("\u00a0"),
+            (
+                "NO-BREAK SPACE",
+                "Zs",
+                "'\\xa0' (U+00A0, NO-BREAK SPACE, Zs)",
+            ),
+        )
+        self.assertEqual(
+            char_info("\x00"), (None, "Cc", "'\\x00' (U+0000, <unnamed>, Cc)")
+        )
+        classify_char_cached.cache_clear()
+        for _ in range(3):
+            describe_char("\u0430")
+        self.assertEqual(classify_char_cached.cache_info().misses, 1)
+        self.assertEqual(classify_char_cached.cache_info().hits, 2)
+
     def test_no_input(self) -> None:
         """
         Tests if unicode-show exits normally if given neither a file nor stdin
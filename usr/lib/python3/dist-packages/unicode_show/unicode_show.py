@@ -11,6 +11,16 @@ characters. It prints lines with suspicious characters annotated inline (e.g.,
 [U+XXXX]). For each such character, it prints the Unicode codepoint, name, and
 category.
 
+Options:
+  --jobs N - Scan file arguments in N worker processes, 0 means one per CPU.
+             Reports are still printed in argument order. Only recognized
+             before the first file argument. '--' ends option parsing.
+  --batch  - Read NUL-delimited records from stdin and write one verdict per
+             record to stdout, see run_batch(). Lets a caller scan many files
+             and strings with a single process.
+  --json   - Print one JSON object per finding instead of annotated lines,
+             see print_json_finding().
+
 Exit codes:
   0 - No suspicious Unicode found
   1 - Suspicious Unicode found
@@ -18,13 +28,26 @@ Exit codes:
 """
 
 import sys
+import json
 import unicodedata
 import string
 import os
-from typing import TextIO
+import mmap
+import multiprocessing
+import stat
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from functools import lru_cache
+from io import BufferedIOBase, BytesIO, StringIO, TextIOWrapper
+from itertools import repeat
+from re import Pattern, compile as re_compile, escape as re_escape
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, TextIO
 from stdisplay.stdisplay import stdisplay
 
 USE_COLOR: bool = False
+## Print findings as JSON lines, see print_json_finding().
+JSON_OUTPUT: bool = False
 
 RED: str = "\033[91m"
 CYAN: str = "\033[96m"
@@ -46,9 +69,18 @@ def colorize(text: str, color: str) -> str:
     return f"{color}{text}{RESET}" if USE_COLOR else text
 
 
-def is_suspicious(c: str) -> bool:
+## Characters below this codepoint, ASCII and the Latin blocks up to Latin
+## Extended-B, are classified and described once, at import time.
+CLASSIFICATION_TABLE_SIZE: int = 0x250
+## describe_char() memoizes the descriptions of at most this many other
+## characters.
+DESCRIPTION_CACHE_SIZE: int = 4096
+
+
+def classify_suspicious(c: str) -> bool:
     """
-    Check if a character is suspicious or not.
+    Check if a character is suspicious or not. is_suspicious() without the
+    classification table.
     """
 
     codepoint_allowed: bool = (
@@ -59,14 +91,90 @@ def is_suspicious(c: str) -> bool:
     return not (codepoint_allowed and semantically_allowed)
 
 
-def describe_char(c: str) -> str:
+## classify_suspicious() of every character below CLASSIFICATION_TABLE_SIZE,
+## indexed by codepoint.
+SUSPICIOUS_TABLE: tuple[bool, ...] = tuple(
+    classify_suspicious(chr(code)) for code in range(CLASSIFICATION_TABLE_SIZE)
+)
+
+
+def is_suspicious(c: str) -> bool:
     """
-    Return a description of a Unicode character including codepoint, name,
-    and category.
+    Check if a character is suspicious or not.
+    """
+
+    code: int = ord(c)
+    if code < CLASSIFICATION_TABLE_SIZE:
+        return SUSPICIOUS_TABLE[code]
+    return classify_suspicious(c)
+
+
+## Every character that passes is_suspicious(). Derived from it rather than
+## spelled out so that both checks stay a single source of truth.
+NON_SUSPICIOUS_CHARS: str = "".join(
+    sorted(c for c in SAFE_ASCII_SEMANTIC if not is_suspicious(c))
+)
+## Matches a run of consecutive suspicious characters. Used by scan_line() to
+## skip clean lines and to jump between suspicious runs without visiting every
+## character from Python.
+SUSPICIOUS_RUN_RE: Pattern[str] = re_compile(
+    "[^" + re_escape(NON_SUSPICIOUS_CHARS) + "]+"
+)
+## Whitespace that is not suspicious on its own, and that str.rstrip() would
+## remove from the end of a line.
+TRAILING_WHITESPACE: str = "".join(
+    c for c in NON_SUSPICIOUS_CHARS if c.isspace()
+)
+## The bytes is_clean_ascii() deletes, anything left over is suspicious.
+NON_SUSPICIOUS_BYTES: bytes = NON_SUSPICIOUS_CHARS.encode("ascii")
+## Trailing whitespace as it appears in raw bytes.
+TRAILING_WHITESPACE_LINE_ENDINGS: list[bytes] = [
+    c.encode("ascii") + b"\n" for c in TRAILING_WHITESPACE if c != "\n"
+]
+## is_clean_ascii() translates this many bytes at a time.
+CLEAN_ASCII_CHUNK_SIZE: int = 2**20
+
+## Results of scan_path().
+SCAN_CLEAN: int = 0
+SCAN_FOUND: int = 1
+SCAN_DECODE_ERROR: int = 2
+SCAN_READ_ERROR: int = 3
+## scan_file() reads at most this many characters of a line at a time, and
+## scans longer lines window by window.
+LINE_WINDOW_SIZE: int = 2**20
+## Files at least this large are memory-mapped by is_clean_ascii_file()
+## instead of being read into memory.
+MMAP_THRESHOLD: int = 2**20
+
+## Kinds of findings printed by print_json_finding().
+FINDING_SUSPICIOUS: str = "suspicious"
+FINDING_TRAILING_WHITESPACE: str = "trailing-whitespace"
+FINDING_MISSING_FINAL_NEWLINE: str = "missing-final-newline"
+
+## Record kinds of the --batch protocol, see run_batch().
+BATCH_KIND_FILE: bytes = b"file"
+BATCH_KIND_TEXT: bytes = b"text"
+## Exit code of a separate unicode-show run for each SCAN_* result.
+SCAN_EXIT_CODES: dict[int, int] = {
+    SCAN_CLEAN: 0,
+    SCAN_FOUND: 1,
+    SCAN_DECODE_ERROR: 2,
+    SCAN_READ_ERROR: 2,
+}
+## run_batch() reads at most this many bytes of stdin at a time.
+BATCH_READ_SIZE: int = 2**16
+
+
+def classify_char(c: str) -> tuple[str | None, str, str]:
+    """
+    Return the Unicode name of a character (None if it has none), its
+    category and its uncolored description for describe_char(). char_info()
+    without the classification table and the cache.
     """
 
     code: int = ord(c)
-    name: str = unicodedata.name(c, "<unnamed>")
+    unicode_name: str | None = unicodedata.name(c, None)
+    name: str = "<unnamed>" if unicode_name is None else unicode_name
     cat: str = unicodedata.category(c)
 
     codepoint_allowed: bool = (
@@ -89,74 +197,329 @@ def describe_char(c: str) -> str:
         display = ascii(c)
 
     desc: str = f"{display} (U+{code:04X}, {name}, {cat})"
-    return colorize(desc, CYAN)
+    return unicode_name, cat, desc
 
 
-def scan_line(
-    line: str, lineno: int | None = None, filename: str | None = None
+## classify_char() of every character below CLASSIFICATION_TABLE_SIZE,
+## indexed by codepoint.
+CHAR_INFO_TABLE: tuple[tuple[str | None, str, str], ...] = tuple(
+    classify_char(chr(code)) for code in range(CLASSIFICATION_TABLE_SIZE)
+)
+
+
+@lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def classify_char_cached(c: str) -> tuple[str | None, str, str]:
+    """
+    Memoized classify_char(), for characters outside the classification
+    table.
+    """
+
+    return classify_char(c)
+
+
+def char_info(c: str) -> tuple[str | None, str, str]:
+    """
+    Return classify_char() of a character, looked up in the classification
+    table or the description cache so that repeated characters do not query
+    the Unicode database again.
+    """
+
+    code: int = ord(c)
+    if code < CLASSIFICATION_TABLE_SIZE:
+        return CHAR_INFO_TABLE[code]
+    return classify_char_cached(c)
+
+
+def describe_char(c: str) -> str:
+    """
+    Return a description of a Unicode character including codepoint, name,
+    and category.
+    """
+
+    return colorize(char_info(c)[2], CYAN)
+
+
+def print_json_finding(
+    filename: str | None,
+    lineno: int | None,
+    column: int,
+    c: str | None,
+    kind: str,
+) -> None:
+    """
+    Print a finding as a JSON object on a line of its own. The object has the
+    keys file (None for stdin), line, column (counted in characters from 1),
+    codepoint, name and category (None if the finding is not a character, or
+    for the name, if the character has none), and kind, one of the FINDING_*
+    constants. The output is plain ASCII.
+    """
+
+    name: str | None = None
+    category: str | None = None
+    if c is not None:
+        name, category, _ = char_info(c)
+    print(
+        json.dumps(
+            {
+                "file": filename,
+                "line": lineno,
+                "column": column,
+                "codepoint": None if c is None else ord(c),
+                "name": name,
+                "category": category,
+                "kind": kind,
+            },
+            separators=(",", ":"),
+        )
+    )
+
+
+def report_findings(
+    text: str,
+    trailing: str,
+    lineno: int | None,
+    filename: str | None,
+    column: int | None = None,
 ) -> bool:
     """
-    Scan a single line for suspicious characters, print annotated line and
-    character info.
+    Print the suspicious characters in text and every character of trailing,
+    the whitespace at the end of the line, annotated. If column is given,
+    text (or trailing if text is empty) is a window of a longer line that
+    starts at that 0-based column, which the report then includes. Return
+    whether anything was reported.
     """
 
-    annotated: str = ""
-    has_suspicious: bool = False
-    display_name: str = stdisplay(filename, sgr=-1) if filename else "<stdin>"
-    prefix: str = f"{display_name}:{lineno}: "
+    if not trailing and not SUSPICIOUS_RUN_RE.search(text):
+        return False
+    offset: int = column or 0
+
+    if JSON_OUTPUT:
+        for match in SUSPICIOUS_RUN_RE.finditer(text):
+            for finding_column, c in enumerate(
+                match.group(), offset + match.start() + 1
+            ):
+                print_json_finding(
+                    filename, lineno, finding_column, c, FINDING_SUSPICIOUS
+                )
+        for finding_column, c in enumerate(trailing, offset + len(text) + 1):
+            print_json_finding(
+                filename,
+                lineno,
+                finding_column,
+                c,
+                FINDING_TRAILING_WHITESPACE,
+            )
+        return True
+
+    ## Assemble the annotated line from slices in a list rather than by
+    ## repeated string concatenation, to stay linear on very long lines.
+    annotated_parts: list[str] = []
     suspicious_descrs: list[str] = []
+    last_end: int = 0
 
-    for c in line:
-        if is_suspicious(c):
-            has_suspicious = True
-            code: str = f"[U+{ord(c):04X}]"
-            annotated += colorize(code, RED)
+    for match in SUSPICIOUS_RUN_RE.finditer(text):
+        annotated_parts.append(text[last_end : match.start()])
+        for c in match.group():
+            annotated_parts.append(colorize(f"[U+{ord(c):04X}]", RED))
             suspicious_descrs.append(f"   -> {describe_char(c)}")
-        else:
-            annotated += c
+        last_end = match.end()
+    annotated_parts.append(text[last_end:])
 
-    if annotated and annotated[-1] == "\n":
-        annotated = annotated[:-1]
-
-    annotated_stripped: str = annotated.rstrip()
     ## Trailing whitespaces are suspicious.
     # pylint: disable=line-too-long
     ## https://forums.whonix.org/t/detecting-malicious-unicode-in-source-code-and-pull-requests/13754/28
-    if len(annotated) != len(annotated_stripped):
-        annotated_new: str = annotated_stripped
-        has_suspicious = True
-        for c in annotated[len(annotated_stripped) :]:
-            code = f"[U+{ord(c):04X}]"
-            annotated_new += colorize(code, RED)
-            suspicious_descrs.append(f"   -> {describe_char(c)}")
-        annotated = annotated_new
-
-    if not has_suspicious:
-        return False
+    for c in trailing:
+        annotated_parts.append(colorize(f"[U+{ord(c):04X}]", RED))
+        suspicious_descrs.append(f"   -> {describe_char(c)}")
 
-    print(prefix + annotated)
+    display_name: str = stdisplay(filename, sgr=-1) if filename else "<stdin>"
+    prefix: str = f"{display_name}:{lineno}: "
+    if column is not None:
+        prefix = f"{display_name}:{lineno}:{column + 1}: "
+    print(prefix + "".join(annotated_parts))
     for suspicious_descr in suspicious_descrs:
         print(suspicious_descr)
 
     return True
 
 
+def scan_line(
+    line: str, lineno: int | None = None, filename: str | None = None
+) -> bool:
+    """
+    Scan a single line for suspicious characters, print annotated line and
+    character info.
+    """
+
+    body: str = line[:-1] if line.endswith("\n") else line
+    body_stripped: str = body.rstrip(TRAILING_WHITESPACE)
+    ## Clean line fast path, the regex scan runs in C.
+    if len(body_stripped) == len(body) and not SUSPICIOUS_RUN_RE.search(body):
+        return False
+
+    return report_findings(
+        body_stripped, body[len(body_stripped) :], lineno, filename
+    )
+
+
+class PendingWhitespace:
+    """
+    Whitespace at the end of the part of a long line that scan_window() has
+    read so far. It is only suspicious if the line ends without anything
+    but whitespace following it. Kept in a temporary file once it grows
+    beyond LINE_WINDOW_SIZE characters, so that memory use stays bounded.
+    """
+
+    def __init__(self) -> None:
+        self.column: int = 0
+        self.length: int = 0
+        ## Closed by scan_file().
+        # pylint: disable=consider-using-with
+        self.buffer: SpooledTemporaryFile[str] = SpooledTemporaryFile(
+            max_size=LINE_WINDOW_SIZE, mode="w+", encoding="ascii", newline=""
+        )
+
+    def clear(self) -> None:
+        """
+        Forget the whitespace, something other than whitespace followed it.
+        """
+
+        self.length = 0
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+    def append(self, column: int, whitespace: str) -> None:
+        """
+        Add whitespace found at the 0-based column.
+        """
+
+        if not whitespace:
+            return
+        if not self.length:
+            self.column = column
+        self.buffer.write(whitespace)
+        self.length += len(whitespace)
+
+    def report(self, lineno: int, filename: str | None) -> bool:
+        """
+        Report the whitespace as trailing whitespace of line lineno, in
+        windows of at most LINE_WINDOW_SIZE characters, and forget it.
+        Return whether there was any.
+        """
+
+        found: bool = self.length > 0
+        column: int = self.column
+        self.buffer.seek(0)
+        while whitespace := self.buffer.read(LINE_WINDOW_SIZE):
+            report_findings("", whitespace, lineno, filename, column)
+            column += len(whitespace)
+        self.clear()
+        return found
+
+
+def scan_window(
+    window: str,
+    lineno: int,
+    column: int,
+    filename: str | None,
+    pending: PendingWhitespace,
+) -> bool:
+    """
+    Scan a window of a line too long to be read as a whole, starting at the
+    0-based column. Trailing whitespace is only known to be trailing once
+    the end of the line has been read, so whitespace at the end of the
+    window is kept in pending until then.
+    """
+
+    ends_line: bool = window.endswith("\n")
+    body: str = window[:-1] if ends_line else window
+    body_stripped: str = body.rstrip(TRAILING_WHITESPACE)
+    if body_stripped:
+        pending.clear()
+    found: bool = report_findings(body_stripped, "", lineno, filename, column)
+    pending.append(column + len(body_stripped), body[len(body_stripped) :])
+    if ends_line:
+        found = pending.report(lineno, filename) or found
+    return found
+
+
+def is_clean_ascii(data: bytes | mmap.mmap) -> bool:
+    """
+    Return True if scan_file() would find nothing to report in data, judging
+    by its raw bytes only. False means data must be decoded and scanned.
+    """
+
+    ## Missing newline at the end is suspicious, let scan_file() handle it.
+    if data and data[-1:] != b"\n":
+        return False
+    ## bytes.translate() runs in C. Slices are used because mmap objects
+    ## cannot translate, and to keep the copies small.
+    for offset in range(0, len(data), CLEAN_ASCII_CHUNK_SIZE):
+        chunk: bytes = data[offset : offset + CLEAN_ASCII_CHUNK_SIZE]
+        if chunk.translate(None, NON_SUSPICIOUS_BYTES):
+            return False
+    return all(
+        data.find(line_ending) == -1
+        for line_ending in TRAILING_WHITESPACE_LINE_ENDINGS
+    )
+
+
+def is_clean_ascii_file(fname: str) -> bool:
+    """
+    Return True if fname is a regular file that is clean according to
+    is_clean_ascii(). Anything else, including pipes and devices that can
+    only be read once, is left to scan_file().
+    """
+
+    with open(fname, "rb") as f:
+        file_stat: os.stat_result = os.fstat(f.fileno())
+        if not stat.S_ISREG(file_stat.st_mode):
+            return False
+        if file_stat.st_size < MMAP_THRESHOLD:
+            return is_clean_ascii(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return is_clean_ascii(data)
+
+
 def scan_file(f: TextIO, filename: str | None = None) -> bool:
     """
-    Scan an entire file-like object for suspicious characters.
+    Scan an entire file-like object for suspicious characters. Lines are
+    read at most LINE_WINDOW_SIZE characters at a time, longer lines are
+    scanned window by window by scan_window().
     """
 
     found: bool = False
-    last_lineno: int = 0
+    lineno: int = 0
+    ## Characters of the current line before the window being read, 0 at
+    ## the start of a line.
+    column: int = 0
     ## Empty files should not report "missing newline at end".
-    # last_line = ""
-    last_line: str | None = None
-
-    for lineno, line in enumerate(f, 1):
-        last_lineno = lineno
-        last_line = line
-        if scan_line(line, lineno=lineno, filename=filename):
+    # last_window = ""
+    last_window: str | None = None
+    pending: PendingWhitespace | None = None
+
+    while window := f.readline(LINE_WINDOW_SIZE):
+        if column == 0:
+            lineno += 1
+        ## readline() only stops short of the size at the end of a line or
+        ## of the file, so the latter is a complete last line.
+        if column == 0 and (
+            window.endswith("\n") or len(window) < LINE_WINDOW_SIZE
+        ):
+            if scan_line(window, lineno=lineno, filename=filename):
+                found = True
+        else:
+            if pending is None:
+                pending = PendingWhitespace()
+            if scan_window(window, lineno, column, filename, pending):
+                found = True
+        last_window = window
+        column = 0 if window.endswith("\n") else column + len(window)
+    if pending is not None:
+        ## The file ended in the middle of a long line.
+        if pending.report(lineno, filename):
             found = True
+        pending.buffer.close()
 
     ## A missing final newline is benign to some callers (e.g. scanning git
     ## blob temp files that legitimately lack one). Suppress just this finding
@@ -166,16 +529,25 @@ def scan_file(f: TextIO, filename: str | None = None) -> bool:
         os.environ.get("UNICODE_SHOW_ALLOW_MISSING_FINAL_NEWLINE") == "1"
     )
     if (
-        last_line is not None
-        and not last_line.endswith("\n")
+        last_window is not None
+        and not last_window.endswith("\n")
         and not suppress_missing_newline
     ):
         found = True
+        if JSON_OUTPUT:
+            print_json_finding(
+                filename,
+                lineno,
+                column + 1,
+                None,
+                FINDING_MISSING_FINAL_NEWLINE,
+            )
+            return found
         ## Missing newline at the end is suspicious.
         display_name = stdisplay(filename, sgr=-1) if filename else "<stdin>"
         msg: str = (
             f"{display_name}:"
-            + f"{last_lineno}: "
+            + f"{lineno}: "
             + colorize("[missing newline at end]", RED)
         )
         print(msg)
@@ -183,53 +555,342 @@ def scan_file(f: TextIO, filename: str | None = None) -> bool:
     return found
 
 
-def main() -> int:
+def scan_bytes(data: bytes, filename: str | None = None) -> int:
     """
-    Main function.
+    Scan the already read contents of a file or of stdin for suspicious
+    characters, printing the report like scan_path() would. Return one of the
+    SCAN_* results.
+    """
+
+    if is_clean_ascii(data):
+        return SCAN_CLEAN
+    try:
+        ## Decode through the same text layer as open() so that the report,
+        ## including decode error positions, is identical.
+        with TextIOWrapper(
+            BytesIO(data), encoding="utf-8", errors="strict", newline="\n"
+        ) as f:
+            if scan_file(f, filename=filename):
+                return SCAN_FOUND
+    except UnicodeDecodeError as e:
+        label: str = stdisplay(filename, sgr=-1) if filename else "stdin"
+        print(
+            f"[ERROR] Unicode decode error [{label}]: {e}",
+            file=sys.stderr,
+        )
+        return SCAN_DECODE_ERROR
+    return SCAN_CLEAN
+
+
+def scan_path(fname: str) -> int:
+    """
+    Scan the file fname for suspicious characters, printing the report.
+    Return one of the SCAN_* results.
+    """
+
+    try:
+        ## Most files are plain ASCII. Confirm that on the raw bytes before
+        ## paying for decoding and scanning lines.
+        if is_clean_ascii_file(fname):
+            return SCAN_CLEAN
+        ## Must not use errors='replace' because otherwise
+        ## suspicious unicode might slip.
+        ## Fail closed for non-UTF-8.
+        with open(
+            fname,
+            "r",
+            encoding="utf-8",
+            errors="strict",
+            newline="\n",
+        ) as f:
+            if scan_file(f, filename=fname):
+                return SCAN_FOUND
+    except UnicodeDecodeError as e:
+        print(
+            "[ERROR] Unicode decode error "
+            + f"[{stdisplay(fname, sgr=-1)}]: "
+            + f"{e}",
+            file=sys.stderr,
+        )
+        return SCAN_DECODE_ERROR
+    except Exception as e:
+        print(
+            "[ERROR] File read error " + f"[{stdisplay(fname, sgr=-1)}]: {e}",
+            file=sys.stderr,
+        )
+        return SCAN_READ_ERROR
+    return SCAN_CLEAN
+
+
+def scan_path_buffered(
+    fname: str, use_color: bool, json_output: bool
+) -> tuple[int, str, str]:
+    """
+    Run scan_path() in a worker process. Return its result together with
+    everything it printed to stdout and stderr.
     """
 
     # pylint: disable=global-statement
-    global USE_COLOR
-    USE_COLOR = (
+    global USE_COLOR, JSON_OUTPUT
+    USE_COLOR = use_color
+    JSON_OUTPUT = json_output
+    stdout_buf: StringIO = StringIO()
+    stderr_buf: StringIO = StringIO()
+    with redirect_stdout(stdout_buf), redirect_stderr(stderr_buf):
+        result: int = scan_path(fname)
+    return result, stdout_buf.getvalue(), stderr_buf.getvalue()
+
+
+def usable_cpu_count() -> int:
+    """
+    Return the number of CPUs this process may run on, the default of
+    --jobs=0.
+    """
+
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        ## Not available on every platform.
+        return os.cpu_count() or 1
+
+
+def scan_paths(fnames: list[str], jobs: int) -> list[int]:
+    """
+    Scan every file in fnames, using jobs worker processes if jobs is greater
+    than 1. Reports are printed in argument order either way. Stop after the
+    first file that cannot be read, like a sequential scan would. Return the
+    SCAN_* result of every file scanned.
+    """
+
+    results: list[int] = []
+    if jobs <= 1 or len(fnames) <= 1:
+        for fname in fnames:
+            results.append(scan_path(fname))
+            if results[-1] == SCAN_READ_ERROR:
+                break
+        return results
+
+    ## Hand out files in batches, most files are small and quick to scan.
+    chunksize: int = max(1, min(64, len(fnames) // (jobs * 4)))
+    ## Not 'fork', the executor starts a management thread before the workers
+    ## and forking a multi-threaded process may deadlock.
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(fnames)),
+        mp_context=multiprocessing.get_context("forkserver"),
+    ) as executor:
+        for result, stdout_text, stderr_text in executor.map(
+            scan_path_buffered,
+            fnames,
+            repeat(USE_COLOR),
+            repeat(JSON_OUTPUT),
+            chunksize=chunksize,
+        ):
+            sys.stdout.write(stdout_text)
+            sys.stderr.write(stderr_text)
+            results.append(result)
+            if result == SCAN_READ_ERROR:
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+    return results
+
+
+def batch_scan(kind: bytes, value: bytes) -> tuple[int, str]:
+    """
+    Scan one --batch record the way a separate run of 'unicode-show FILE'
+    (kind BATCH_KIND_FILE) or 'unicode-show < TEXT' (kind BATCH_KIND_TEXT)
+    would. Return the exit code of that run together with everything it
+    would have printed to stdout and stderr. Raise ValueError for an unknown
+    kind.
+    """
+
+    if kind not in (BATCH_KIND_FILE, BATCH_KIND_TEXT):
+        raise ValueError(f"Unknown record kind [--batch]: {kind!r}")
+    report_buf: StringIO = StringIO()
+    result: int
+    with redirect_stdout(report_buf), redirect_stderr(report_buf):
+        try:
+            if kind == BATCH_KIND_FILE:
+                result = scan_path(os.fsdecode(value))
+            else:
+                result = scan_bytes(value)
+        except Exception as e:
+            print(f"[ERROR] Unexpected error [main]: {e}", file=sys.stderr)
+            result = SCAN_READ_ERROR
+    return SCAN_EXIT_CODES[result], report_buf.getvalue()
+
+
+def batch_report(report: str) -> bytes:
+    """
+    Return report the way the shell helpers used to show it: trailing
+    newlines removed like a command substitution does, then sanitized like
+    piping it through stcat does. The result is safe to print to a terminal
+    and never contains a NUL byte.
+    """
+
+    return (
+        "\n".join(
+            stdisplay(line, sgr=-1) for line in report.rstrip("\n").split("\n")
+        )
+        .encode("ascii", errors="replace")
+        .replace(b"\0", b"?")
+    )
+
+
+def run_batch(stdin: BufferedIOBase, stdout: BinaryIO) -> int:
+    """
+    Scan every record read from stdin and write its verdict to stdout.
+
+    A record is a kind and a value, each terminated by a NUL byte. Kind
+    'file' scans the file named by value, kind 'text' scans value itself.
+    The verdict is the exit code the equivalent unicode-show run would have
+    had, as a decimal number, followed by the batch_report() of its output,
+    each terminated by a NUL byte. Verdicts are written in record order and
+    flushed as soon as each record has been read, so that a caller may keep
+    one process running as a coprocess. Return 0 at the end of input, or 2
+    if the input is malformed.
+    """
+
+    pending: bytes = b""
+    fields: list[bytes] = []
+    while chunk := stdin.read1(BATCH_READ_SIZE):
+        *complete, pending = (pending + chunk).split(b"\0")
+        fields.extend(complete)
+        while len(fields) >= 2:
+            kind: bytes = fields.pop(0)
+            value: bytes = fields.pop(0)
+            exit_code: int
+            report: str
+            try:
+                exit_code, report = batch_scan(kind, value)
+            except ValueError as e:
+                print(f"[ERROR] {e}", file=sys.stderr)
+                return 2
+            stdout.write(
+                str(exit_code).encode("ascii")
+                + b"\0"
+                + batch_report(report)
+                + b"\0"
+            )
+            stdout.flush()
+    if pending or fields:
+        print("[ERROR] Truncated record [--batch]", file=sys.stderr)
+        return 2
+    return 0
+
+
+# pylint: disable=too-few-public-methods
+class Options:
+    """
+    Command line options of a unicode-show run.
+    """
+
+    def __init__(self) -> None:
+        self.jobs: int = 1
+        self.batch: bool = False
+        self.json_output: bool = False
+
+
+def parse_args(args: list[str]) -> tuple[Options, list[str]]:
+    """
+    Split the leading options from the file arguments. Raise ValueError on
+    invalid options.
+    """
+
+    options: Options = Options()
+    while args:
+        if args[0] == "--":
+            return options, args[1:]
+        if args[0] == "--batch":
+            options.batch, args = True, args[1:]
+            continue
+        if args[0] == "--json":
+            options.json_output, args = True, args[1:]
+            continue
+        jobs_value: str
+        if args[0] == "--jobs":
+            if len(args) < 2:
+                raise ValueError("Missing value [--jobs]")
+            jobs_value, args = args[1], args[2:]
+        elif args[0].startswith("--jobs="):
+            jobs_value, args = args[0][len("--jobs=") :], args[1:]
+        else:
+            break
+        if not jobs_value.isdecimal() or not jobs_value.isascii():
+            raise ValueError(
+                f"Invalid value [--jobs]: {stdisplay(jobs_value, sgr=-1)}"
+            )
+        options.jobs = int(jobs_value) or usable_cpu_count()
+    return options, args
+
+
+def detect_color() -> bool:
+    """
+    Return whether the environment and stdout allow color output.
+    """
+
+    return bool(
         not os.getenv("NOCOLOR")
         and not os.getenv("NO_COLOR")
         and os.getenv("TERM") != "dumb"
         and sys.stdout.isatty()
     )
 
+
+def batch_main(fnames: list[str]) -> int:
+    """
+    Main function of --batch.
+    """
+
+    if fnames:
+        print(
+            "[ERROR] File arguments are not allowed [--batch]",
+            file=sys.stderr,
+        )
+        return 2
+    if sys.stdin is None:
+        return 0
+    ## Reports are sanitized for the terminal by batch_report(), which would
+    ## strip the colors anyway.
+    # pylint: disable=global-statement
+    global USE_COLOR
+    USE_COLOR = False
+    sys.stdout.flush()
+    return run_batch(sys.stdin.buffer, sys.stdout.buffer)  # type: ignore
+
+
+# pylint: disable=too-many-return-statements
+def main() -> int:
+    """
+    Main function.
+    """
+
+    # pylint: disable=global-statement
+    global USE_COLOR, JSON_OUTPUT
+    USE_COLOR = detect_color()
+
+    options: Options
+    fnames: list[str]
+    try:
+        options, fnames = parse_args(sys.argv[1:])
+    except ValueError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 2
+    JSON_OUTPUT = options.json_output
+
+    if options.batch:
+        return batch_main(fnames)
+
     clean: bool = True
     had_valid_utf8: bool = True
     try:
-        if len(sys.argv) > 1:
-            for fname in sys.argv[1:]:
-                try:
-                    ## Must not use errors='replace' because otherwise
-                    ## suspicious unicode might slip.
-                    ## Fail closed for non-UTF-8.
-                    with open(
-                        fname,
-                        "r",
-                        encoding="utf-8",
-                        errors="strict",
-                        newline="\n",
-                    ) as f:
-                        if scan_file(f, filename=fname):
-                            clean = False
-                except UnicodeDecodeError as e:
-                    print(
-                        "[ERROR] Unicode decode error "
-                        + f"[{stdisplay(fname, sgr=-1)}]: "
-                        + f"{e}",
-                        file=sys.stderr,
-                    )
-                    had_valid_utf8 = False
-                except Exception as e:
-                    print(
-                        "[ERROR] File read error "
-                        + f"[{stdisplay(fname, sgr=-1)}]: {e}",
-                        file=sys.stderr,
-                    )
-                    return 2
+        if fnames:
+            results: list[int] = scan_paths(fnames, options.jobs)
+            if SCAN_READ_ERROR in results:
+                return 2
+            if SCAN_DECODE_ERROR in results:
+                had_valid_utf8 = False
+            if SCAN_FOUND in results:
+                clean = False
         elif sys.stdin is not None:
             try:
                 sys.stdin.reconfigure(  # type: ignore
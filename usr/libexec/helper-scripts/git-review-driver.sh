@@ -149,6 +149,17 @@ for check_mode in "${old_mode}" "${new_mode}"; do
     || log warn "unexpected mode '${check_mode}' for '${diff_path_q}'."
 done
 
+## Scan the path and the content of both sides with one unicode-show process
+## instead of one per scan below. The absent side of an add or delete is
+## /dev/null, which is never scanned.
+prefetch_args=(path "${diff_path}")
+for prefetch_file in "${old_file}" "${new_file}"; do
+  if [ "${prefetch_file}" != '/dev/null' ]; then
+    prefetch_args+=(file "${prefetch_file}")
+  fi
+done
+git_review_unicode_prefetch "${prefetch_args[@]}"
+
 ## Warn if there are control bytes in the path, fail closed if unicode-show
 ## encounters a fatal error. (CVE-2025-48384 is an example of what can go
 ## wrong if control bytes are allowed.)
@@ -32,6 +32,82 @@ if [ -z "${review_tool:-}" ]; then
   die 2 "git-review-scan.sh: caller must set 'review_tool'"
 fi
 
+## Verdicts of 'unicode-show --batch' stored by git_review_unicode_prefetch,
+## keyed by 'file:<target>' or 'path:<path>'. Each report is already
+## sanitized by unicode-show the same way stcat would.
+declare -gA git_review_prefetch_rc=()
+declare -gA git_review_prefetch_report=()
+
+## Scan several files and paths with a single 'unicode-show --batch' process,
+## instead of starting one unicode-show (and one stcat) per target, and store
+## the verdicts for git_review_unicode_scan and git_review_scan_path. Args:
+## pairs of a kind ('file' or 'path') and the file or path to scan.
+##
+## This is only an optimization: if the batch fails or answers incompletely,
+## nothing is stored and every target is scanned separately as before, which
+## surfaces the error. The records are scanned exactly as the separate runs
+## would: a path gets the same trailing newline, and
+## UNICODE_SHOW_ALLOW_MISSING_FINAL_NEWLINE cannot affect it because of that.
+git_review_unicode_prefetch() {
+  local kind target index
+  local -a keys records verdicts
+
+  git_review_prefetch_rc=()
+  git_review_prefetch_report=()
+  keys=()
+  records=()
+  while [ "$#" -ge 2 ]; do
+    kind="$1"
+    target="$2"
+    shift 2
+    case "${kind}" in
+      file)
+        records+=(file "${target}")
+        ;;
+      path)
+        records+=(text "${target}"$'\n')
+        ;;
+      *)
+        die 2 "git_review_unicode_prefetch: unknown kind '${kind}'"
+        ;;
+    esac
+    keys+=("${kind}:${target}")
+  done
+  if [ "${#keys[@]}" = 0 ]; then
+    return 0
+  fi
+
+  verdicts=()
+  readarray -t -d '' verdicts < <(
+    printf '%s\0' "${records[@]}" \
+      | UNICODE_SHOW_ALLOW_MISSING_FINAL_NEWLINE=1 NO_COLOR=1 unicode-show --batch 2>/dev/null
+  ) || true
+  ## Two fields (exit code, report) per record, in record order.
+  if [ "${#verdicts[@]}" != "$(( ${#keys[@]} * 2 ))" ]; then
+    return 0
+  fi
+  for index in "${!keys[@]}"; do
+    if ! [[ "${verdicts[index * 2]}" =~ ^[0-9]+$ ]]; then
+      return 0
+    fi
+  done
+  for index in "${!keys[@]}"; do
+    git_review_prefetch_rc["${keys[index]}"]="${verdicts[index * 2]}"
+    git_review_prefetch_report["${keys[index]}"]="${verdicts[index * 2 + 1]}"
+  done
+}
+
+## Print a unicode-show report to stderr. Args: $1 = the report, $2 = 'true'
+## if it was already sanitized by git_review_unicode_prefetch, else it is
+## piped through stcat.
+git_review_print_report() {
+  if [ "$2" = 'true' ]; then
+    printf '%s\n' "$1" >&2
+  else
+    printf '%s\n' "$1" | stcat >&2 || true
+  fi
+}
+
 ## Check for Unicode in a specified file. Makes unicode-show's return value
 ## public for other functions to inspect. Warns if Unicode is found, errors
 ## out or sets the fatal-finding flag if unicode-show reports a critical error
@@ -43,16 +119,23 @@ fi
 ## target placeholders in Git lack a trailing newline by design.
 git_review_unicode_rc=0
 git_review_unicode_scan() {
-  local target label report
+  local target label report report_safe
 
   target="$1"
   label="$2"
   git_review_unicode_rc=0
-  report="$(UNICODE_SHOW_ALLOW_MISSING_FINAL_NEWLINE=1 NO_COLOR=1 unicode-show "${target}" 2>&1)" \
-    || git_review_unicode_rc="$?"
+  report_safe='false'
+  if [ -n "${git_review_prefetch_rc["file:${target}"]+set}" ]; then
+    git_review_unicode_rc="${git_review_prefetch_rc["file:${target}"]}"
+    report="${git_review_prefetch_report["file:${target}"]}"
+    report_safe='true'
+  else
+    report="$(UNICODE_SHOW_ALLOW_MISSING_FINAL_NEWLINE=1 NO_COLOR=1 unicode-show "${target}" 2>&1)" \
+      || git_review_unicode_rc="$?"
+  fi
   if [ "${git_review_unicode_rc}" != 0 ]; then
     log warn "'${label}' suspicious/undecodable Unicode (unicode-show rc='${git_review_unicode_rc}'):"
-    printf '%s\n' "${report}" | stcat >&2 || true
+    git_review_print_report "${report}" "${report_safe}"
     if [ "${git_review_unicode_rc}" -ge 2 ]; then
       git_review_handle_unicode_show_fatal
     fi
@@ -67,15 +150,22 @@ git_review_unicode_scan() {
 ## UNICODE_SHOW_ALLOW_MISSING_FINAL_NEWLINE.
 git_review_path_rc=0
 git_review_scan_path() {
-  local path path_q report
+  local path path_q report report_safe
 
   path="$1"
   path_q="$2"
   git_review_path_rc=0
-  report="$(printf '%s\n' "${path}" | NO_COLOR=1 unicode-show 2>&1)" || git_review_path_rc="$?"
+  report_safe='false'
+  if [ -n "${git_review_prefetch_rc["path:${path}"]+set}" ]; then
+    git_review_path_rc="${git_review_prefetch_rc["path:${path}"]}"
+    report="${git_review_prefetch_report["path:${path}"]}"
+    report_safe='true'
+  else
+    report="$(printf '%s\n' "${path}" | NO_COLOR=1 unicode-show 2>&1)" || git_review_path_rc="$?"
+  fi
   if [ "${git_review_path_rc}" != 0 ]; then
     log warn "path '${path_q}' has suspicious/undecodable bytes (unicode-show rc='${git_review_path_rc}'):"
-    printf '%s\n' "${report}" | stcat >&2 || true
+    git_review_print_report "${report}" "${report_safe}"
   fi
   ## Tab / newline are the ONE gap unicode-show cannot cover: it treats them as
   ## benign content whitespace, yet in a PATH they are anomalous and can forge